@@ -8,6 +8,7 @@ This file allows the backend to be run in multiple ways:
 3. As a PyInstaller executable: ./resdeeds-backend
 """
 
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -18,6 +19,8 @@ sys.path.insert(0, str(current_dir))
 
 # Import and run the main function from app.py
 if __name__ == "__main__":
+    # Required for job worker processes in the PyInstaller executable
+    multiprocessing.freeze_support()
     try:
         from app import main
         main()
@@ -1,6 +1,8 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
-import json
+import os
+import queue
+import tempfile
 import traceback
 import argparse
 import signal
@@ -8,44 +10,108 @@ import sys
 import threading
 import time
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
 import uvicorn
 
-# Attempt imports with diagnostics captured for health reporting
+# Analysis dependencies are imported by load_dependencies() rather than at module
+# load, so the server can bind its port before the slow PyPSA import finishes.
+# Import diagnostics are captured for health reporting.
+np = None
+pd = None
+pypsa = None
+pypsa_working = False
 pypsa_import_error: Optional[str] = None
 pandas_import_error: Optional[str] = None
-try:
-    import pandas as pd  # type: ignore
-except Exception as e:  # pragma: no cover - diagnostics only
-    pd = None  # type: ignore
-    pandas_import_error = f"{type(e).__name__}: {e}"
-
-# PyPSA import with optional dependency handling
-try:
-    # Temporarily suppress warnings during import
-    import warnings
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        import pypsa  # type: ignore
+dependencies_loaded = threading.Event()
+_dependencies_lock = threading.Lock()
+
+
+def load_dependencies() -> None:
+    """Import numpy, pandas and PyPSA and check that PyPSA works.
+
+    Blocks until the imports are done; calls after the first return at once.
+    """
+    global np, pd, pypsa, pypsa_working, pypsa_import_error, pandas_import_error
+    if dependencies_loaded.is_set():
+        return
+    with _dependencies_lock:
+        if dependencies_loaded.is_set():
+            return
+
+        try:
+            import numpy as np  # type: ignore
+            import pandas as pd  # type: ignore
+        except Exception as e:  # pragma: no cover - diagnostics only
+            pandas_import_error = f"{type(e).__name__}: {e}"
+
+        # PyPSA import with optional dependency handling
+        try:
+            # Temporarily suppress warnings during import
+            import warnings
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                import pypsa  # type: ignore
+
+            # Check if we can create a basic network (this will test core functionality)
+            try:
+                test_network = pypsa.Network()
+                test_network.add("Bus", "test_bus", v_nom=110)
+                pypsa_working = True
+                pypsa_import_error = None
+                print("PyPSA core functionality verified")
+            except Exception as network_error:
+                pypsa_working = False
+                pypsa_import_error = f"PyPSA network creation failed: {network_error}"
+                print(f"PyPSA network creation failed: {network_error}")
+
+        except Exception as e:  # pragma: no cover - diagnostics only
+            pypsa = None  # type: ignore
+            pypsa_working = False
+            pypsa_import_error = f"{type(e).__name__}: {e}"
+            print(f"PyPSA import failed: {e}")
+
+        dependencies_loaded.set()
 
-    # Check if we can create a basic network (this will test core functionality)
-    try:
-        test_network = pypsa.Network()
-        test_network.add("Bus", "test_bus", v_nom=110)
-        pypsa_working = True
-        pypsa_import_error = None
-        print("PyPSA core functionality verified")
-    except Exception as network_error:
-        pypsa_working = False
-        pypsa_import_error = f"PyPSA network creation failed: {network_error}"
-        print(f"PyPSA network creation failed: {network_error}")
-
-except Exception as e:  # pragma: no cover - diagnostics only
-    pypsa = None  # type: ignore
-    pypsa_working = False
-    pypsa_import_error = f"{type(e).__name__}: {e}"
-    print(f"PyPSA import failed: {e}")
+
+class TemporalReduction(BaseModel):
+    # "resample" merges every `resolution` consecutive snapshots; "kmeans" and "hierarchical"
+    # cluster periods of `period` snapshots (e.g. days) into `clusters` representative periods
+    method: Literal["resample", "kmeans", "hierarchical"]
+    resolution: int = Field(3, ge=1)
+    clusters: int = Field(12, ge=1)
+    period: int = Field(24, ge=1)
+    seed: int = 0
+
+
+class SpatialReduction(BaseModel):
+    # Fold dead-end branches whose lines can never be congested into the bus they hang from
+    collapse_dead_ends: bool = True
+    # Replace chains of lines through buses with nothing attached by one equivalent line
+    merge_series: bool = True
+    # Cluster the remaining buses down to this many: "electrical" joins buses across the
+    # lowest-reactance lines first, "coordinates" runs k-means on the bus x/y
+    buses: Optional[int] = Field(None, ge=1)
+    cluster_by: Literal["electrical", "coordinates"] = "electrical"
+    seed: int = 0
+
+
+class ResultProjection(BaseModel):
+    # Result sections to return; status, objective, solver and timings always are
+    sections: Optional[List[Literal["capacities", "power", "timeseries", "statistics", "topology", "snapshots"]]] = None
+    # Component lists kept in the capacities, power, timeseries and statistics sections
+    components: Optional[List[Literal["buses", "generators", "loads", "lines", "storage_units"]]] = None
+    # Attributes kept in those sections, e.g. ["p_nom_opt", "p"] or the statistic "Optimal Capacity";
+    # component names are always returned
+    attributes: Optional[List[str]] = None
+
+    def includes(self, section: str) -> bool:
+        return self.sections is None or section in self.sections
 
 
 class AnalyzeRequest(BaseModel):
@@ -55,22 +121,289 @@ class AnalyzeRequest(BaseModel):
     lines: List[Dict[str, Any]] = []
     storage_units: List[Dict[str, Any]] = []
     snapshots: Optional[List[Any]] = None
+    # Time-varying inputs: attribute -> component name -> one value per snapshot,
+    # e.g. {"p_set": {"load_1": [...]}} for loads_t
+    loads_t: Dict[str, Dict[str, List[float]]] = {}
+    generators_t: Dict[str, Dict[str, List[float]]] = {}
+    storage_units_t: Dict[str, Dict[str, List[float]]] = {}
+    # Return full per-snapshot series under "timeseries" in addition to "power"
+    include_timeseries: bool = True
+    # Solver selection; generic settings are translated to the solver's own option names
+    solver: Optional[str] = None
+    threads: Optional[int] = Field(None, gt=0)
+    time_limit: Optional[float] = Field(None, gt=0, description="Wall-clock limit for the solver in seconds")
+    mip_gap: Optional[float] = Field(None, ge=0)
+    tolerance: Optional[float] = Field(None, gt=0)
+    # Passed to the solver unchanged, e.g. {"presolve": "off"} for HiGHS
+    solver_options: Dict[str, Any] = {}
+    # Solve each electrically separate island as its own LOPF, in parallel worker processes
+    split_islands: bool = False
+    # Keep the solved network on disk and return its "result_id" for slicing via /api/results
+    export_result: bool = False
+    # Dispatch the snapshots in consecutive windows of this many, carrying the storage state
+    # of charge from one window to the next; capacities must not be extendable
+    rolling_horizon: Optional[int] = Field(None, gt=0)
+    # Snapshots each window shares with the next one, which replaces their results
+    rolling_overlap: int = Field(0, ge=0)
+    # Investment periods (e.g. [2025, 2030, 2035]) for multi-period expansion: the snapshots are
+    # the operating profile of every period, and build_year/lifetime decide where components exist
+    investment_periods: Optional[List[int]] = Field(None, min_length=1)
+    # Yearly rate at which the costs of later investment periods are discounted
+    discount_rate: float = Field(0.0, ge=0)
+    # Solve on fewer, weighted snapshots and map the results back to every snapshot
+    temporal: Optional[TemporalReduction] = None
+    # Solve a smaller equivalent network and map the results back to every original bus and line
+    spatial: Optional[SpatialReduction] = None
+    # Only return these result sections, components and attributes
+    projection: Optional[ResultProjection] = None
+
+    @model_validator(mode="after")
+    def check_solve_mode(self) -> "AnalyzeRequest":
+        if self.rolling_horizon is not None and self.rolling_overlap >= self.rolling_horizon:
+            raise ValueError("'rolling_overlap' must be smaller than 'rolling_horizon'")
+        if self.investment_periods is not None:
+            if any(b <= a for a, b in zip(self.investment_periods, self.investment_periods[1:])):
+                raise ValueError("'investment_periods' must be strictly increasing")
+        modes = [
+            name
+            for name, value in (
+                ("split_islands", self.split_islands),
+                ("rolling_horizon", self.rolling_horizon is not None),
+                ("investment_periods", self.investment_periods is not None),
+                ("temporal", self.temporal is not None),
+            )
+            if value
+        ]
+        if len(modes) > 1:
+            raise ValueError(
+                "Only one of 'split_islands', 'rolling_horizon', 'investment_periods' and 'temporal' "
+                f"can be used ({', '.join(modes)} given)"
+            )
+        if self.spatial is not None and self.split_islands:
+            raise ValueError("'spatial' cannot be combined with 'split_islands'")
+        return self
+
+
+class ParameterOverride(BaseModel):
+    # Payload component list (e.g. "generators") and static attribute to change
+    component: str
+    attribute: str
+    # Components to change; all components of the type if omitted
+    names: Optional[List[str]] = None
+    value: Optional[Any] = None
+    scale: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_value_or_scale(self) -> "ParameterOverride":
+        if (self.value is None) == (self.scale is None):
+            raise ValueError("Exactly one of 'value' and 'scale' must be given")
+        return self
+
+
+class BatchVariant(BaseModel):
+    id: Optional[str] = None
+    overrides: List[ParameterOverride] = []
+
+
+class BatchRequest(AnalyzeRequest):
+    # Base network in the AnalyzeRequest fields; each variant is solved separately
+    variants: List[BatchVariant] = Field(..., min_length=1)
+
+
+class PowerFlowRequest(AnalyzeRequest):
+    # "linear" runs a DC power flow, "ac" the Newton-Raphson n.pf(); generators dispatch at p_set
+    mode: Literal["linear", "ac"] = "linear"
+    # Processes splitting the snapshots of an AC power flow; 1 runs in the server process
+    workers: int = Field(1, ge=1)
+
+
+class ContingencyRequest(AnalyzeRequest):
+    # Base case flows: "dispatch" runs a linear power flow of generator p_set, "optimize" solves the LOPF
+    base: Literal["dispatch", "optimize"] = "dispatch"
+    # Lines to take out one at a time; all lines if omitted
+    outages: Optional[List[str]] = None
+    # Loading relative to s_nom * s_max_pu above which a line counts as overloaded
+    threshold: float = Field(1.0, gt=0)
+    # Re-optimize without the line for each contingency that overloads a line
+    resolve: bool = False
+
+
+class MonteCarloRequest(AnalyzeRequest):
+    # Failure probability per component list ("lines", "generators"): one value for every
+    # component of the type or a map of component name -> probability
+    failure_probabilities: Dict[str, Union[float, Dict[str, float]]] = Field(..., min_length=1)
+    scenarios: int = Field(1000, ge=1)
+    seed: int = 0
+    # $/MWh at which load is shed, so that outages never make a scenario infeasible
+    value_of_lost_load: float = Field(10000.0, gt=0)
+    # Scenarios drawn per vectorized sample
+    batch_size: int = Field(1000, ge=1)
+
+
+class NetworkPatch(BaseModel):
+    # Components to add, in the same form as the AnalyzeRequest lists
+    add: Dict[str, List[Dict[str, Any]]] = {}
+    # Changed attributes; each row names the component ("name") and gives only the new values
+    update: Dict[str, List[Dict[str, Any]]] = {}
+    # Names of components to remove
+    remove: Dict[str, List[str]] = {}
+    # Replacement time series for the named components, as in AnalyzeRequest
+    loads_t: Dict[str, Dict[str, List[float]]] = {}
+    generators_t: Dict[str, Dict[str, List[float]]] = {}
+    storage_units_t: Dict[str, Dict[str, List[float]]] = {}
+
+
+def default_max_concurrent_solves() -> int:
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+# Background job queue, created on first use so workers are only spawned when needed
+job_manager = None
+max_concurrent_solves = default_max_concurrent_solves()
+# Pre-warmed solve workers started with the server; 0 solves /api/analyze in-process
+warm_workers = 0
+
+
+def get_job_manager():
+    global job_manager
+    if job_manager is None:
+        from jobs import JobManager
+
+        if warm_workers > 0:
+            job_manager = JobManager(max_workers=warm_workers, warmup=warm_up_worker)
+        else:
+            job_manager = JobManager(max_workers=max_concurrent_solves)
+    return job_manager
+
+
+# Worker processes per request that solves in parallel (batch, split islands,
+# contingency re-solves and Monte Carlo)
+batch_workers = os.cpu_count() or 1
+
+
+# Session-scoped networks kept for incremental re-solves; created on first use
+session_store = None
+max_sessions = 8
+session_ttl = 3600.0
+
+
+def get_session_store():
+    global session_store
+    if session_store is None:
+        from sessions import SessionStore
+
+        session_store = SessionStore(max_sessions=max_sessions, ttl=session_ttl)
+    return session_store
+
 
+# Result cache settings; the cache itself is created on first use
+result_cache = None
+cache_size = 128
+cache_dir: Optional[str] = None
+cache_max_mb = 512
 
-app = FastAPI(title="ResDEEDS Analysis Service", version="0.1.0")
+# JSON request bodies above this size (0 disables) are parsed incrementally,
+# analyzed with inputs released early and answered with a streamed response
+large_payload_mb = 256.0
+
+
+def get_result_cache():
+    """Return the shared result cache, or None when caching is disabled."""
+    global result_cache
+    if result_cache is None and (cache_size > 0 or cache_dir):
+        from cache import ResultCache
+
+        result_cache = ResultCache(
+            max_entries=max(0, cache_size),
+            disk_dir=cache_dir,
+            disk_max_bytes=cache_max_mb * 1024 * 1024,
+        )
+    return result_cache
+
+
+# Exported solved networks served by /api/results; created on first use
+result_store = None
+result_dir: Optional[str] = None
+max_results = 32
+
+
+def get_result_store():
+    global result_store
+    if result_store is None:
+        from result_store import ResultStore
+
+        directory = result_dir or os.path.join(tempfile.gettempdir(), "resdeeds-results")
+        result_store = ResultStore(directory, max_results=max(1, max_results))
+    return result_store
+
+
+# Stage timing histograms served by /api/metrics; created on first use
+metrics_registry = None
+
+
+def get_metrics_registry():
+    global metrics_registry
+    if metrics_registry is None:
+        from metrics import MetricsRegistry
+
+        metrics_registry = MetricsRegistry()
+    return metrics_registry
+
+
+def record_metrics(endpoint: str, result: Dict[str, Any], **stages: float) -> Dict[str, Any]:
+    """Add stages measured outside the analysis (e.g. parsing) to the result's timings and record them."""
+    from metrics import add_stages
+
+    timings = result.get("timings")
+    if timings is not None and stages:
+        timings = add_stages(timings, **stages)
+        result = {**result, "timings": timings}
+    get_metrics_registry().observe(endpoint, result.get("status", "error"), timings)
+    return result
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not dependencies_loaded.is_set():
+        # Fast start: answer health checks while the imports run
+        threading.Thread(target=load_dependencies, name="load-dependencies", daemon=True).start()
+    if warm_workers > 0:
+        get_job_manager().start()
+    yield
+    if job_manager is not None:
+        job_manager.shutdown()
+
+
+app = FastAPI(title="ResDEEDS Analysis Service", version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/api/health")
 def health() -> Dict[str, Any]:
+    if not dependencies_loaded.is_set():
+        return {"status": "ok", "state": "warming"}
+
+    from solvers import installed_solvers
+
     return {
         "status": "ok",
+        "state": "ready",
         "pypsa": bool(pypsa) and pypsa_working,
         "pandas": bool(pd),
         "pypsa_error": pypsa_import_error,
         "pandas_error": pandas_import_error,
+        "solvers": installed_solvers(),
+        "workers": job_manager.stats() if job_manager is not None else None,
     }
 
 
+@app.get("/api/metrics")
+def metrics() -> Response:
+    """Stage duration histograms and request counts in the Prometheus text format."""
+    from metrics import PROMETHEUS_MEDIA_TYPE
+
+    return Response(get_metrics_registry().render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
 # Global server instance for graceful shutdown
 server_instance = None
 shutdown_event = threading.Event()
@@ -84,7 +417,22 @@ def signal_handler(signum, frame):
         server_instance.should_exit = True
 
 
-def build_pypsa_network(payload: AnalyzeRequest):
+class NetworkValidationError(ValueError):
+    """Raised when a payload does not describe a network that can be analyzed."""
+
+
+def normalized_frames(payload: AnalyzeRequest, columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Component and time-series frames of a request with builder defaults applied."""
+    from network_builder import InvalidPayloadError, component_frames
+
+    try:
+        return component_frames(payload, columns)
+    except InvalidPayloadError as e:
+        raise NetworkValidationError(str(e)) from e
+
+
+def build_pypsa_network(payload: AnalyzeRequest, frames: Optional[Dict[str, Any]] = None):
+    load_dependencies()
     if not pypsa or not pd:
         details = []
         if not pypsa and pypsa_import_error:
@@ -96,204 +444,532 @@ def build_pypsa_network(payload: AnalyzeRequest):
             msg = f"{msg} (" + "; ".join(details) + ")"
         raise RuntimeError(msg)
 
-    n = pypsa.Network()
+    from network_builder import build_network
 
-    # Snapshots
-    if payload.snapshots:
-        try:
-            # Accept both strings and timestamps
-            snapshots = pd.to_datetime(payload.snapshots)
-            n.set_snapshots(snapshots)
-        except Exception:
-            # Fallback to a single synthetic snapshot
-            n.set_snapshots(pd.date_range("2024-01-01", periods=1, freq="H"))
-    else:
-        n.set_snapshots(pd.date_range("2024-01-01", periods=1, freq="H"))
-
-    # Buses
-    for bus in payload.buses:
-        n.add(
-            "Bus",
-            bus.get("name") or bus.get("id") or str(len(n.buses)),
-            v_nom=bus.get("v_nom") if bus.get("v_nom") is not None else 110,
-            carrier=bus.get("carrier") if bus.get("carrier") is not None else "AC",
-            x=bus.get("x"),
-            y=bus.get("y"),
-        )
+    if frames is None:
+        frames = normalized_frames(payload)
+    return build_network(frames, payload.snapshots, payload.investment_periods, payload.discount_rate)
 
-    # Generators
-    for gen in payload.generators:
-        n.add(
-            "Generator",
-            gen.get("name") or gen.get("id") or f"gen_{len(n.generators)}",
-            bus=gen.get("bus") if gen.get("bus") is not None else "",
-            p_nom=gen.get("p_nom") if gen.get("p_nom") is not None else 0,
-            p_nom_extendable=bool(gen.get("p_nom_extendable") if gen.get("p_nom_extendable") is not None else False),
-            carrier=gen.get("carrier") if gen.get("carrier") is not None else "generic",
-            marginal_cost=gen.get("marginal_cost") if gen.get("marginal_cost") is not None else 1,  # 0.001 $/kWh converted to $/MWh
-            capital_cost=gen.get("capital_cost") if gen.get("capital_cost") is not None else 0,
-            control=gen.get("control") if gen.get("control") is not None else "PQ",
-        )
 
-    # Loads
-    for load in payload.loads:
-        n.add(
-            "Load",
-            load.get("name") or load.get("id") or f"load_{len(n.loads)}",
-            bus=load.get("bus") if load.get("bus") is not None else "",
-            p_set=load.get("p_set") if load.get("p_set") is not None else 0,
-            q_set=load.get("q_set") if load.get("q_set") is not None else 0,
+def dependency_error() -> Optional[str]:
+    """Describe missing or broken analysis dependencies, or None if usable."""
+    load_dependencies()
+    if pypsa and pd and pypsa_working:
+        return None
+
+    details = []
+    if not pypsa and pypsa_import_error:
+        details.append(f"pypsa import error: {pypsa_import_error}")
+    if not pd and pandas_import_error:
+        details.append(f"pandas import error: {pandas_import_error}")
+    if pypsa and not pypsa_working and pypsa_import_error:
+        details.append(f"pypsa functionality error: {pypsa_import_error}")
+
+    msg = "Python dependencies missing or not working. Ensure 'pypsa' and 'pandas' are properly installed."
+    if details:
+        msg = f"{msg} (" + "; ".join(details) + ")"
+    return msg
+
+
+def solve_options(payload: AnalyzeRequest, solver_log: Optional[str] = None) -> Dict[str, Any]:
+    """Solver name and options for ``n.optimize`` from the request's solver settings."""
+    from solvers import SolverConfigError, solver_kwargs
+
+    try:
+        kwargs = solver_kwargs(
+            payload.solver,
+            threads=payload.threads,
+            time_limit=payload.time_limit,
+            mip_gap=payload.mip_gap,
+            tolerance=payload.tolerance,
+            options=payload.solver_options,
         )
+    except SolverConfigError as e:
+        raise NetworkValidationError(str(e)) from e
+    if solver_log and kwargs["solver_name"] == "highs":
+        kwargs["log_file"] = solver_log
+    return kwargs
+
+
+# Callback receiving (event name, data) as analysis stages complete
+EmitFn = Callable[[str, Dict[str, Any]], None]
+
+
+def optimize_network(
+    n,
+    emit: Optional[EmitFn] = None,
+    reuse_model: bool = False,
+    timer: Optional["StageTimer"] = None,
+    snapshots=None,
+    **solve_kwargs: Any,
+):
+    """Run the LOPF, building the model and solving it as separate stages.
+
+    With ``reuse_model`` the existing ``n.model`` is solved again as is.
+    ``timer`` records the "model" and "solve" stages. ``snapshots``
+    limits the model to a subset; a network with investment periods is
+    optimized over all of them at once.
+    """
+    from metrics import StageTimer
+
+    timer = timer or StageTimer()
+    if not reuse_model:
+        with timer.stage("model"):
+            m = n.optimize.create_model(snapshots=snapshots, multi_investment_periods=not n.investment_periods.empty)
+        if emit is not None:
+            emit("model_built", {"variables": int(m.nvars), "constraints": int(m.ncons)})
+    if emit is not None:
+        emit("solver_started", {})
+    with timer.stage("solve"):
+        return n.optimize.solve_model(**solve_kwargs)
+
 
-    # Lines
-    for line in payload.lines:
-        n.add(
-            "Line",
-            line.get("name") or line.get("id") or f"line_{len(n.lines)}",
-            bus0=line.get("bus0"),
-            bus1=line.get("bus1"),
-            r=line.get("r") if line.get("r") is not None else 0.01,
-            x=line.get("x") if line.get("x") is not None else 0.1,
-            s_nom=line.get("s_nom") if line.get("s_nom") is not None else 0,
-            s_nom_extendable=bool(line.get("s_nom_extendable") if line.get("s_nom_extendable") is not None else False),
-            length=line.get("length"),
-            capital_cost=line.get("capital_cost"),
-            s_max_pu=line.get("s_max_pu"),
+def run_analysis(
+    payload: AnalyzeRequest,
+    frames: Optional[Dict[str, Any]] = None,
+    emit: Optional[EmitFn] = None,
+    solver_log: Optional[str] = None,
+    result_store: Optional["ResultStore"] = None,
+) -> Dict[str, Any]:
+    """Build, optimize and summarize a network.
+
+    Runs either in the request thread or inside a job worker process.
+    ``frames`` are the already normalized component frames, if available.
+    ``emit`` is called with each stage and result section as soon as it is
+    ready, and ``solver_log`` asks the solver to write its log to that file.
+    ``result_store`` receives the solved network of requests with
+    ``export_result`` (worker processes do not see the server's settings).
+    """
+    from metrics import StageTimer
+
+    timer = StageTimer()
+    solve_kwargs = solve_options(payload, solver_log)
+    if frames is None:
+        with timer.stage("normalize"):
+            frames = normalized_frames(payload)
+    with timer.stage("build"):
+        n = build_pypsa_network(payload, frames)
+    return analyze_network(
+        n,
+        payload,
+        solve_kwargs,
+        emit,
+        frames=frames if payload.split_islands else None,
+        timer=timer,
+        keep_model=False,
+        result_store=result_store,
+    )
+
+
+def optimize_islands(n, topology: Dict[str, Any], frames: Dict[str, Any], payload: AnalyzeRequest, solve_kwargs: Dict[str, Any]):
+    """Solve every island of ``n`` separately and merge the results into ``n``.
+
+    Returns ``(status, condition)`` like ``n.optimize``; the objective is
+    the sum over islands.
+    """
+    from topology import island_frames, merge_island_results, solve_islands
+
+    islands = topology["islands"]
+    parts = [island_frames(frames, island["buses"]) for island in islands]
+    # Island solves run concurrently and would overwrite each other's log
+    island_kwargs = {key: value for key, value in solve_kwargs.items() if key != "log_file"}
+    results: List[Optional[Dict[str, Any]]] = [None] * len(parts)
+    for index, result in solve_islands(parts, payload.snapshots, island_kwargs, batch_workers):
+        if result["status"] != "ok":
+            detail = result.get("error") or f"status: {result['status']}, termination condition: {result.get('termination_condition')}"
+            raise RuntimeError(f"island {islands[index]['id']} failed ({detail})")
+        results[index] = result
+    merge_island_results(n, results)
+    conditions = {result["termination_condition"] for result in results}
+    return "ok", conditions.pop() if len(conditions) == 1 else ",".join(sorted(conditions))
+
+
+def optimize_rolling(
+    n, payload: AnalyzeRequest, emit: Optional[EmitFn], timer: "StageTimer", solve_kwargs: Dict[str, Any]
+):
+    """Dispatch ``n`` in rolling-horizon windows; returns ``(status, condition)`` like ``n.optimize``."""
+    from planning import extendable_components, optimize_rolling_horizon, operational_cost
+
+    extendable = extendable_components(n)
+    if extendable:
+        details = "; ".join(f"{field}: {', '.join(names[:10])}" for field, names in extendable.items())
+        raise NetworkValidationError(
+            f"rolling_horizon dispatches fixed capacities; these are extendable ({details})"
         )
 
-    # Storage Units
-    for su in payload.storage_units:
-        n.add(
-            "StorageUnit",
-            su.get("name") or su.get("id") or f"storage_{len(n.storage_units)}",
-            bus=su.get("bus") if su.get("bus") is not None else "",
-            p_nom=su.get("p_nom") if su.get("p_nom") is not None else 0,
-            p_nom_extendable=bool(su.get("p_nom_extendable") if su.get("p_nom_extendable") is not None else False),
-            max_hours=su.get("max_hours") if su.get("max_hours") is not None else 4,
-            efficiency_store=su.get("efficiency_store") if su.get("efficiency_store") is not None else (su.get("efficiency") if su.get("efficiency") is not None else 0.9),
-            efficiency_dispatch=su.get("efficiency_dispatch") if su.get("efficiency_dispatch") is not None else (su.get("efficiency") if su.get("efficiency") is not None else 0.9),
-            capital_cost=su.get("capital_cost") if su.get("capital_cost") is not None else 0,
-            cyclic_state_of_charge=bool(su.get("cyclic_state_of_charge") if su.get("cyclic_state_of_charge") is not None else True),
+    def on_window(window: int, windows: int, first, last) -> None:
+        if emit is not None:
+            emit("window", {"window": window, "windows": windows, "first": str(first), "last": str(last)})
+
+    status, condition = optimize_rolling_horizon(
+        n,
+        payload.rolling_horizon,
+        payload.rolling_overlap,
+        lambda snapshots: optimize_network(n, emit, timer=timer, snapshots=snapshots, **solve_kwargs),
+        on_window,
+    )
+    if status == "ok":
+        n.objective = operational_cost(n)
+    return status, condition
+
+
+def snapshot_labels(snapshots) -> List[str]:
+    """Snapshots as strings; timesteps only for snapshots with investment periods."""
+    if getattr(snapshots, "nlevels", 1) > 1:
+        snapshots = snapshots.get_level_values(-1)
+    return [str(s) for s in snapshots]
+
+
+def analyze_network(
+    n,
+    payload: AnalyzeRequest,
+    solve_kwargs: Dict[str, Any],
+    emit: Optional[EmitFn] = None,
+    reuse_model: bool = False,
+    frames: Optional[Dict[str, Any]] = None,
+    timer: Optional["StageTimer"] = None,
+    keep_model: bool = True,
+    defer_timeseries: bool = False,
+    result_store: Optional["ResultStore"] = None,
+) -> Dict[str, Any]:
+    """Validate, optimize and summarize an already built network.
+
+    With ``frames`` (the component frames ``n`` was built from) a network
+    with more than one island is solved island by island. Stage durations
+    are added to ``timer`` and returned under "timings". Without
+    ``keep_model`` the optimization model is dropped once solved, and with
+    ``defer_timeseries`` "timeseries" is left for the caller to stream
+    from ``n``. With ``export_result`` the solved network is saved to
+    ``result_store`` (the server's store by default) and its id returned
+    under "result_id". With ``spatial`` a reduced copy of ``n`` is solved
+    and its solution written back onto ``n``.
+    """
+    from metrics import StageTimer
+    from topology import analyze_topology, unsupplied_islands
+
+    notify = emit or (lambda event, data: None)
+    timer = timer or StageTimer()
+    timer.network = {"buses": len(n.buses), "snapshots": len(n.snapshots)}
+
+    # Validate minimal completeness
+    if n.buses.empty:
+        raise NetworkValidationError("Network must contain at least one bus")
+    if n.loads.empty and n.generators.empty and n.storage_units.empty:
+        raise NetworkValidationError("Network must contain at least one component (load/generator/storage)")
+
+    notify("network_built", {
+        "buses": len(n.buses),
+        "generators": len(n.generators),
+        "loads": len(n.loads),
+        "lines": len(n.lines),
+        "storage_units": len(n.storage_units),
+        "snapshots": len(n.snapshots),
+    })
+
+    with timer.stage("topology"):
+        topology = analyze_topology(n)
+    notify("topology", topology)
+    unknown_bus = {field: names for field, names in topology["dangling"].items() if field != "buses"}
+    if unknown_bus:
+        details = "; ".join(f"{field}: {', '.join(names[:10])}" for field, names in unknown_bus.items())
+        raise NetworkValidationError(f"Components refer to unknown buses ({details})")
+    unsupplied = unsupplied_islands(topology)
+    if unsupplied:
+        names = ", ".join(", ".join(island["buses"][:3]) for island in unsupplied[:5])
+        raise NetworkValidationError(
+            f"{len(unsupplied)} island(s) have load but no generation to supply it (buses: {names})"
         )
 
-    return n
+    full, spatial = n, None
+    if payload.spatial is not None:
+        from spatial import reduce_network
+
+        with timer.stage("spatial"):
+            try:
+                spatial = reduce_network(n, **payload.spatial.model_dump())
+            except ValueError as error:
+                raise NetworkValidationError(str(error))
+        notify("spatial_reduction", spatial.metrics)
+        # Everything up to the disaggregation works on the reduced network
+        n = spatial.network
+
+    reduction = None
+    if payload.temporal is not None:
+        from temporal import reduce_snapshots
 
+        with timer.stage("temporal"):
+            reduction = reduce_snapshots(n, **payload.temporal.model_dump())
+        notify("temporal_reduction", reduction.metrics)
 
-@app.post("/api/analyze")
-def analyze(payload: AnalyzeRequest) -> Dict[str, Any]:
+    print(f"Running optimization for network with {len(n.buses)} buses, {len(n.generators)} generators, {len(n.loads)} loads")
+
+    # Run linear optimization (LOPF) with timeout handling
     try:
-        # Check dependencies first
-        if not pypsa or not pd or not pypsa_working:
-            details = []
-            if not pypsa and pypsa_import_error:
-                details.append(f"pypsa import error: {pypsa_import_error}")
-            if not pd and pandas_import_error:
-                details.append(f"pandas import error: {pandas_import_error}")
-            if pypsa and not pypsa_working and pypsa_import_error:
-                details.append(f"pypsa functionality error: {pypsa_import_error}")
-
-            msg = "Python dependencies missing or not working. Ensure 'pypsa' and 'pandas' are properly installed."
-            if details:
-                msg = f"{msg} (" + "; ".join(details) + ")"
-            return {"status": "error", "error": msg}
-
-        n = build_pypsa_network(payload)
-
-        # Validate minimal completeness
-        if n.buses.empty:
-            raise HTTPException(status_code=400, detail="Network must contain at least one bus")
-        if n.loads.empty and n.generators.empty and n.storage_units.empty:
-            raise HTTPException(status_code=400, detail="Network must contain at least one component (load/generator/storage)")
-
-        print(f"Running optimization for network with {len(n.buses)} buses, {len(n.generators)} generators, {len(n.loads)} loads")
-
-        # Run linear optimization (LOPF) with timeout handling
-        try:
-            # For basic networks, we can skip optimization if PyPSA's solver isn't fully configured
-            # and just return the network structure
-            n.optimize()
-            print("Optimization completed successfully")
-        except Exception as opt_error:
-            print(f"Optimization failed: {opt_error}")
-            return {
-                "status": "error",
-                "error": f"PyPSA optimization failed: {opt_error}. This usually indicates missing solver dependencies or network configuration issues."
-            }
+        if payload.rolling_horizon is not None:
+            # Every window builds its own model
+            status, condition = optimize_rolling(n, payload, emit, timer, solve_kwargs)
+        elif frames is not None and not reuse_model and len(topology["islands"]) > 1:
+            with timer.stage("solve"):
+                status, condition = optimize_islands(n, topology, frames, payload, solve_kwargs)
+        else:
+            status, condition = optimize_network(n, emit, reuse_model, timer, **solve_kwargs)
+    except NetworkValidationError:
+        raise
+    except Exception as opt_error:
+        print(f"Optimization failed: {opt_error}")
+        return {
+            "status": "error",
+            "error": f"PyPSA optimization failed: {opt_error}. This usually indicates missing solver dependencies or network configuration issues.",
+            "timings": timer.report(),
+        }
+    finally:
+        if reduction is not None:
+            from temporal import expand_snapshots
 
-        # Gather results
-        objective = getattr(n, "objective", None)
-
-        # Capacities
-        def series_or_empty(df, col):
-            return df[col] if (col in df.columns) else None
-
-        capacities = {
-            "generators": (
-                n.generators[["p_nom"]]
-                .assign(p_nom_opt=series_or_empty(n.generators, "p_nom_opt"))
-                .reset_index()
-                .rename(columns={"index": "name"})
-                .to_dict(orient="records")
-            ) if not n.generators.empty else [],
-            "lines": (
-                n.lines[["s_nom"]]
-                .assign(s_nom_opt=series_or_empty(n.lines, "s_nom_opt"))
-                .reset_index()
-                .rename(columns={"index": "name"})
-                .to_dict(orient="records")
-            ) if not n.lines.empty else [],
-            "storage_units": (
-                n.storage_units[["p_nom", "max_hours"]]
-                .assign(p_nom_opt=series_or_empty(n.storage_units, "p_nom_opt"))
-                .reset_index()
-                .rename(columns={"index": "name"})
-                .to_dict(orient="records")
-            ) if not n.storage_units.empty else [],
+            # The model covers the reduced snapshots only
+            if n.model is not None:
+                del n.model
+            with timer.stage("temporal"):
+                expand_snapshots(n, reduction)
+    if status != "ok":
+        print(f"Optimization did not finish: {status} ({condition})")
+        return {
+            "status": "error",
+            "error": f"Optimization did not find a solution (status: {status}, termination condition: {condition})",
+            "termination_condition": condition,
+            "timings": timer.report(),
         }
+    print("Optimization completed successfully")
 
-        # Power flows and dispatch at the first snapshot for brevity
-        if len(n.snapshots) > 0:
-            snap = n.snapshots[0]
-        else:
-            snap = None
-
-        power = {
-            "generators": (
-                n.generators_t.p.loc[snap].reset_index().rename(columns={"index": "name", snap: "p"}).to_dict(orient="records")
-                if hasattr(n, "generators_t") and hasattr(n.generators_t, "p") and snap is not None else []
-            ),
-            "loads": (
-                n.loads_t.p.loc[snap].reset_index().rename(columns={"index": "name", snap: "p"}).to_dict(orient="records")
-                if hasattr(n, "loads_t") and hasattr(n.loads_t, "p") and snap is not None else []
-            ),
-            "lines": (
-                n.lines_t.p0.loc[snap].reset_index().rename(columns={"index": "name", snap: "p0"}).to_dict(orient="records")
-                if hasattr(n, "lines_t") and hasattr(n.lines_t, "p0") and snap is not None else []
-            ),
-            "buses": (
-                n.buses_t.p.loc[snap].reset_index().rename(columns={"index": "name", snap: "p"}).to_dict(orient="records")
-                if hasattr(n, "buses_t") and hasattr(n.buses_t, "p") and snap is not None else []
-            ),
+    if spatial is not None:
+        from spatial import disaggregate
+
+        with timer.stage("spatial"):
+            disaggregate(full, spatial)
+        n = full
+
+    # Gather results
+    objective = getattr(n, "objective", None)
+    if not keep_model and n.model is not None:
+        # The solution is on the network now; the model is the largest object left
+        del n.model
+    notify("solved", {"objective": objective})
+    results_started = time.perf_counter()
+
+    from results import extract_results, statistics
+
+    projection = payload.projection or ResultProjection()
+    sections = [section for section in ("capacities", "power") if projection.includes(section)]
+    if payload.include_timeseries and not defer_timeseries and projection.includes("timeseries"):
+        sections.append("timeseries")
+    extracted = extract_results(n, sections, projection.components, projection.attributes)
+    for section, content in extracted.items():
+        notify(section, content)
+
+    timer.add("results", time.perf_counter() - results_started)
+
+    if projection.includes("statistics"):
+        with timer.stage("statistics"):
+            extracted["statistics"] = statistics(n, projection.components, projection.attributes)
+        notify("statistics", extracted["statistics"])
+
+    result_id = None
+    if payload.export_result:
+        with timer.stage("export"):
+            store = result_store or get_result_store()
+            result_id = store.save(n, {"objective": objective, "termination_condition": condition})
+        notify("exported", {"result_id": result_id})
+
+    result = {
+        "status": "ok",
+        "objective": objective,
+        "solver": solve_kwargs["solver_name"],
+        "termination_condition": condition,
+        "capacities": extracted.get("capacities"),
+        "power": extracted.get("power"),
+        "snapshots": snapshot_labels(n.snapshots),
+        "statistics": extracted.get("statistics"),
+        "topology": topology,
+        "timings": timer.report(),
+    }
+    for section in ("capacities", "power", "snapshots", "statistics", "topology"):
+        if not projection.includes(section):
+            del result[section]
+    if "timeseries" in extracted:
+        result["timeseries"] = extracted["timeseries"]
+    if not n.investment_periods.empty:
+        from planning import investment_period_summary
+
+        if projection.includes("snapshots"):
+            result["snapshot_periods"] = [int(p) for p in n.snapshots.get_level_values(0)]
+        result["investment_periods"] = investment_period_summary(n)
+    if reduction is not None:
+        result["temporal_reduction"] = reduction.metrics
+    if spatial is not None:
+        result["spatial_reduction"] = spatial.metrics
+    if payload.rolling_horizon is not None:
+        from planning import rolling_windows
+
+        windows = rolling_windows(len(n.snapshots), payload.rolling_horizon, payload.rolling_overlap)
+        result["rolling_horizon"] = {
+            "horizon": payload.rolling_horizon,
+            "overlap": payload.rolling_overlap,
+            "windows": len(windows),
         }
+    if result_id is not None:
+        result["result_id"] = result_id
+    return result
+
 
-        stats = {}
+# Tiny network solved once by every warm worker before it takes jobs
+WARMUP_PAYLOAD = {
+    "buses": [{"name": "bus"}],
+    "generators": [{"name": "gen", "bus": "bus", "p_nom": 1}],
+    "loads": [{"name": "load", "bus": "bus", "p_set": 0.5}],
+    "storage_units": [{"name": "storage", "bus": "bus", "p_nom": 1}],
+}
+
+
+def warm_up_worker() -> None:
+    """Import the solver stack and run a throwaway solve in a worker process."""
+    import warnings
+
+    warnings.simplefilter("ignore")
+    started = time.perf_counter()
+    result = run_analysis(AnalyzeRequest(**WARMUP_PAYLOAD))
+    if result.get("status") != "ok":
+        raise RuntimeError(result.get("error"))
+    print(f"Worker {os.getpid()} warmed up in {time.perf_counter() - started:.2f}s")
+
+
+def solve_analysis(payload: AnalyzeRequest, frames: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run an analysis on the warm worker pool if enabled, in this thread otherwise."""
+    if warm_workers > 0:
+        return get_job_manager().run(run_analysis, payload, frames, None, None, get_result_store())
+    return run_analysis(payload, frames)
+
+
+def analysis_cache_key(payload: AnalyzeRequest, frames: Dict[str, Any]) -> str:
+    """Cache key of a request, taken after the builder defaults are applied."""
+    from cache import payload_key
+    from network_builder import COMPONENT_SPECS, SERIES_SPECS, parse_snapshots
+
+    # Component lists and time series are hashed through their normalized frames
+    options = payload.model_dump(exclude=set(COMPONENT_SPECS) | set(SERIES_SPECS))
+    options["snapshots"] = [str(s) for s in parse_snapshots(payload.snapshots)]
+    return payload_key(frames, options)
+
+
+def request_body_doc(model: type) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints that parse ``model`` themselves."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                "application/msgpack": {"schema": {"type": "string", "format": "binary"}},
+            },
+        },
+    }
+
+
+ANALYZE_REQUEST_BODY = request_body_doc(AnalyzeRequest)
+
+
+def parse_analyze_body(
+    content_type: Optional[str],
+    body: bytes,
+    model: type = AnalyzeRequest,
+) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """Parse an analyze request sent as JSON (the default) or MessagePack.
+
+    Returns the validated request and, for MessagePack bodies, the columnar
+    component tables and time series, which skip per-row validation.
+    """
+    from encoding import is_msgpack, msgpack, msgpack_import_error, unpackb
+
+    try:
+        if not is_msgpack(content_type):
+            return model.model_validate_json(body), None
+
+        import numpy as np
+        from network_builder import COMPONENT_SPECS, SERIES_SPECS
+
+        if msgpack is None:
+            raise HTTPException(status_code=415, detail=f"MessagePack support is not installed ({msgpack_import_error})")
         try:
-            # Some PyPSA stats helpers
-            s = n.statistics()
-            stats = json.loads(s.to_json()) if hasattr(s, "to_json") else {}
-        except Exception:
-            stats = {}
+            data = unpackb(body)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid MessagePack body: {type(e).__name__}: {e}")
+        if not isinstance(data, dict):
+            raise HTTPException(status_code=400, detail="MessagePack body must be a map")
 
-        return {
-            "status": "ok",
-            "objective": objective,
-            "capacities": capacities,
-            "power": power,
-            "snapshots": [str(s) for s in list(n.snapshots)],
-            "statistics": stats,
-        }
-    except HTTPException:
-        raise
+        columns = {}
+        for field in COMPONENT_SPECS:
+            if isinstance(data.get(field), dict):
+                columns[field] = data.pop(field)
+        for field in SERIES_SPECS:
+            if field in data:
+                columns[field] = data.pop(field)
+        data = {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in data.items()}
+        return model.model_validate(data), columns
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def encode_response(accept: Optional[str], content: Any, status_code: int = 200) -> Response:
+    """Encode a response as MessagePack if the client accepts it, JSON otherwise."""
+    from encoding import MSGPACK_MEDIA_TYPE, accepts_msgpack, msgpack, packb
+    from results import encode_json
+
+    if msgpack is not None and accepts_msgpack(accept):
+        return Response(packb(content), status_code=status_code, media_type=MSGPACK_MEDIA_TYPE)
+    return Response(encode_json(content), status_code=status_code, media_type="application/json")
+
+
+def analyze_payload(payload: AnalyzeRequest, columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    from metrics import StageTimer, add_stages
+
+    try:
+        # Check dependencies first
+        error = dependency_error()
+        if error:
+            return {"status": "error", "error": error}
+
+        cache = get_result_cache()
+        if cache is None and columns is None:
+            return solve_analysis(payload)
+
+        timer = StageTimer()
+        with timer.stage("normalize"):
+            frames = normalized_frames(payload, columns)
+
+        def solve() -> Dict[str, Any]:
+            result = solve_analysis(payload, frames)
+            if "timings" in result:
+                result["timings"] = add_stages(result["timings"], **timer.stages)
+            return result
+
+        if cache is None:
+            return solve()
+
+        with timer.stage("cache"):
+            key = analysis_cache_key(payload, frames)
+            cached = cache.get(key)
+        if cached is not None and "result_id" in cached and not get_result_store().exists(cached["result_id"]):
+            # The exported network has been evicted since
+            cached = None
+        if cached is not None:
+            # Timings of this lookup, not of the solve that filled the cache
+            timings = {**timer.report(), "network": cached.get("timings", {}).get("network", {})}
+            return {**cached, "cached": True, "timings": timings}
+
+        result = solve()
+        if result.get("status") == "ok":
+            cache.put(key, result)
+        return {**result, "cached": False}
+    except NetworkValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {
             "status": "error",
@@ -302,6 +978,731 @@ def analyze(payload: AnalyzeRequest) -> Dict[str, Any]:
         }
 
 
+def is_large_payload(headers) -> bool:
+    """Whether a request body is JSON larger than ``large_payload_mb``."""
+    from encoding import is_msgpack
+
+    try:
+        size = int(headers.get("content-length", ""))
+    except ValueError:
+        return False
+    return large_payload_mb > 0 and size > large_payload_mb * 2**20 and not is_msgpack(headers.get("content-type"))
+
+
+def parse_large_body(text: str) -> Tuple[AnalyzeRequest, Dict[str, Any]]:
+    from incremental import parse_request
+    from network_builder import InvalidPayloadError
+
+    try:
+        return parse_request(text, AnalyzeRequest)
+    except InvalidPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def analyze_large_payload(payload: AnalyzeRequest, columns: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    """Analyze an incrementally parsed request, releasing each input once it has been used.
+
+    Runs in the request thread without the result cache. Returns the
+    result without "timeseries" and the solved network to stream them
+    from (None if there is nothing to stream).
+    """
+    from metrics import StageTimer
+
+    try:
+        error = dependency_error()
+        if error:
+            return {"status": "error", "error": error}, None
+        from solvers import DIRECT_IO_SOLVERS
+
+        timer = StageTimer()
+        solve_kwargs = solve_options(payload)
+        if solve_kwargs["solver_name"] in DIRECT_IO_SOLVERS:
+            # Passing the model in memory avoids writing and parsing an LP file of similar size
+            solve_kwargs.setdefault("io_api", "direct")
+        with timer.stage("normalize"):
+            frames = normalized_frames(payload, columns)
+        # The frames hold their own copies of the parsed rows and series
+        columns.clear()
+        with timer.stage("build"):
+            n = build_pypsa_network(payload, frames)
+        if not payload.split_islands:
+            frames = None
+        result = analyze_network(
+            n, payload, solve_kwargs, frames=frames, timer=timer, keep_model=False, defer_timeseries=True
+        )
+    except NetworkValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        return {"status": "error", "error": str(e), "traceback": traceback.format_exc(limit=3)}, None
+    projection = payload.projection or ResultProjection()
+    if result.get("status") != "ok" or not payload.include_timeseries or not projection.includes("timeseries"):
+        return result, None
+    return result, n
+
+
+async def analyze_large(request: Request, started: float) -> Response:
+    """/api/analyze for a large JSON body: incremental parsing and a streamed response."""
+    import codecs
+
+    # Decode the body as it arrives instead of buffering its bytes, so only
+    # the decoded parts and the text joined from them coexist
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts: List[str] = []
+    try:
+        async for chunk in request.stream():
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    text = "".join(parts)
+    del parts
+    payload, columns = await run_in_threadpool(parse_large_body, text)
+    del text
+    parsed = time.perf_counter() - started
+    result, n = await run_in_threadpool(analyze_large_payload, payload, columns)
+    result = record_metrics("analyze", result, parse=parsed)
+    if n is None:
+        return encode_response(None, result)
+
+    from incremental import stream_object
+    from results import timeseries_json
+
+    projection = payload.projection or ResultProjection()
+    sections = {"timeseries": lambda: timeseries_json(n, projection.components, projection.attributes)}
+    return StreamingResponse(stream_object(result, sections), media_type="application/json")
+
+
+@app.post("/api/analyze", openapi_extra=ANALYZE_REQUEST_BODY)
+async def analyze(request: Request) -> Response:
+    """Run an analysis; accepts and returns JSON or MessagePack.
+
+    Networks that cannot be balanced are rejected with a 400 before any
+    solve: components on unknown buses, and islands (buses connected by
+    active lines) with load but no generator to supply it. The error
+    detail names the buses of up to five such islands. Solved results list
+    every island under "topology", with its "supplied" flag, and
+    ``split_islands`` solves the islands as separate LOPFs.
+
+    JSON bodies above ``--large-payload-mb`` take a memory-bounded path
+    whose JSON response is streamed.
+    """
+    started = time.perf_counter()
+    if is_large_payload(request.headers):
+        return await analyze_large(request, started)
+    body = await request.body()
+    payload, columns = await run_in_threadpool(parse_analyze_body, request.headers.get("content-type"), body)
+    parsed = time.perf_counter() - started
+    result = await run_in_threadpool(analyze_payload, payload, columns)
+    result = record_metrics("analyze", result, parse=parsed)
+    return await run_in_threadpool(encode_response, request.headers.get("accept"), result)
+
+
+def analyze_batch_payload(payload: BatchRequest, columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    error = dependency_error()
+    if error:
+        return {"status": "error", "error": error}
+
+    from batch import InvalidOverrideError, run_batch, validate_overrides
+    from network_builder import COMPONENT_SPECS, SERIES_SPECS
+
+    variants = [[override.model_dump() for override in variant.overrides] for variant in payload.variants]
+    try:
+        solve_kwargs = solve_options(payload)
+        frames = normalized_frames(payload, columns)
+        for overrides in variants:
+            validate_overrides(overrides, frames)
+    except (NetworkValidationError, InvalidOverrideError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The network itself travels to the workers as frames only
+    network_fields = set(COMPONENT_SPECS) | set(SERIES_SPECS)
+    base = AnalyzeRequest(**{
+        field: getattr(payload, field) for field in AnalyzeRequest.model_fields if field not in network_fields
+    })
+
+    started = time.perf_counter()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(variants)
+    store = get_result_store() if payload.export_result else None
+    for index, result in run_batch(base, frames, variants, solve_kwargs, batch_workers, store):
+        variant_id = payload.variants[index].id or str(index)
+        results[index] = {"id": variant_id, **result}
+        print(f"Batch variant {variant_id} finished: {result.get('status')}")
+
+    return {
+        "status": "ok",
+        "variants": len(variants),
+        "workers": max(1, min(batch_workers, len(variants))),
+        "elapsed": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+
+
+@app.post("/api/analyze/batch", openapi_extra=request_body_doc(BatchRequest))
+async def analyze_batch(request: Request) -> Response:
+    """Solve parameter variants of one base network in parallel worker processes."""
+    body = await request.body()
+    payload, columns = await run_in_threadpool(
+        parse_analyze_body, request.headers.get("content-type"), body, BatchRequest
+    )
+    result = await run_in_threadpool(analyze_batch_payload, payload, columns)
+    return await run_in_threadpool(encode_response, request.headers.get("accept"), result)
+
+
+# Seconds between solver progress events on /api/analyze/stream
+STREAM_PROGRESS_INTERVAL = 1.0
+
+
+def _ndjson_line(event: str, data: Any, started: float) -> bytes:
+    line = {"event": event, "elapsed": round(time.perf_counter() - started, 3), "data": data}
+    from results import encode_json
+
+    return encode_json(line) + b"\n"
+
+
+def _read_new_log_lines(path: Optional[str], position: int) -> Tuple[List[str], int]:
+    """Complete lines appended to a solver log since ``position``."""
+    if not path:
+        return [], position
+    try:
+        with open(path, "rb") as f:
+            f.seek(position)
+            chunk = f.read()
+    except OSError:
+        return [], position
+    complete = chunk[: chunk.rfind(b"\n") + 1]
+    lines = [line for line in complete.decode(errors="replace").splitlines() if line.strip()]
+    return lines, position + len(complete)
+
+
+def _solver_log_path(payload: AnalyzeRequest) -> Optional[str]:
+    """Temporary log file for the solver if it can write one (HiGHS)."""
+    from solvers import DEFAULT_SOLVER, installed_solvers
+
+    solver = (payload.solver or DEFAULT_SOLVER).lower()
+    if solver != "highs" or solver not in installed_solvers():
+        return None
+    fd, path = tempfile.mkstemp(prefix="resdeeds-solver-", suffix=".log")
+    os.close(fd)
+    return path
+
+
+async def stream_analysis(payload: AnalyzeRequest, columns: Optional[Dict[str, Any]], parsed: float = 0.0):
+    """Yield NDJSON events while the analysis runs in a background thread.
+
+    Stage events (network_built, topology, model_built, solver_started, solved) and
+    result sections (capacities, power, timeseries, statistics) are sent
+    as soon as they are ready; solver_progress events with new solver log
+    lines are sent while the solver runs. The last event is "done", with
+    the stage timings, or "error". ``parsed`` is the time spent parsing
+    the request body.
+    """
+    started = time.perf_counter()
+    events: "queue.Queue[Optional[Tuple[str, bytes]]]" = queue.Queue()
+    solver_log = _solver_log_path(payload)
+
+    def emit(event: str, data: Dict[str, Any]) -> None:
+        # Serialize in the worker thread to keep large sections off the event loop
+        events.put((event, _ndjson_line(event, data, started)))
+
+    def work() -> None:
+        try:
+            error = dependency_error()
+            if error:
+                emit("error", {"status": "error", "error": error})
+                return
+            normalize_started = time.perf_counter()
+            frames = normalized_frames(payload, columns) if columns else None
+            stages = {"parse": parsed}
+            if frames is not None:
+                stages["normalize"] = time.perf_counter() - normalize_started
+            result = run_analysis(payload, frames, emit=emit, solver_log=solver_log)
+            result = record_metrics("stream", result, **stages)
+            if result.get("status") == "ok":
+                emit("done", {
+                    "status": "ok",
+                    "objective": result.get("objective"),
+                    "snapshots": result.get("snapshots"),
+                    "timings": result.get("timings"),
+                    **({"result_id": result["result_id"]} if "result_id" in result else {}),
+                })
+            else:
+                emit("error", result)
+        except NetworkValidationError as e:
+            emit("error", {"status": "error", "error": str(e), "status_code": 400})
+        except Exception as e:
+            emit("error", {"status": "error", "error": str(e), "traceback": traceback.format_exc(limit=3)})
+        finally:
+            events.put(None)
+
+    threading.Thread(target=work, name="analysis-stream", daemon=True).start()
+
+    solving = False
+    log_position = 0
+    try:
+        while True:
+            try:
+                item = await run_in_threadpool(events.get, True, STREAM_PROGRESS_INTERVAL)
+            except queue.Empty:
+                if solving:
+                    log_lines, log_position = _read_new_log_lines(solver_log, log_position)
+                    yield _ndjson_line("solver_progress", {"log": log_lines}, started)
+                continue
+            if item is None:
+                break
+            event, line = item
+            if event == "solver_started":
+                solving = True
+            elif event == "solved":
+                solving = False
+            yield line
+    finally:
+        if solver_log:
+            try:
+                os.remove(solver_log)
+            except OSError:
+                pass
+
+
+@app.post("/api/analyze/stream", openapi_extra=ANALYZE_REQUEST_BODY)
+async def analyze_stream(request: Request) -> StreamingResponse:
+    """Run an analysis, streaming progress and result sections as NDJSON."""
+    started = time.perf_counter()
+    body = await request.body()
+    payload, columns = await run_in_threadpool(parse_analyze_body, request.headers.get("content-type"), body)
+    parsed = time.perf_counter() - started
+    return StreamingResponse(stream_analysis(payload, columns, parsed), media_type="application/x-ndjson")
+
+
+def queue_analysis(payload: AnalyzeRequest, columns: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    error = dependency_error()
+    if error:
+        raise HTTPException(status_code=503, detail=error)
+
+    try:
+        # Reject unknown solvers and bad options before queueing
+        solve_options(payload)
+        # Columnar tables are normalized here so only frames cross into the worker
+        frames = normalized_frames(payload, columns) if columns else None
+    except NetworkValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = get_job_manager().submit(run_analysis, payload, frames, None, None, get_result_store())
+    return job.to_dict()
+
+
+@app.post("/api/jobs", status_code=202, openapi_extra=ANALYZE_REQUEST_BODY)
+async def submit_job(request: Request) -> Response:
+    """Queue an analysis and return its job id immediately."""
+    body = await request.body()
+    payload, columns = await run_in_threadpool(parse_analyze_body, request.headers.get("content-type"), body)
+    job = await run_in_threadpool(queue_analysis, payload, columns)
+    return encode_response(request.headers.get("accept"), job, status_code=202)
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str, request: Request) -> Response:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return encode_response(request.headers.get("accept"), job.to_dict())
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a queued or running job, or discard a finished one."""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict(include_result=False)
+
+
+def powerflow_payload(payload: PowerFlowRequest, columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    error = dependency_error()
+    if error:
+        return {"status": "error", "error": error}
+
+    from powerflow import parallel_powerflow, powerflow_frames
+    from results import columnar_series
+
+    try:
+        frames = normalized_frames(payload, columns)
+        n = build_pypsa_network(payload, frames)
+    except NetworkValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n.buses.empty:
+        raise HTTPException(status_code=400, detail="Network must contain at least one bus")
+
+    workers = min(payload.workers, os.cpu_count() or 1, len(n.snapshots))
+    started = time.perf_counter()
+    try:
+        if payload.mode == "ac" and workers > 1:
+            results = parallel_powerflow(frames, payload.snapshots, len(n.snapshots), payload.mode, workers)
+        else:
+            results = powerflow_frames(n, payload.mode)
+    except Exception as e:
+        return {"status": "error", "error": f"Power flow failed: {e}", "traceback": traceback.format_exc(limit=3)}
+
+    out: Dict[str, Any] = {
+        "status": "ok",
+        "mode": payload.mode,
+        "elapsed": round(time.perf_counter() - started, 4),
+        "snapshots": [str(s) for s in n.snapshots],
+    }
+    if "converged" in results:
+        out["converged"] = results.pop("converged")["converged"].astype(bool).tolist()
+        out["iterations"] = results.pop("iterations")["iterations"].astype(int).tolist()
+        if not all(out["converged"]):
+            out["status"] = "warning"
+            out["warning"] = "AC power flow did not converge for every snapshot"
+    for key, frame in results.items():
+        section, attr = key.split(".", 1)
+        out.setdefault(section, {})[attr] = columnar_series(frame)
+    return out
+
+
+@app.post("/api/powerflow", openapi_extra=request_body_doc(PowerFlowRequest))
+async def powerflow(request: Request) -> Response:
+    """Run a linear or AC power flow for the given dispatch, without optimization."""
+    body = await request.body()
+    payload, columns = await run_in_threadpool(
+        parse_analyze_body, request.headers.get("content-type"), body, PowerFlowRequest
+    )
+    result = await run_in_threadpool(powerflow_payload, payload, columns)
+    return await run_in_threadpool(encode_response, request.headers.get("accept"), result)
+
+
+def contingency_payload(payload: ContingencyRequest, columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    error = dependency_error()
+    if error:
+        return {"status": "error", "error": error}
+
+    from batch import run_batch
+    from contingency import InvalidContingencyError, line_ratings, screen_contingencies
+    from network_builder import COMPONENT_SPECS, SERIES_SPECS
+    from powerflow import linear_powerflow
+
+    try:
+        solve_kwargs = solve_options(payload)
+        frames = normalized_frames(payload, columns)
+        n = build_pypsa_network(payload, frames)
+    except NetworkValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n.lines.empty:
+        raise HTTPException(status_code=400, detail="Network must contain at least one line")
+
+    started = time.perf_counter()
+    optimized = payload.base == "optimize"
+    if optimized:
+        try:
+            status, condition = optimize_network(n, **solve_kwargs)
+        except Exception as e:
+            return {"status": "error", "error": f"PyPSA optimization failed: {e}"}
+        if status != "ok":
+            return {
+                "status": "error",
+                "error": f"Optimization did not find a solution (status: {status}, termination condition: {condition})",
+                "termination_condition": condition,
+            }
+        flows = n.lines_t.p0.reindex(columns=n.lines.index, fill_value=0.0)
+    else:
+        flows = linear_powerflow(n, n.snapshots)["lines.p0"]
+    base_elapsed = time.perf_counter() - started
+
+    try:
+        screen = screen_contingencies(
+            n, flows, line_ratings(n, n.snapshots, optimized), payload.outages, payload.threshold
+        )
+    except InvalidContingencyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    screen_elapsed = time.perf_counter() - started - base_elapsed
+
+    # Only contingencies that overload a line need a re-dispatch; islanded load is lost either way
+    failing = [c for c in screen["contingencies"] if c["overloads"]] if payload.resolve else []
+    if failing:
+        variants = [
+            [{"component": "lines", "attribute": "active", "value": False, "names": [c["line"]]}]
+            for c in failing
+        ]
+        network_fields = set(COMPONENT_SPECS) | set(SERIES_SPECS)
+        base = AnalyzeRequest(**{
+            field: getattr(payload, field)
+            for field in AnalyzeRequest.model_fields
+            if field not in network_fields and field != "include_timeseries"
+        })
+        base.include_timeseries = False
+        # Only the status and objective of a re-dispatch are reported
+        base.projection = ResultProjection(sections=[])
+        for index, result in run_batch(base, frames, variants, solve_kwargs, batch_workers):
+            failing[index]["resolve"] = {
+                key: result[key]
+                for key in ("status", "objective", "termination_condition", "error")
+                if key in result
+            }
+
+    return {
+        "status": "ok",
+        "base": payload.base,
+        "threshold": payload.threshold,
+        "elapsed": {
+            "base": round(base_elapsed, 4),
+            "screening": round(screen_elapsed, 4),
+            "total": round(time.perf_counter() - started, 4),
+        },
+        **screen,
+    }
+
+
+@app.post("/api/contingency", openapi_extra=request_body_doc(ContingencyRequest))
+async def contingency(request: Request) -> Response:
+    """Screen all single-line outages (N-1) with PTDF/LODF sensitivities."""
+    body = await request.body()
+    payload, columns = await run_in_threadpool(
+        parse_analyze_body, request.headers.get("content-type"), body, ContingencyRequest
+    )
+    result = await run_in_threadpool(contingency_payload, payload, columns)
+    return await run_in_threadpool(encode_response, request.headers.get("accept"), result)
+
+
+def prepare_montecarlo(payload: MonteCarloRequest, columns: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate a Monte Carlo request and collect the arguments of ``run_montecarlo``."""
+    error = dependency_error()
+    if error:
+        raise HTTPException(status_code=503, detail=error)
+    from montecarlo import InvalidFailureError, failure_table, rebuild_mask
+    from solvers import DIRECT_IO_SOLVERS
+
+    try:
+        solve_kwargs = solve_options(payload)
+        frames = normalized_frames(payload, columns)
+        components, probabilities = failure_table(payload.failure_probabilities, frames)
+    except (NetworkValidationError, InvalidFailureError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not components:
+        raise HTTPException(status_code=400, detail="No component has a failure probability above 0")
+    if frames["buses"].empty:
+        raise HTTPException(status_code=400, detail="Network must contain at least one bus")
+    if solve_kwargs["solver_name"] in DIRECT_IO_SOLVERS:
+        solve_kwargs["io_api"] = "direct"
+
+    return {
+        "frames": frames,
+        "snapshots": payload.snapshots,
+        "components": components,
+        "probabilities": probabilities,
+        "rebuild": rebuild_mask(components, frames),
+        "scenarios": payload.scenarios,
+        "seed": payload.seed,
+        "batch_size": payload.batch_size,
+        "solve_kwargs": solve_kwargs,
+        "value_of_lost_load": payload.value_of_lost_load,
+        "max_workers": batch_workers,
+        "progress_interval": STREAM_PROGRESS_INTERVAL,
+    }
+
+
+def stream_montecarlo(arguments: Dict[str, Any]) -> Iterator[bytes]:
+    """NDJSON events of a Monte Carlo run: "sampled", "progress" while solving, then "done" or "error"."""
+    from montecarlo import run_montecarlo
+
+    started = time.perf_counter()
+    try:
+        for event, data in run_montecarlo(**arguments):
+            yield _ndjson_line(event, data, started)
+    except Exception as e:
+        yield _ndjson_line("error", {"status": "error", "error": str(e), "traceback": traceback.format_exc(limit=3)}, started)
+
+
+@app.post("/api/montecarlo", openapi_extra=request_body_doc(MonteCarloRequest))
+async def montecarlo(request: Request) -> StreamingResponse:
+    """Solve randomly sampled outage scenarios, streaming aggregate resilience statistics as NDJSON."""
+    body = await request.body()
+    payload, columns = await run_in_threadpool(
+        parse_analyze_body, request.headers.get("content-type"), body, MonteCarloRequest
+    )
+    arguments = await run_in_threadpool(prepare_montecarlo, payload, columns)
+    return StreamingResponse(stream_montecarlo(arguments), media_type="application/x-ndjson")
+
+
+def create_session(payload: AnalyzeRequest, columns: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    error = dependency_error()
+    if error:
+        raise HTTPException(status_code=503, detail=error)
+    from metrics import StageTimer
+    from solvers import DIRECT_IO_SOLVERS
+
+    timer = StageTimer()
+    try:
+        solve_kwargs = solve_options(payload)
+        if solve_kwargs["solver_name"] in DIRECT_IO_SOLVERS:
+            # Re-solves skip writing and parsing an LP file
+            solve_kwargs.setdefault("io_api", "direct")
+        with timer.stage("normalize"):
+            frames = normalized_frames(payload, columns)
+        with timer.stage("build"):
+            n = build_pypsa_network(payload, frames)
+        result = analyze_network(n, payload, solve_kwargs, timer=timer)
+    except NetworkValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session = get_session_store().create(n, payload, solve_kwargs)
+    return {**result, "session_id": session.id, "revision": session.revision}
+
+
+def get_session_or_404(session_id: str):
+    session = get_session_store().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return session
+
+
+def patch_session(session_id: str, patch: NetworkPatch) -> Dict[str, Any]:
+    from metrics import StageTimer
+    from sessions import InvalidPatchError, copy_network, patch_network
+
+    session = get_session_or_404(session_id)
+    timer = StageTimer()
+    with session.lock:
+        started = time.perf_counter()
+        # A rejected or unsolved patch leaves the session at its last revision
+        previous = copy_network(session.network)
+        try:
+            with timer.stage("patch"):
+                reuse_model = patch_network(session.network, patch.model_dump())
+            result = analyze_network(
+                session.network, session.payload, session.solve_kwargs, reuse_model=reuse_model, timer=timer
+            )
+        except (InvalidPatchError, NetworkValidationError) as e:
+            session.network = previous
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception:
+            session.network = previous
+            raise
+        if result["status"] != "ok":
+            session.network = previous
+            return {**result, "session_id": session.id, "revision": session.revision, "model_reused": reuse_model}
+        session.revision += 1
+        print(f"Session {session_id} revision {session.revision} solved in {time.perf_counter() - started:.2f}s "
+              f"({'model updated in place' if reuse_model else 'model rebuilt'})")
+        return {**result, "session_id": session.id, "revision": session.revision, "model_reused": reuse_model}
+
+
+@app.post("/api/sessions", status_code=201, openapi_extra=ANALYZE_REQUEST_BODY)
+async def start_session(request: Request) -> Response:
+    """Build and solve a network and keep it on the server for incremental edits."""
+    started = time.perf_counter()
+    body = await request.body()
+    payload, columns = await run_in_threadpool(parse_analyze_body, request.headers.get("content-type"), body)
+    parsed = time.perf_counter() - started
+    result = await run_in_threadpool(create_session, payload, columns)
+    result = record_metrics("session", result, parse=parsed)
+    return await run_in_threadpool(encode_response, request.headers.get("accept"), result, 201)
+
+
+@app.patch("/api/sessions/{session_id}")
+async def update_session(session_id: str, patch: NetworkPatch, request: Request) -> Response:
+    """Apply a patch to a session network and re-solve it."""
+    result = await run_in_threadpool(patch_session, session_id, patch)
+    result = record_metrics("session_patch", result)
+    return await run_in_threadpool(encode_response, request.headers.get("accept"), result)
+
+
+@app.get("/api/sessions/{session_id}")
+def get_session(session_id: str) -> Dict[str, Any]:
+    return get_session_or_404(session_id).to_dict()
+
+
+@app.delete("/api/sessions/{session_id}")
+def delete_session(session_id: str) -> Dict[str, Any]:
+    session = get_session_store().delete(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return {"id": session.id, "deleted": True}
+
+
+def read_result(read: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """Call a ``ResultStore`` reader, turning unknown ids, components and attributes into 404s."""
+    from result_store import InvalidCursorError, UnknownResultError
+
+    try:
+        return read(*args, **kwargs)
+    except UnknownResultError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/results/{result_id}")
+def get_result(result_id: str, request: Request) -> Response:
+    """Describe an exported network: snapshots and the attributes stored per component."""
+    result = read_result(get_result_store().describe, result_id)
+    return encode_response(request.headers.get("accept"), result)
+
+
+@app.get("/api/results/{result_id}/{component}")
+def get_result_component(
+    result_id: str,
+    component: str,
+    request: Request,
+    attributes: Optional[List[str]] = Query(None),
+    names: Optional[List[str]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, description="Most component rows to return"),
+    cursor: Optional[str] = Query(None, description="The next_cursor of the previous page"),
+) -> Response:
+    """Static attributes of one component type, optionally only the given attributes and names.
+
+    With ``limit`` the rows come in pages; pass the returned "next_cursor"
+    to get the next one.
+    """
+    result = read_result(
+        get_result_store().read_static, result_id, component, attributes, names, cursor=cursor, limit=limit
+    )
+    return encode_response(request.headers.get("accept"), result)
+
+
+@app.get("/api/results/{result_id}/{component}/{attribute}")
+def get_result_attribute(
+    result_id: str,
+    component: str,
+    attribute: str,
+    request: Request,
+    start: Optional[int] = Query(None, description="First snapshot position of a time series"),
+    stop: Optional[int] = Query(None, description="Snapshot position after the last one returned"),
+    names: Optional[List[str]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, description="Most component rows to return"),
+    cursor: Optional[str] = Query(None, description="The next_cursor of the previous page"),
+) -> Response:
+    """One attribute of one component type; time series can be cut to a snapshot range.
+
+    Component rows are paged like in ``get_result_component``.
+    """
+    result = read_result(
+        get_result_store().read_attribute,
+        result_id,
+        component,
+        attribute,
+        start=start,
+        stop=stop,
+        names=names,
+        cursor=cursor,
+        limit=limit,
+    )
+    return encode_response(request.headers.get("accept"), result)
+
+
+@app.delete("/api/results/{result_id}")
+def delete_result(result_id: str) -> Dict[str, Any]:
+    from result_store import UnknownResultError
+
+    try:
+        deleted = get_result_store().delete(result_id)
+    except UnknownResultError:
+        deleted = False
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Unknown result: {result_id}")
+    return {"id": result_id, "deleted": True}
+
+
 def create_server(host: str = "127.0.0.1", port: int = 8000, log_level: str = "info"):
     """Create and configure the uvicorn server."""
     config = uvicorn.Config(
@@ -345,6 +1746,92 @@ def main():
         help="Log level for the server"
     )
     
+    parser.add_argument(
+        "--max-concurrent-solves",
+        type=int,
+        default=default_max_concurrent_solves(),
+        help="Number of worker processes running queued analysis jobs"
+    )
+    
+    parser.add_argument(
+        "--warm-workers",
+        type=int,
+        default=0,
+        help="Number of solve worker processes started and warmed up with the server; "
+             "analyses then run on this pool (0 solves in the server process)"
+    )
+    
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes per parallel request (batch variants, islands, contingencies, Monte Carlo)"
+    )
+    
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=8,
+        help="Number of session networks kept for incremental re-solves"
+    )
+    
+    parser.add_argument(
+        "--session-ttl",
+        type=float,
+        default=3600.0,
+        help="Seconds an idle session network is kept"
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=128,
+        help="Number of analysis results kept in memory (0 disables the in-memory cache)"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the on-disk result cache (disabled if not set)"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Size limit of the on-disk result cache in megabytes"
+    )
+    
+    parser.add_argument(
+        "--result-dir",
+        type=str,
+        default=None,
+        help="Directory for networks exported with export_result (default: a directory under the system temp dir)"
+    )
+    
+    parser.add_argument(
+        "--max-results",
+        type=int,
+        default=32,
+        help="Number of exported networks kept; the oldest are removed first"
+    )
+    
+    parser.add_argument(
+        "--large-payload-mb",
+        type=float,
+        default=256.0,
+        help="JSON request bodies above this size are parsed incrementally and their "
+             "time series streamed back, bypassing the cache and warm workers (0 disables)"
+    )
+    
+    parser.add_argument(
+        "--fast-start",
+        action="store_true",
+        help="Bind the port right away and import PyPSA in the background; "
+             "/api/health reports state 'warming' until it is ready"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
@@ -352,6 +1839,23 @@ def main():
     )
     
     args = parser.parse_args()
+
+    global max_concurrent_solves, warm_workers, batch_workers, max_sessions, session_ttl
+    global cache_size, cache_dir, cache_max_mb, large_payload_mb, result_dir, max_results
+    max_concurrent_solves = max(1, args.max_concurrent_solves)
+    warm_workers = max(0, args.warm_workers)
+    batch_workers = max(1, args.batch_workers)
+    max_sessions = max(1, args.max_sessions)
+    session_ttl = args.session_ttl
+    cache_size = args.cache_size
+    cache_dir = args.cache_dir
+    cache_max_mb = args.cache_max_mb
+    large_payload_mb = max(0.0, args.large_payload_mb)
+    result_dir = args.result_dir
+    max_results = max(1, args.max_results)
+    
+    if not args.fast_start:
+        load_dependencies()
     
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
@@ -0,0 +1,148 @@
+"""
+Parallel solves of parameter variants of one base network.
+
+The base network is normalized once in the server process and sent to
+each pool worker once (through the pool initializer), where it is built
+into a ``pypsa.Network``. Every variant then only ships its overrides: the
+worker copies the base network, applies them and solves. Results are
+yielded in completion order.
+
+An override changes one static attribute of some or all components of a
+type, either to a fixed ``value`` or by a ``scale`` factor, e.g.::
+
+    {"component": "loads", "attribute": "p_set", "scale": 1.2}
+    {"component": "generators", "names": ["diesel"], "attribute": "marginal_cost", "value": 80}
+
+Scaling also scales the matching time series (``loads_t.p_set``); a fixed
+value replaces it for the named components.
+"""
+
+from typing import Any, Dict, Iterator, List, Tuple
+
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pypsa
+
+from network_builder import COMPONENT_SPECS
+
+
+class InvalidOverrideError(ValueError):
+    """Raised when a variant override does not match the base network."""
+
+
+def validate_overrides(overrides: List[Dict[str, Any]], frames: Dict[str, pd.DataFrame]) -> None:
+    """Check components, names and attributes of overrides against the base frames."""
+    for override in overrides:
+        field = override["component"]
+        if field not in COMPONENT_SPECS:
+            raise InvalidOverrideError(
+                f"Unknown component '{field}' (expected one of: {', '.join(COMPONENT_SPECS)})"
+            )
+        component = COMPONENT_SPECS[field][0]
+        attrs = pypsa.Network().component_attrs[component]
+        attr = override["attribute"]
+        if attr not in attrs.index or attr == "name":
+            raise InvalidOverrideError(f"{field} has no attribute '{attr}'")
+        if override.get("scale") is not None and attrs.at[attr, "dtype"].kind != "f":
+            raise InvalidOverrideError(f"{field}.{attr} is not numeric and cannot be scaled")
+        names = override.get("names")
+        if names:
+            unknown = [name for name in names if name not in frames[field].index]
+            if unknown:
+                raise InvalidOverrideError(f"Override refers to unknown {field}: {', '.join(unknown[:10])}")
+
+
+def apply_overrides(n: "pypsa.Network", overrides: List[Dict[str, Any]]) -> None:
+    """Apply variant overrides to a network in place."""
+    for override in overrides:
+        field, attr = override["component"], override["attribute"]
+        static = getattr(n, field)
+        names = pd.Index(override.get("names") or static.index)
+        dynamic = getattr(n, f"{field}_t")
+        series = dynamic[attr] if attr in dynamic else None
+        varying = names.intersection(series.columns) if series is not None else pd.Index([])
+
+        if override.get("scale") is not None:
+            scale = override["scale"]
+            static.loc[names, attr] = static.loc[names, attr] * scale
+            if len(varying):
+                series[varying] = series[varying] * scale
+        else:
+            static.loc[names, attr] = override["value"]
+            if len(varying):
+                # A time series would take precedence over the new static value
+                dynamic[attr] = series.drop(columns=varying)
+
+
+# Per-worker state set by the pool initializer
+_base_network = None
+_base_payload = None
+_solve_kwargs: Dict[str, Any] = {}
+_result_store = None
+
+
+def _init_worker(
+    payload: Any, frames: Dict[str, pd.DataFrame], solve_kwargs: Dict[str, Any], result_store: Any = None
+) -> None:
+    import warnings
+
+    from network_builder import build_network
+
+    warnings.simplefilter("ignore")
+    global _base_network, _base_payload, _solve_kwargs, _result_store
+    _base_network = build_network(frames, payload.snapshots, payload.investment_periods, payload.discount_rate)
+    _base_payload = payload
+    _solve_kwargs = solve_kwargs
+    _result_store = result_store
+
+
+def _solve_variant(overrides: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from app import analyze_network
+
+    started = time.perf_counter()
+    try:
+        n = _base_network.copy()
+        apply_overrides(n, overrides)
+        result = analyze_network(n, _base_payload, _solve_kwargs, result_store=_result_store)
+    except Exception as e:
+        result = {"status": "error", "error": str(e), "traceback": traceback.format_exc(limit=3)}
+    result["elapsed"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(
+    payload: Any,
+    frames: Dict[str, pd.DataFrame],
+    variants: List[List[Dict[str, Any]]],
+    solve_kwargs: Dict[str, Any],
+    max_workers: int,
+    result_store: Any = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Solve each variant's overrides on the base network in a process pool.
+
+    Variants with ``export_result`` are saved to ``result_store``, which
+    should be the server's store so their ids resolve on /api/results.
+    Yields ``(variant index, result)`` pairs as the solves finish.
+    """
+    workers = max(1, min(max_workers, len(variants)))
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(payload, frames, solve_kwargs, result_store),
+    )
+    try:
+        futures = {pool.submit(_solve_variant, overrides): index for index, overrides in enumerate(variants)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                result = {"status": "error", "error": f"Worker process failed: {e}"}
+            yield futures[future], result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark every stage of /api/analyze on synthetic networks.
+
+For each topology, bus count and snapshot count a synthetic payload with
+load and solar profiles is analyzed
+
+* in process: the JSON body is parsed with ``parse_analyze_body``,
+  analyzed with ``analyze_payload`` and encoded with ``encode_response``,
+  so the stages reported under "timings" (normalize, build, topology,
+  model, solve, results, statistics) are complemented by the parse and
+  encode times measured here;
+* over HTTP (``--http``): the body is posted to a backend started from
+  ``__main__.py`` on a free port, and the round trip is split into the
+  stages the server reports and the remaining transport time (sending,
+  response encoding and receiving).
+
+The result cache is disabled in both modes. Each stage is the median
+over ``--repeat`` runs. Results are written as JSON together with the
+commit, library versions and settings, and ``--compare`` prints the
+change of every stage against an earlier results file.
+
+Usage:
+    python benchmarks/bench_analyze.py
+    python benchmarks/bench_analyze.py --topologies radial microgrid --buses 100 1000 --snapshots 24 168
+    python benchmarks/bench_analyze.py --http --output after.json --compare before.json
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import app as backend
+from bench_startup import BACKEND_DIR, free_port, get_health
+from synthetic import TOPOLOGIES, component_count, synthetic_network
+
+# Stages shown in the summary table, in pipeline order
+SUMMARY_STAGES = ("parse", "build", "model", "solve", "results", "statistics", "encode")
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and versions the results were measured with."""
+
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    import pandas
+    import pypsa
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "measured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pypsa": pypsa.__version__,
+        "pandas": pandas.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def median_stages(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    stages = {name: None for run in runs for name in run}
+    return {name: statistics.median(run.get(name, 0.0) for run in runs) for name in stages}
+
+
+def run_in_process(body: bytes) -> Tuple[Dict[str, float], str]:
+    started = time.perf_counter()
+    payload, columns = backend.parse_analyze_body("application/json", body)
+    stages = {"parse": time.perf_counter() - started}
+    result = backend.analyze_payload(payload, columns)
+    stages.update(result.get("timings", {}).get("stages", {}))
+    encode_started = time.perf_counter()
+    backend.encode_response(None, result)
+    stages["encode"] = time.perf_counter() - encode_started
+    stages["wall"] = time.perf_counter() - started
+    return stages, result.get("status", "error")
+
+
+def run_http(port: int, body: bytes) -> Tuple[Dict[str, float], str]:
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/analyze", data=body, headers={"content-type": "application/json"}
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=3600) as response:
+        content = response.read()
+    wall = time.perf_counter() - started
+    result = json.loads(content)
+    stages = dict(result.get("timings", {}).get("stages", {}))
+    stages["transport"] = max(0.0, wall - sum(stages.values()))
+    stages["wall"] = wall
+    return stages, result.get("status", "error")
+
+
+def start_server(timeout: float = 120.0) -> Tuple[subprocess.Popen, int]:
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, str(BACKEND_DIR / "__main__.py"), "--port", str(port), "--cache-size", "0",
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout and proc.poll() is None:
+        health = get_health(port)
+        if health is not None and health.get("state", "ready") == "ready":
+            return proc, port
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Backend did not become ready")
+
+
+def row_key(row: Dict[str, Any]) -> Tuple[str, str, int, int]:
+    return row["mode"], row["topology"], row["buses"], row["snapshots"]
+
+
+def print_row(row: Dict[str, Any]) -> None:
+    stages = row["stages"]
+    columns = "".join(f" {name} {stages[name]:7.3f}" for name in SUMMARY_STAGES if name in stages)
+    print(
+        f"{row['mode']:<10} {row['topology']:<9} {row['buses']:>6} buses x {row['snapshots']:>5} snapshots"
+        f"  wall {stages['wall']:8.3f}s {columns}  ({row['status']})"
+    )
+
+
+def compare(rows: List[Dict[str, Any]], baseline_path: str) -> None:
+    baseline = {row_key(row): row for row in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\nChange against {baseline_path} (new / old):")
+    for row in rows:
+        old = baseline.get(row_key(row))
+        if old is None:
+            continue
+        ratios = [
+            f"{name} {row['stages'][name] / old['stages'][name]:5.2f}x"
+            for name in ("wall",) + SUMMARY_STAGES
+            if name in row["stages"] and old["stages"].get(name)
+        ]
+        mode, topology, buses, snapshots = row_key(row)
+        print(f"{mode:<10} {topology:<9} {buses:>6} x {snapshots:>5}  " + "  ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stages of /api/analyze on synthetic networks")
+    parser.add_argument("--topologies", nargs="+", choices=sorted(TOPOLOGIES), default=sorted(TOPOLOGIES))
+    parser.add_argument("--buses", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--snapshots", type=int, nargs="+", default=[24])
+    parser.add_argument("--gen-every", type=int, default=10, help="One generator every this many buses")
+    parser.add_argument("--storage-every", type=int, default=25, help="One storage unit every this many buses (0: none)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--http", action="store_true", help="Also measure over HTTP against a started backend")
+    parser.add_argument("--no-in-process", action="store_true", help="Skip the in-process measurements")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    parser.add_argument("--compare", type=str, help="Results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.cache_size = 0
+    backend.load_dependencies()
+
+    modes = [] if args.no_in_process else ["in_process"]
+    server = None
+    if args.http:
+        server = start_server()
+        modes.append("http")
+
+    rows: List[Dict[str, Any]] = []
+    try:
+        for topology in args.topologies:
+            for buses in args.buses:
+                for snapshots in args.snapshots:
+                    payload = synthetic_network(
+                        topology,
+                        buses,
+                        profiles=snapshots > 1,
+                        n_snapshots=snapshots,
+                        gen_every=args.gen_every,
+                        storage_every=args.storage_every,
+                    )
+                    body = json.dumps(payload).encode()
+                    for mode in modes:
+                        runs, status = [], None
+                        for _ in range(args.repeat):
+                            stages, status = run_in_process(body) if mode == "in_process" else run_http(server[1], body)
+                            runs.append(stages)
+                        row = {
+                            "mode": mode,
+                            "topology": topology,
+                            "buses": len(payload["buses"]),
+                            "snapshots": snapshots,
+                            "components": component_count(payload),
+                            "request_bytes": len(body),
+                            "status": status,
+                            "stages": median_stages(runs),
+                        }
+                        rows.append(row)
+                        print_row(row)
+    finally:
+        if server is not None:
+            server[0].terminate()
+            server[0].wait(timeout=10)
+
+    report = {
+        "environment": environment(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": rows,
+    }
+    if args.compare:
+        compare(rows, args.compare)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
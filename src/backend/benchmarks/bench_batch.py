@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/analyze/batch throughput against the number of workers.
+
+Posts one synthetic feeder with a set of load-scaling variants to the
+in-process app for each worker count and reports the wall time and
+variants solved per second. Worker start-up is included, as it is for
+a real batch request.
+
+Usage:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --buses 200 --variants 32 --workers 1 2 4 8
+"""
+
+from typing import Any, Dict, List
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fastapi.testclient import TestClient
+
+import app as backend
+from synthetic import radial_feeder
+
+
+def scaling_variants(count: int) -> List[Dict[str, Any]]:
+    return [
+        {"id": f"load x{scale:.2f}", "overrides": [{"component": "loads", "attribute": "p_set", "scale": scale}]}
+        for scale in (0.5 + i / max(1, count - 1) for i in range(count))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch solve throughput")
+    parser.add_argument("--buses", type=int, default=100)
+    parser.add_argument("--snapshots", type=int, default=24)
+    parser.add_argument("--variants", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    client = TestClient(backend.app)
+    payload = {
+        **radial_feeder(args.buses, n_snapshots=args.snapshots),
+        "include_timeseries": False,
+        "variants": scaling_variants(args.variants),
+    }
+
+    rows = []
+    for workers in args.workers:
+        backend.batch_workers = workers
+        start = time.perf_counter()
+        result = client.post("/api/analyze/batch", json=payload).json()
+        seconds = time.perf_counter() - start
+        solved = sum(1 for r in result.get("results", []) if r.get("status") == "ok")
+        row = {
+            "buses": args.buses,
+            "snapshots": args.snapshots,
+            "variants": args.variants,
+            "workers": workers,
+            "seconds": seconds,
+            "solved": solved,
+            "variants_per_second": args.variants / seconds,
+        }
+        rows.append(row)
+        print(
+            f"{workers:>3} workers  {seconds:8.2f}s  {row['variants_per_second']:7.2f} variants/s"
+            f"  ({solved}/{args.variants} solved)"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark network construction time against network size.
+
+Compares the columnar builder used by ``build_pypsa_network`` with the
+previous one-``n.add``-per-component approach for payloads from 10 to
+100k components. Wherever both builders run, the benchmark also checks
+that they produce the same static component frames.
+
+Usage:
+    python benchmarks/bench_build.py
+    python benchmarks/bench_build.py --sizes 10 1000 100000 --per-component-limit 5000
+"""
+
+from typing import Any, Dict, List
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd
+import pypsa
+
+from synthetic import component_count, feeder_for_components
+from network_builder import build_network, component_frames, parse_snapshots
+
+
+class Payload:
+    """Attribute access over a raw payload dict, like ``AnalyzeRequest``."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.__dict__.update(data)
+
+
+def build_per_component(payload: Payload) -> "pypsa.Network":
+    """Reference implementation: one ``n.add`` call per component.
+
+    This is the builder ``build_pypsa_network`` used before the columnar
+    one, with the same attributes and defaults.
+    """
+    n = pypsa.Network()
+    n.set_snapshots(parse_snapshots(payload.snapshots))
+
+    for bus in payload.buses:
+        n.add(
+            "Bus",
+            bus.get("name") or bus.get("id") or str(len(n.buses)),
+            v_nom=bus.get("v_nom") if bus.get("v_nom") is not None else 110,
+            carrier=bus.get("carrier") if bus.get("carrier") is not None else "AC",
+            x=bus.get("x"),
+            y=bus.get("y"),
+        )
+    for gen in payload.generators:
+        n.add(
+            "Generator",
+            gen.get("name") or gen.get("id") or f"gen_{len(n.generators)}",
+            bus=gen.get("bus") if gen.get("bus") is not None else "",
+            p_nom=gen.get("p_nom") if gen.get("p_nom") is not None else 0,
+            p_nom_extendable=bool(gen.get("p_nom_extendable") if gen.get("p_nom_extendable") is not None else False),
+            carrier=gen.get("carrier") if gen.get("carrier") is not None else "generic",
+            marginal_cost=gen.get("marginal_cost") if gen.get("marginal_cost") is not None else 1,
+            capital_cost=gen.get("capital_cost") if gen.get("capital_cost") is not None else 0,
+            control=gen.get("control") if gen.get("control") is not None else "PQ",
+        )
+    for load in payload.loads:
+        n.add(
+            "Load",
+            load.get("name") or load.get("id") or f"load_{len(n.loads)}",
+            bus=load.get("bus") if load.get("bus") is not None else "",
+            p_set=load.get("p_set") if load.get("p_set") is not None else 0,
+            q_set=load.get("q_set") if load.get("q_set") is not None else 0,
+        )
+    for line in payload.lines:
+        n.add(
+            "Line",
+            line.get("name") or line.get("id") or f"line_{len(n.lines)}",
+            bus0=line.get("bus0"),
+            bus1=line.get("bus1"),
+            r=line.get("r") if line.get("r") is not None else 0.01,
+            x=line.get("x") if line.get("x") is not None else 0.1,
+            s_nom=line.get("s_nom") if line.get("s_nom") is not None else 0,
+            s_nom_extendable=bool(line.get("s_nom_extendable") if line.get("s_nom_extendable") is not None else False),
+            length=line.get("length"),
+            capital_cost=line.get("capital_cost"),
+            s_max_pu=line.get("s_max_pu"),
+        )
+    for su in payload.storage_units:
+        efficiency = su.get("efficiency") if su.get("efficiency") is not None else 0.9
+        n.add(
+            "StorageUnit",
+            su.get("name") or su.get("id") or f"storage_{len(n.storage_units)}",
+            bus=su.get("bus") if su.get("bus") is not None else "",
+            p_nom=su.get("p_nom") if su.get("p_nom") is not None else 0,
+            p_nom_extendable=bool(su.get("p_nom_extendable") if su.get("p_nom_extendable") is not None else False),
+            max_hours=su.get("max_hours") if su.get("max_hours") is not None else 4,
+            efficiency_store=su.get("efficiency_store") if su.get("efficiency_store") is not None else efficiency,
+            efficiency_dispatch=su.get("efficiency_dispatch") if su.get("efficiency_dispatch") is not None else efficiency,
+            capital_cost=su.get("capital_cost") if su.get("capital_cost") is not None else 0,
+            cyclic_state_of_charge=bool(
+                su.get("cyclic_state_of_charge") if su.get("cyclic_state_of_charge") is not None else True
+            ),
+        )
+    return n
+
+
+def assert_same_network(columnar: "pypsa.Network", reference: "pypsa.Network") -> None:
+    """Fail unless both networks have the same snapshots and static component frames."""
+    pd.testing.assert_index_equal(columnar.snapshots, reference.snapshots)
+    for component in ("Bus", "Generator", "Load", "Line", "StorageUnit"):
+        pd.testing.assert_frame_equal(
+            columnar.static(component), reference.static(component), check_like=True, obj=component
+        )
+
+
+def run(sizes: List[int], per_component_limit: int) -> List[Dict[str, Any]]:
+    rows = []
+    for size in sizes:
+        payload = Payload(feeder_for_components(size))
+        row: Dict[str, Any] = {"components": component_count(payload.__dict__)}
+        start = time.perf_counter()
+        columnar = build_network(component_frames(payload), payload.snapshots)
+        row["columnar_s"] = time.perf_counter() - start
+        if size <= per_component_limit:
+            start = time.perf_counter()
+            reference = build_per_component(payload)
+            row["per_component_s"] = time.perf_counter() - start
+            row["speedup"] = row["per_component_s"] / row["columnar_s"]
+            assert_same_network(columnar, reference)
+        rows.append(row)
+        print(
+            f"{row['components']:>8} components  columnar {row['columnar_s']:8.3f}s"
+            + (f"  per-component {row['per_component_s']:8.3f}s  x{row['speedup']:.1f}" if "speedup" in row else "")
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PyPSA network construction")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument(
+        "--per-component-limit",
+        type=int,
+        default=1000,
+        help="Largest size to time with the per-component reference builder",
+    )
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    rows = run(args.sizes, args.per_component_limit)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
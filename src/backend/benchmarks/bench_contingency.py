@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark N-1 screening against solving one power flow per outage.
+
+Builds a meshed grid and a radial feeder with roughly the requested number
+of lines, screens every single-line outage with the PTDF/LODF screening
+used by /api/contingency, and times a linear power flow with the line
+removed for a sample of outages to extrapolate the cost of looping over
+all of them. Post-contingency flows of the sample are compared against
+the screening factors.
+
+Usage:
+    python benchmarks/bench_contingency.py
+    python benchmarks/bench_contingency.py --lines 2000 --snapshots 24 --sample 20
+"""
+
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+import app as backend
+from contingency import line_ratings, outage_factors, screen_contingencies
+from powerflow import linear_powerflow
+from synthetic import meshed_grid, radial_feeder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark N-1 contingency screening")
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--snapshots", type=int, default=24)
+    parser.add_argument("--sample", type=int, default=10, help="Outages solved one by one for comparison")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.load_dependencies()
+
+    # A square grid of side s has 2 s (s - 1) lines
+    side = max(2, round((1 + math.sqrt(1 + 2 * args.lines)) / 2))
+    networks = {
+        "meshed": meshed_grid(side, side, n_snapshots=args.snapshots),
+        "radial": radial_feeder(args.lines + 1, n_snapshots=args.snapshots),
+    }
+
+    rows = []
+    for topology, payload in networks.items():
+        request = backend.AnalyzeRequest(**payload)
+        n = backend.build_pypsa_network(request)
+        flows = linear_powerflow(n, n.snapshots)["lines.p0"]
+
+        start = time.perf_counter()
+        screen = screen_contingencies(n, flows, line_ratings(n, n.snapshots))
+        screening = time.perf_counter() - start
+
+        sub_network = n.sub_networks.obj.iloc[0]
+        outage = outage_factors(sub_network)
+        names = sub_network.branches_i().get_level_values("name")
+        f = flows[names].values
+        sample = np.linspace(0, len(names) - 1, min(args.sample, len(names))).astype(int)
+        error = 0.0
+        start = time.perf_counter()
+        for k in sample:
+            m = backend.build_pypsa_network(request)
+            m.lines.loc[names[k], "active"] = False
+            post = linear_powerflow(m, m.snapshots)["lines.p0"][names].values
+            estimate = f + f[:, [k]] * outage["factors"][:, k]
+            alive = outage["alive"][:, k]
+            error = max(error, float(np.abs(estimate[:, alive] - post[:, alive]).max(initial=0.0)))
+        per_outage = (time.perf_counter() - start) / len(sample)
+
+        row = {
+            "topology": topology,
+            "buses": len(n.buses),
+            "lines": len(n.lines),
+            "snapshots": args.snapshots,
+            "screened": screen["screened"],
+            "screening_s": screening,
+            "per_outage_loop_s": per_outage,
+            "full_loop_estimate_s": per_outage * len(n.lines),
+            "max_flow_error": error,
+        }
+        rows.append(row)
+        print(
+            f"{topology:<7} {row['lines']:>5} lines  screening {screening:7.2f}s"
+            f"  loop ~{row['full_loop_estimate_s']:8.1f}s  max flow error {error:.2e}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON against MessagePack for /api/analyze end to end.
+
+Both variants post the same synthetic network (with a load profile per
+load) to the in-process app and decode the full response, so the timings
+include client-side encoding, request parsing, the solve, result
+encoding and client-side decoding. The result cache is disabled.
+
+Usage:
+    python benchmarks/bench_encoding.py
+    python benchmarks/bench_encoding.py --buses 100 500 --snapshots 168 --repeat 3
+"""
+
+from typing import Any, Callable, Dict, List
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app as backend
+from encoding import MSGPACK_MEDIA_TYPE, packb, unpackb
+from synthetic import radial_feeder
+
+COMPONENT_FIELDS = ("buses", "generators", "loads", "lines", "storage_units")
+
+
+def with_load_profiles(payload: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    n_snapshots = len(payload["snapshots"])
+    payload["loads_t"] = {
+        "p_set": {load["name"]: (rng.random(n_snapshots) * load["p_set"]).round(4).tolist() for load in payload["loads"]}
+    }
+    return payload
+
+
+def to_columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert row-form component lists and profiles to packed columns."""
+    out = dict(payload)
+    for field in COMPONENT_FIELDS:
+        rows = payload[field]
+        keys = sorted({key for row in rows for key in row})
+        table = {}
+        for key in keys:
+            values = [row.get(key) for row in rows]
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                table[key] = np.asarray(values, dtype=np.float64)
+            else:
+                table[key] = values
+        out[field] = table
+    out["loads_t"] = {
+        attr: {name: np.asarray(values, dtype=np.float64) for name, values in series.items()}
+        for attr, series in payload.get("loads_t", {}).items()
+    }
+    return out
+
+
+def post_json(client: TestClient, payload: Dict[str, Any]) -> Dict[str, Any]:
+    body = json.dumps(payload).encode()
+    response = client.post("/api/analyze", content=body, headers={"content-type": "application/json"})
+    result = response.json()
+    return {"request_bytes": len(body), "response_bytes": len(response.content), "status": result.get("status")}
+
+
+def post_msgpack(client: TestClient, payload: Dict[str, Any]) -> Dict[str, Any]:
+    body = packb(to_columnar(payload))
+    response = client.post(
+        "/api/analyze",
+        content=body,
+        headers={"content-type": MSGPACK_MEDIA_TYPE, "accept": MSGPACK_MEDIA_TYPE},
+    )
+    result = unpackb(response.content)
+    return {"request_bytes": len(body), "response_bytes": len(response.content), "status": result.get("status")}
+
+
+def measure(post: Callable[..., Dict[str, Any]], client: TestClient, payload: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        info = post(client, payload)
+        timings.append(time.perf_counter() - start)
+    info["median_s"] = statistics.median(timings)
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs MessagePack for /api/analyze")
+    parser.add_argument("--buses", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--snapshots", type=int, default=168)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.cache_size = 0
+    client = TestClient(backend.app)
+
+    rows: List[Dict[str, Any]] = []
+    for buses in args.buses:
+        payload = with_load_profiles(radial_feeder(buses, n_snapshots=args.snapshots))
+        row = {
+            "buses": buses,
+            "snapshots": args.snapshots,
+            "json": measure(post_json, client, payload, args.repeat),
+            "msgpack": measure(post_msgpack, client, payload, args.repeat),
+        }
+        rows.append(row)
+        for fmt in ("json", "msgpack"):
+            info = row[fmt]
+            print(
+                f"{buses:>5} buses x {args.snapshots:>5} snapshots  {fmt:<8}"
+                f"{info['median_s']:8.3f}s  request {info['request_bytes'] / 1e6:7.2f} MB"
+                f"  response {info['response_bytes'] / 1e6:7.2f} MB  ({info['status']})"
+            )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
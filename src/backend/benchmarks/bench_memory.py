@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak server memory of /api/analyze for large JSON payloads.
+
+Starts a backend for each path on its own, since peak RSS is a process
+high-water mark:
+
+* ``standard``: ``--large-payload-mb 0``; the body is validated into an
+  ``AnalyzeRequest`` and the whole result is built before it is encoded;
+* ``incremental``: ``--large-payload-mb 1``; the body is parsed member by
+  member, inputs and the optimization model are released as soon as they
+  are used and the time series are streamed back in blocks.
+
+The same synthetic radial feeder with load and solar profiles is posted
+to both; several loads per bus make the inputs and results large without
+growing the optimization problem as much. The response is read in chunks
+and the server's peak resident memory is taken from /api/metrics, next
+to its idle peak after start-up. The workload in the original report
+(about 50k components over a full year) is ``--buses 12500 --snapshots
+8760 --loads-per-bus 1``; comparing on it needs a machine that can solve
+it on the standard path.
+
+Usage:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --buses 200 --snapshots 2190 --loads-per-bus 50 --output memory.json
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_startup import BACKEND_DIR, free_port, get_health
+from synthetic import component_count, synthetic_network
+
+PATHS = {"standard": 0, "incremental": 1}
+
+
+def peak_memory_mb(port: int) -> Optional[float]:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/metrics", timeout=10) as response:
+        text = response.read().decode()
+    match = re.search(r"^resdeeds_peak_memory_bytes (\d+)$", text, re.MULTILINE)
+    return int(match.group(1)) / 2**20 if match else None
+
+
+def start_server(path: str, timeout: float = 120.0) -> Tuple[subprocess.Popen, int]:
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, str(BACKEND_DIR / "__main__.py"), "--port", str(port), "--cache-size", "0",
+         "--large-payload-mb", str(PATHS[path]), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    while get_health(port) is None:
+        if time.perf_counter() - started > timeout or proc.poll() is not None:
+            proc.terminate()
+            raise RuntimeError("Backend did not start")
+        time.sleep(0.1)
+    return proc, port
+
+
+def measure(path: str, port: int, body: bytes) -> Dict[str, Any]:
+    idle = peak_memory_mb(port)
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/analyze", data=body, headers={"content-type": "application/json"}
+    )
+    started = time.perf_counter()
+    response_bytes = 0
+    with urllib.request.urlopen(request, timeout=24 * 3600) as response:
+        while True:
+            chunk = response.read(1 << 20)
+            if not chunk:
+                break
+            response_bytes += len(chunk)
+    wall = time.perf_counter() - started
+    return {
+        "path": path,
+        "idle_peak_mb": idle,
+        "peak_mb": peak_memory_mb(port),
+        "wall_s": wall,
+        "response_bytes": response_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of large /api/analyze payloads")
+    parser.add_argument("--buses", type=int, default=1000)
+    parser.add_argument("--snapshots", type=int, default=720)
+    parser.add_argument("--loads-per-bus", type=int, default=20, help="Loads with their own profile per bus")
+    parser.add_argument("--paths", nargs="+", choices=sorted(PATHS), default=list(PATHS))
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    payload = synthetic_network(
+        "radial", args.buses, profiles=True, n_snapshots=args.snapshots, loads_per_bus=args.loads_per_bus
+    )
+    components = component_count(payload)
+    body = json.dumps(payload).encode()
+    del payload
+    print(f"{args.buses} buses ({components} components) x {args.snapshots} snapshots, "
+          f"request {len(body) / 2**20:.1f} MB")
+
+    rows = []
+    for path in args.paths:
+        proc, port = start_server(path)
+        try:
+            row = {"buses": args.buses, "components": components, "snapshots": args.snapshots,
+                   "request_bytes": len(body), **measure(path, port, body)}
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+        rows.append(row)
+        print(f"{path:<12} peak {row['peak_mb']:8.1f} MB (idle {row['idle_peak_mb']:6.1f} MB)"
+              f"  wall {row['wall_s']:7.1f}s  response {row['response_bytes'] / 2**20:7.1f} MB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark rolling-horizon dispatch and multi-period expansion against
+the monolithic solve.
+
+Two comparisons on the same synthetic radial feeder with load and solar
+profiles:
+
+* ``dispatch``: fixed capacities over ``--snapshots`` snapshots, solved
+  as one LP (``monolithic``) and in rolling-horizon windows of
+  ``--horizon`` snapshots overlapping by ``--overlap`` (``rolling``);
+* ``expansion``: extendable generators sized over the snapshots as one
+  period (``monolithic``) and over ``--periods`` investment periods that
+  each repeat the snapshots (``multi_period``).
+
+Every run happens in a fresh Python process so that its peak resident
+memory (taken from the analysis timings) belongs to that run alone; the
+peak right before the solve is reported as the baseline. The result
+cache is disabled.
+
+Usage:
+    python benchmarks/bench_planning.py
+    python benchmarks/bench_planning.py --buses 500 --snapshots 8760 --horizon 168 --overlap 24 --output planning.json
+"""
+
+from typing import Any, Dict, List
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# (comparison, mode) pairs in the order they are run
+RUNS = (
+    ("dispatch", "monolithic"),
+    ("dispatch", "rolling"),
+    ("expansion", "monolithic"),
+    ("expansion", "multi_period"),
+)
+
+
+def build_payload(comparison: str, mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from synthetic import synthetic_network
+
+    payload = synthetic_network("radial", args.buses, profiles=True, n_snapshots=args.snapshots)
+    payload["include_timeseries"] = False
+    if comparison == "expansion":
+        for generator in payload["generators"]:
+            generator.update(p_nom_extendable=True, capital_cost=args.capital_cost)
+    if mode == "rolling":
+        payload.update(rolling_horizon=args.horizon, rolling_overlap=args.overlap)
+    elif mode == "multi_period":
+        payload.update(
+            investment_periods=[args.first_period + i * args.period_years for i in range(args.periods)],
+            discount_rate=args.discount_rate,
+        )
+    return payload
+
+
+def run_child(comparison: str, mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one analysis in this process and return its measurements."""
+    import logging
+    import warnings
+
+    import app as backend
+    from metrics import peak_memory_mb
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.cache_size = 0
+    backend.load_dependencies()
+
+    payload = backend.AnalyzeRequest(**build_payload(comparison, mode, args))
+    baseline = peak_memory_mb()
+    started = time.perf_counter()
+    result = backend.analyze_payload(payload)
+    wall = time.perf_counter() - started
+    timings = result.get("timings", {})
+    return {
+        "comparison": comparison,
+        "mode": mode,
+        "status": result.get("status"),
+        "error": result.get("error"),
+        "objective": result.get("objective"),
+        "wall_s": wall,
+        "baseline_peak_mb": baseline,
+        "peak_mb": timings.get("peak_memory_mb"),
+        "stages": timings.get("stages", {}),
+    }
+
+
+def run_isolated(comparison: str, mode: str, argv: List[str]) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, __file__, *argv, "--child", comparison, mode],
+        capture_output=True,
+        text=True,
+    )
+    # The analysis prints progress; the measurements are on the last line
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        # A negative code is the signal that ended the run (e.g. 9 from the out-of-memory killer)
+        error = f"exit code {completed.returncode}: {completed.stderr[-2000:]}"
+        return {"comparison": comparison, "mode": mode, "status": "error", "error": error}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rolling-horizon and multi-period solves")
+    parser.add_argument("--buses", type=int, default=200)
+    parser.add_argument("--snapshots", type=int, default=2190)
+    parser.add_argument("--horizon", type=int, default=168, help="Snapshots per rolling-horizon window")
+    parser.add_argument("--overlap", type=int, default=24, help="Snapshots shared by consecutive windows")
+    parser.add_argument("--periods", type=int, default=3, help="Investment periods of the multi-period run")
+    parser.add_argument("--first-period", type=int, default=2025)
+    parser.add_argument("--period-years", type=int, default=5)
+    parser.add_argument("--discount-rate", type=float, default=0.05)
+    parser.add_argument("--capital-cost", type=float, default=1000.0, help="Capital cost of extendable generators")
+    parser.add_argument("--comparisons", nargs="+", choices=("dispatch", "expansion"), default=["dispatch", "expansion"])
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    parser.add_argument("--child", nargs=2, metavar=("COMPARISON", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child, args)))
+        return
+
+    argv = list(sys.argv[1:])
+    if "--output" in argv:
+        index = argv.index("--output")
+        del argv[index:index + 2]
+    print(f"radial feeder, {args.buses} buses x {args.snapshots} snapshots")
+    rows = []
+    for comparison, mode in RUNS:
+        if comparison not in args.comparisons:
+            continue
+        row = run_isolated(comparison, mode, argv)
+        rows.append(row)
+        if row["status"] != "ok":
+            print(f"{comparison:<10} {mode:<13} {row['status']}: {(row.get('error') or '')[:200]}")
+            continue
+        stages = row["stages"]
+        print(
+            f"{comparison:<10} {mode:<13} wall {row['wall_s']:8.2f}s  model {stages.get('model', 0):7.2f}s"
+            f"  solve {stages.get('solve', 0):7.2f}s  peak {row['peak_mb']:8.1f} MB"
+            f" (baseline {row['baseline_peak_mb']:6.1f} MB)  objective {row['objective']:.6g}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": vars(args), "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
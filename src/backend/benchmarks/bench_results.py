@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark result extraction and encoding of a solved network.
+
+Solves synthetic radial feeders of each ``--buses`` size over
+``--snapshots`` snapshots, then times building the "capacities", "power",
+"timeseries" and "statistics" sections and encoding them as the JSON
+response body in two ways:
+
+* ``previous``: the per-frame ``reset_index().rename().to_dict(orient=
+  "records")`` records, ``statistics`` through ``json.loads(s.to_json())``
+  and ``JSONResponse``'s ``json.dumps``;
+* ``results``: ``results.extract_results`` and ``results.encode_json``
+  (orjson when installed).
+
+Both produce the same sections; the benchmark checks that they match. A
+third timing extracts only the optimized generator capacities
+(``components=["generators"], attributes=["p_nom_opt"]``). Statistics are
+PyPSA's own computation in both paths and are timed separately.
+
+Usage:
+    python benchmarks/bench_results.py
+    python benchmarks/bench_results.py --buses 1000 5000 --snapshots 168 --repeat 5 --output results.json
+"""
+
+from typing import Any, Callable, Dict
+
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import app as backend
+import results
+from synthetic import synthetic_network
+
+
+def previous_sections(n) -> Dict[str, Any]:
+    """The result sections as analyze_network built them before ``results``."""
+
+    def series_or_empty(df, col):
+        return df[col] if (col in df.columns) else None
+
+    def first(frame, attr):
+        return frame.iloc[0].rename(attr).reset_index().rename(columns={"index": "name"}).to_dict(orient="records")
+
+    def columns(df):
+        if df is None or df.empty:
+            return {}
+        values = df.to_numpy(dtype=float).T
+        if np.isnan(values).any():
+            values = np.where(np.isnan(values), None, values.astype(object))
+        return dict(zip(map(str, df.columns), values.tolist()))
+
+    capacities = {
+        "generators": (
+            n.generators[["p_nom"]].assign(p_nom_opt=series_or_empty(n.generators, "p_nom_opt"))
+            .reset_index().rename(columns={"index": "name"}).to_dict(orient="records")
+        ) if not n.generators.empty else [],
+        "lines": (
+            n.lines[["s_nom"]].assign(s_nom_opt=series_or_empty(n.lines, "s_nom_opt"))
+            .reset_index().rename(columns={"index": "name"}).to_dict(orient="records")
+        ) if not n.lines.empty else [],
+        "storage_units": (
+            n.storage_units[["p_nom", "max_hours"]].assign(p_nom_opt=series_or_empty(n.storage_units, "p_nom_opt"))
+            .reset_index().rename(columns={"index": "name"}).to_dict(orient="records")
+        ) if not n.storage_units.empty else [],
+    }
+    power = {
+        "generators": first(n.generators_t.p, "p"),
+        "loads": first(n.loads_t.p, "p"),
+        "lines": first(n.lines_t.p0, "p0"),
+        "buses": first(n.buses_t.p, "p"),
+    }
+    timeseries = {
+        key: {attr: columns(getattr(getattr(n, dynamic), attr, None)) for attr in attrs}
+        for key, (dynamic, attrs) in results.TIMESERIES_ATTRIBUTES.items()
+    }
+    return {"capacities": capacities, "power": power, "timeseries": timeseries}
+
+
+def previous_statistics(n) -> Dict[str, Any]:
+    return json.loads(n.statistics().to_json())
+
+
+def previous_encode(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def best(function: Callable[[], Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def same(a: Any, b: Any) -> bool:
+    """Equal up to the 10 significant digits ``to_json`` keeps."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark result extraction and encoding")
+    parser.add_argument("--buses", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--snapshots", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=3, help="Timings are the best of this many runs")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.load_dependencies()
+    print(f"JSON encoder: {'orjson' if results.orjson is not None else 'json (orjson not installed)'}")
+
+    rows = []
+    for buses in args.buses:
+        payload = backend.AnalyzeRequest(
+            **synthetic_network("radial", buses, profiles=True, n_snapshots=args.snapshots, storage_every=10)
+        )
+        n = backend.build_pypsa_network(payload)
+        n.optimize(solver_name="highs")
+
+        old = {**previous_sections(n), "statistics": previous_statistics(n)}
+        new = results.extract_results(n)
+        # Time series are NumPy arrays until encoded
+        if not same(old, json.loads(results.encode_json(new))):
+            raise SystemExit(f"{buses} buses: the extracted sections differ from the previous ones")
+
+        old_body, new_body = previous_encode(old), results.encode_json(new)
+        row = {
+            "buses": buses,
+            "snapshots": args.snapshots,
+            "previous_extract_s": best(lambda: previous_sections(n), args.repeat),
+            "results_extract_s": best(lambda: results.extract_results(n, ("capacities", "power", "timeseries")), args.repeat),
+            "previous_statistics_s": best(lambda: previous_statistics(n), args.repeat),
+            "results_statistics_s": best(lambda: results.statistics(n), args.repeat),
+            "previous_encode_s": best(lambda: previous_encode(old), args.repeat),
+            "results_encode_s": best(lambda: results.encode_json(new), args.repeat),
+            "selected_extract_s": best(
+                lambda: results.extract_results(n, ("capacities",), ["generators"], ["p_nom_opt"]), args.repeat
+            ),
+            "previous_bytes": len(old_body),
+            "results_bytes": len(new_body),
+        }
+        rows.append(row)
+        previous = row["previous_extract_s"] + row["previous_encode_s"]
+        current = row["results_extract_s"] + row["results_encode_s"]
+        print(
+            f"{buses:>5} buses x {args.snapshots} snapshots ({row['results_bytes'] / 1e6:.1f} MB)  "
+            f"extract {row['previous_extract_s'] * 1e3:7.1f} -> {row['results_extract_s'] * 1e3:6.1f} ms  "
+            f"statistics {row['previous_statistics_s'] * 1e3:7.1f} -> {row['results_statistics_s'] * 1e3:6.1f} ms  "
+            f"encode {row['previous_encode_s'] * 1e3:7.1f} -> {row['results_encode_s'] * 1e3:6.1f} ms  "
+            f"extract+encode {previous / current:4.1f}x  "
+            f"selected {row['selected_extract_s'] * 1e3:5.2f} ms"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
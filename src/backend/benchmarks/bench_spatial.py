@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark spatial reduction against solving every bus.
+
+A synthetic distribution feeder whose trunk and laterals are mostly pole
+buses (see ``synthetic.distribution_feeder``), with load and solar
+profiles, is solved as it is and with each reduction: folding dead ends
+and merging series lines only, and additionally clustering the remaining
+buses down to each of ``--clusters`` buses electrically and by
+coordinates. For each run the reduced bus count, the model and solve
+time, the time spent reducing and disaggregating, the objective error
+and the largest line flow error at the first snapshot against the full
+solve and the largest line loading of the disaggregated flows are
+printed.
+
+Usage:
+    python benchmarks/bench_spatial.py
+    python benchmarks/bench_spatial.py --buses 5000 --snapshots 168 --clusters 20 100 --output spatial.json
+"""
+
+from typing import Any, Dict, List, Optional
+
+import argparse
+import json
+import logging
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import app as backend
+from synthetic import distribution_feeder, with_profiles
+
+
+def reductions(args: argparse.Namespace) -> List[Optional[Dict[str, Any]]]:
+    runs: List[Optional[Dict[str, Any]]] = [None, {}]
+    for method in ("electrical", "coordinates"):
+        runs += [{"buses": buses, "cluster_by": method} for buses in args.clusters]
+    return runs
+
+
+def solve(payload: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = backend.analyze_payload(backend.AnalyzeRequest(**payload))
+    result["wall"] = time.perf_counter() - started
+    return result
+
+
+def flows(result: Dict[str, Any]) -> Dict[str, float]:
+    return {row["Line"]: row["p0"] for row in result.get("power", {}).get("lines", [])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spatial reduction against the full solve")
+    parser.add_argument("--buses", type=int, default=2000)
+    parser.add_argument("--snapshots", type=int, default=168)
+    parser.add_argument("--clusters", type=int, nargs="+", default=[20, 100], help="Target bus counts to cluster to")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.cache_size = 0
+    backend.load_dependencies()
+
+    payload = with_profiles(distribution_feeder(args.buses, n_snapshots=args.snapshots))
+    payload["include_timeseries"] = False
+
+    rows = []
+    full = None
+    print(f"distribution feeder, {len(payload['buses'])} buses x {args.snapshots} snapshots")
+    for spatial in reductions(args):
+        result = solve({**payload, "spatial": spatial} if spatial is not None else payload)
+        stages = result.get("timings", {}).get("stages", {})
+        row: Dict[str, Any] = {
+            "spatial": spatial,
+            "status": result.get("status"),
+            "objective": result.get("objective"),
+            "wall_s": result["wall"],
+            "solve_s": stages.get("solve", 0.0) + stages.get("model", 0.0),
+            "spatial_s": stages.get("spatial", 0.0),
+            "reduction": result.get("spatial_reduction"),
+        }
+        if full is None:
+            full = {**row, "flows": flows(result)}
+        elif row["status"] == "ok" and full["status"] == "ok":
+            reduced = flows(result)
+            row["speedup"] = full["solve_s"] / row["solve_s"] if row["solve_s"] else None
+            row["objective_error"] = row["objective"] / full["objective"] - 1 if full["objective"] else None
+            row["max_flow_error"] = max((abs(reduced[name] - value) for name, value in full["flows"].items()), default=0.0)
+        rows.append(row)
+
+        if spatial is None:
+            label = "full"
+        else:
+            label = " ".join(f"{key}={value}" for key, value in spatial.items()) or "dead ends + series"
+        if row["status"] != "ok":
+            print(f"{label:<36} {row['status']}: {result.get('error')}")
+            continue
+        line = f"{label:<36} model+solve {row['solve_s']:7.2f}s"
+        if "speedup" in row:
+            metrics = row["reduction"]
+            line += (
+                f"  {row['speedup']:5.1f}x  buses {metrics['reduced_buses']:>5}  reduce+map {row['spatial_s']:6.2f}s"
+                f"  objective {row['objective_error']:+8.3%}  flow error {row['max_flow_error']:.2e}"
+                f"  max loading {metrics['max_line_loading']:.2f} ({metrics['overloaded_lines']} over)"
+            )
+        print(line)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": vars(args), "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
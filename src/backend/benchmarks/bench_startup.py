@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark backend start-up: time to first /api/health response and to ready.
+
+Starts ``__main__.py`` with and without ``--fast-start`` under
+``python -X importtime``, polls /api/health until it first answers and
+until it reports state "ready", and lists the slowest top-level imports
+that ran before the first response. The target for fast start is a first
+health response in under one second.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 3 --output startup.json
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TARGET_FIRST_RESPONSE_S = 1.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_health(port: int) -> Optional[Dict[str, Any]]:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+            return json.loads(response.read())
+    except Exception:
+        return None
+
+
+def parse_importtime(log: str, limit: int = 10) -> List[Tuple[str, float]]:
+    """Slowest top-level imports as (module, cumulative seconds)."""
+    imports = []
+    for line in log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            # Nested import or the header line
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def measure(fast_start: bool, timeout: float = 120.0) -> Dict[str, Any]:
+    port = free_port()
+    args = [sys.executable, "-X", "importtime", str(BACKEND_DIR / "__main__.py"), "--port", str(port)]
+    if fast_start:
+        args.append("--fast-start")
+
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        started = time.perf_counter()
+        proc = subprocess.Popen(args, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=stderr, text=True)
+        first_response = ready = None
+        imports_before_response: List[Tuple[str, float]] = []
+        try:
+            while time.perf_counter() - started < timeout and proc.poll() is None:
+                health = get_health(port)
+                if health is not None:
+                    if first_response is None:
+                        first_response = time.perf_counter() - started
+                        stderr.flush()
+                        stderr.seek(0)
+                        imports_before_response = parse_importtime(stderr.read())
+                    if health.get("state") == "ready":
+                        ready = time.perf_counter() - started
+                        break
+                time.sleep(0.02)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    return {
+        "fast_start": fast_start,
+        "first_response_s": first_response,
+        "ready_s": ready,
+        "slowest_imports": imports_before_response,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend start-up time")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    rows = []
+    for fast_start in (False, True):
+        runs = [measure(fast_start) for _ in range(args.repeat)]
+        first = [run["first_response_s"] for run in runs if run["first_response_s"] is not None]
+        ready = [run["ready_s"] for run in runs if run["ready_s"] is not None]
+        row = {
+            "fast_start": fast_start,
+            "first_response_s": statistics.median(first) if first else None,
+            "ready_s": statistics.median(ready) if ready else None,
+            "slowest_imports": runs[-1]["slowest_imports"],
+        }
+        rows.append(row)
+
+        mode = "fast start" if fast_start else "default"
+        print(f"{mode:<12} first health {row['first_response_s'] or float('nan'):6.2f}s"
+              f"  ready {row['ready_s'] or float('nan'):6.2f}s")
+        for name, seconds in row["slowest_imports"][:5]:
+            print(f"    {seconds:6.3f}s  {name}")
+
+    fast = rows[-1]["first_response_s"]
+    if fast is not None:
+        verdict = "meets" if fast < TARGET_FIRST_RESPONSE_S else "misses"
+        print(f"Fast start {verdict} the {TARGET_FIRST_RESPONSE_S:.1f}s first-response target")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark temporal reduction against solving every snapshot.
+
+A synthetic radial feeder with load and solar profiles and extendable
+generators (starting from no capacity, so the objective is the total
+cost) is solved over all ``--snapshots`` and with each reduction:
+resampling to ``--resolution`` snapshots per step and k-means and
+hierarchical clustering of days into ``--clusters`` representative days.
+For each run the solve time, the speed-up against the full solve, the
+objective error, the total deviation of the optimized capacities and the
+error metrics the reduction reports are printed.
+
+Usage:
+    python benchmarks/bench_temporal.py
+    python benchmarks/bench_temporal.py --buses 200 --snapshots 8760 --clusters 12 24 --output temporal.json
+"""
+
+from typing import Any, Dict, List, Optional
+
+import argparse
+import json
+import logging
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import app as backend
+from synthetic import synthetic_network
+
+
+def reductions(args: argparse.Namespace) -> List[Optional[Dict[str, Any]]]:
+    runs: List[Optional[Dict[str, Any]]] = [None]
+    runs += [{"method": "resample", "resolution": resolution} for resolution in args.resolution]
+    for method in ("kmeans", "hierarchical"):
+        runs += [{"method": method, "clusters": clusters, "period": args.period} for clusters in args.clusters]
+    return runs
+
+
+def solve(payload: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = backend.analyze_payload(backend.AnalyzeRequest(**payload))
+    result["wall"] = time.perf_counter() - started
+    return result
+
+
+def capacities(result: Dict[str, Any]) -> Dict[str, float]:
+    return {row["Generator"]: row["p_nom_opt"] for row in result.get("capacities", {}).get("generators", [])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark temporal reduction against the full solve")
+    parser.add_argument("--buses", type=int, default=200)
+    parser.add_argument("--snapshots", type=int, default=2190)
+    parser.add_argument("--resolution", type=int, nargs="+", default=[3, 6])
+    parser.add_argument("--clusters", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--period", type=int, default=24, help="Snapshots per clustered period")
+    parser.add_argument("--capital-cost", type=float, default=1000.0)
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    backend.cache_size = 0
+    backend.load_dependencies()
+
+    payload = synthetic_network("radial", args.buses, profiles=True, n_snapshots=args.snapshots)
+    payload["include_timeseries"] = False
+    for generator in payload["generators"]:
+        generator.update(p_nom=0, p_nom_extendable=True, capital_cost=args.capital_cost)
+
+    rows = []
+    full = None
+    print(f"radial feeder, {args.buses} buses x {args.snapshots} snapshots")
+    for temporal in reductions(args):
+        result = solve({**payload, "temporal": temporal} if temporal else payload)
+        stages = result.get("timings", {}).get("stages", {})
+        row: Dict[str, Any] = {
+            "temporal": temporal,
+            "status": result.get("status"),
+            "objective": result.get("objective"),
+            "wall_s": result["wall"],
+            "solve_s": stages.get("solve", 0.0) + stages.get("model", 0.0),
+            "reduction": result.get("temporal_reduction"),
+        }
+        if full is None:
+            full = {**row, "capacities": capacities(result)}
+        elif row["status"] == "ok" and full["status"] == "ok":
+            reduced = capacities(result)
+            row["speedup"] = full["solve_s"] / row["solve_s"] if row["solve_s"] else None
+            row["objective_error"] = row["objective"] / full["objective"] - 1 if full["objective"] else None
+            row["capacity_deviation"] = sum(abs(reduced[name] - value) for name, value in full["capacities"].items())
+            row["capacity_total"] = sum(full["capacities"].values())
+        rows.append(row)
+
+        label = "full" if temporal is None else " ".join(f"{key}={value}" for key, value in temporal.items())
+        if row["status"] != "ok":
+            print(f"{label:<42} {row['status']}: {result.get('error')}")
+            continue
+        line = f"{label:<42} model+solve {row['solve_s']:7.2f}s"
+        if "speedup" in row:
+            metrics = row["reduction"]
+            line += (
+                f"  {row['speedup']:5.1f}x  snapshots {metrics['reduced_snapshots']:>5}"
+                f"  objective {row['objective_error']:+7.2%}"
+                f"  capacity {row['capacity_deviation'] / row['capacity_total']:6.2%}"
+                f"  load nRMSE {metrics['profile_errors'].get('Load.p_set', {}).get('nrmse', 0):.3f}"
+                f"  peak {metrics.get('peak_load_error', 0):+6.2%}"
+            )
+        print(line)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": vars(args), "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark encoding of full time-series results.
+
+Fills the result series of a synthetic network with a year of hourly
+values (no solve needed) and compares the columnar "timeseries" encoding
+returned by /api/analyze with per-snapshot ``to_dict(orient="records")``
+rows, reporting encode time and JSON payload size.
+
+Usage:
+    python benchmarks/bench_timeseries.py
+    python benchmarks/bench_timeseries.py --buses 50 200 --snapshots 8760
+"""
+
+from typing import Any, Dict, List
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pandas as pd
+
+from synthetic import radial_feeder
+from network_builder import build_network, component_frames
+from app import AnalyzeRequest
+from results import TIMESERIES_ATTRIBUTES, timeseries
+
+
+def fill_results(n, seed: int = 0) -> None:
+    """Populate the solved series with random values."""
+    rng = np.random.default_rng(seed)
+    for _, (dynamic, attrs) in TIMESERIES_ATTRIBUTES.items():
+        frames = getattr(n, dynamic)
+        static = getattr(n, dynamic[:-2])
+        for attr in attrs:
+            frames[attr] = pd.DataFrame(
+                rng.random((len(n.snapshots), len(static))) * 100,
+                index=n.snapshots,
+                columns=static.index,
+            )
+
+
+def records_results(n) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Long-format rows, one record per component and snapshot."""
+    out = {}
+    for key, (dynamic, attrs) in TIMESERIES_ATTRIBUTES.items():
+        frames = getattr(n, dynamic)
+        out[key] = {}
+        for attr in attrs:
+            df = frames[attr]
+            stacked = df.stack()
+            stacked.index = stacked.index.set_names(["snapshot", "name"])
+            rows = stacked.rename(attr).reset_index()
+            rows["snapshot"] = rows["snapshot"].astype(str)
+            out[key][attr] = rows.to_dict(orient="records")
+    return out
+
+
+def measure(encode, n) -> Dict[str, float]:
+    start = time.perf_counter()
+    body = json.dumps(encode(n)).encode()
+    return {"seconds": time.perf_counter() - start, "bytes": len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-series result encoding")
+    parser.add_argument("--buses", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--snapshots", type=int, default=8760)
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    rows = []
+    for buses in args.buses:
+        payload = AnalyzeRequest(**radial_feeder(buses, n_snapshots=args.snapshots))
+        n = build_network(component_frames(payload), payload.snapshots)
+        fill_results(n)
+
+        row = {
+            "buses": buses,
+            "snapshots": args.snapshots,
+            "columnar": measure(timeseries, n),
+            "records": measure(records_results, n),
+        }
+        rows.append(row)
+        print(
+            f"{buses:>5} buses x {args.snapshots} snapshots  "
+            f"columnar {row['columnar']['seconds']:7.3f}s {row['columnar']['bytes'] / 1e6:8.1f} MB  "
+            f"records {row['records']['seconds']:7.3f}s {row['records']['bytes'] / 1e6:8.1f} MB"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Synthetic ResDEEDS analysis payloads for benchmarking.
+
+Payloads have the same shape as the JSON the renderer posts to
+``/api/analyze`` so they can be fed straight into ``AnalyzeRequest``.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+
+def radial_feeder(
+    n_buses: int,
+    gen_every: int = 10,
+    storage_every: int = 25,
+    n_snapshots: int = 1,
+    seed: Optional[int] = 0,
+    loads_per_bus: int = 1,
+) -> Dict[str, Any]:
+    """A radial feeder: a chain of buses with a load (or ``loads_per_bus`` loads) on every bus."""
+    rng = random.Random(seed)
+    buses: List[Dict[str, Any]] = []
+    generators: List[Dict[str, Any]] = []
+    loads: List[Dict[str, Any]] = []
+    lines: List[Dict[str, Any]] = []
+    storage_units: List[Dict[str, Any]] = []
+
+    for i in range(n_buses):
+        bus = f"bus_{i}"
+        buses.append({"name": bus, "v_nom": 12.47, "x": float(i), "y": 0.0})
+        # The bus demand is shared by its loads
+        p_set = round(rng.uniform(0.05, 0.5) / loads_per_bus, 4)
+        loads.extend(
+            {"name": f"load_{i}_{k}" if k else f"load_{i}", "bus": bus, "p_set": p_set} for k in range(loads_per_bus)
+        )
+        if i % gen_every == 0:
+            generators.append({
+                "name": f"gen_{i}",
+                "bus": bus,
+                "p_nom": round(rng.uniform(2.0, 10.0), 3),
+                "carrier": rng.choice(["solar", "wind", "diesel"]),
+                "marginal_cost": round(rng.uniform(0.0, 50.0), 2),
+            })
+        if storage_every and i % storage_every == 0:
+            storage_units.append({"name": f"storage_{i}", "bus": bus, "p_nom": 1.0, "max_hours": 4})
+        if i > 0:
+            lines.append({
+                "name": f"line_{i}",
+                "bus0": f"bus_{i - 1}",
+                "bus1": bus,
+                "r": 0.01,
+                "x": 0.1,
+                "s_nom": 1000,
+            })
+
+    return {
+        "buses": buses,
+        "generators": generators,
+        "loads": loads,
+        "lines": lines,
+        "storage_units": storage_units,
+        "snapshots": hourly_snapshots(n_snapshots),
+    }
+
+
+def meshed_grid(
+    rows: int,
+    cols: int,
+    gen_every: int = 10,
+    n_snapshots: int = 1,
+    seed: Optional[int] = 0,
+    storage_every: int = 0,
+) -> Dict[str, Any]:
+    """A meshed grid: buses on a rows x cols lattice, each linked to its right and lower neighbours."""
+    rng = random.Random(seed)
+    buses: List[Dict[str, Any]] = []
+    generators: List[Dict[str, Any]] = []
+    loads: List[Dict[str, Any]] = []
+    lines: List[Dict[str, Any]] = []
+    storage_units: List[Dict[str, Any]] = []
+
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            bus = f"bus_{r}_{c}"
+            buses.append({"name": bus, "v_nom": 12.47, "x": float(c), "y": float(r)})
+            loads.append({"name": f"load_{i}", "bus": bus, "p_set": round(rng.uniform(0.05, 0.5), 4)})
+            if i % gen_every == 0:
+                generators.append({
+                    "name": f"gen_{i}",
+                    "bus": bus,
+                    "p_nom": round(rng.uniform(2.0, 10.0), 3),
+                    "carrier": rng.choice(["solar", "wind", "diesel"]),
+                    "marginal_cost": round(rng.uniform(0.0, 50.0), 2),
+                })
+            if storage_every and i % storage_every == 0:
+                storage_units.append({"name": f"storage_{i}", "bus": bus, "p_nom": 1.0, "max_hours": 4})
+            for dr, dc in ((0, 1), (1, 0)):
+                if r + dr < rows and c + dc < cols:
+                    lines.append({
+                        "name": f"line_{r}_{c}_{r + dr}_{c + dc}",
+                        "bus0": bus,
+                        "bus1": f"bus_{r + dr}_{c + dc}",
+                        "r": 0.01,
+                        "x": round(rng.uniform(0.05, 0.2), 4),
+                        "s_nom": round(rng.uniform(1.0, 5.0), 2),
+                    })
+
+    return {
+        "buses": buses,
+        "generators": generators,
+        "loads": loads,
+        "lines": lines,
+        "storage_units": storage_units,
+        "snapshots": hourly_snapshots(n_snapshots),
+    }
+
+
+def microgrid_cluster(
+    n_microgrids: int,
+    buses_per_microgrid: int = 20,
+    gen_every: int = 5,
+    storage_every: int = 10,
+    n_snapshots: int = 1,
+    seed: Optional[int] = 0,
+    connected: bool = True,
+) -> Dict[str, Any]:
+    """Several small radial microgrids, each with its own generation and storage.
+
+    With ``connected`` every microgrid is tied to a shared point of common
+    coupling bus; otherwise the microgrids are separate islands.
+    """
+    buses: List[Dict[str, Any]] = []
+    generators: List[Dict[str, Any]] = []
+    loads: List[Dict[str, Any]] = []
+    lines: List[Dict[str, Any]] = []
+    storage_units: List[Dict[str, Any]] = []
+
+    if connected:
+        buses.append({"name": "pcc", "v_nom": 12.47, "x": 0.0, "y": 0.0})
+    for m in range(n_microgrids):
+        feeder = radial_feeder(
+            buses_per_microgrid,
+            gen_every=gen_every,
+            storage_every=storage_every,
+            seed=None if seed is None else seed + m,
+        )
+        angle = 2 * math.pi * m / max(1, n_microgrids)
+
+        def rename(name: str) -> str:
+            return f"mg{m}_{name}"
+
+        for bus in feeder["buses"]:
+            radius = 10.0 + bus["x"]
+            buses.append({**bus, "name": rename(bus["name"]), "x": radius * math.cos(angle), "y": radius * math.sin(angle)})
+        for field, out in (("generators", generators), ("loads", loads), ("storage_units", storage_units)):
+            out.extend({**row, "name": rename(row["name"]), "bus": rename(row["bus"])} for row in feeder[field])
+        lines.extend(
+            {**line, "name": rename(line["name"]), "bus0": rename(line["bus0"]), "bus1": rename(line["bus1"])}
+            for line in feeder["lines"]
+        )
+        if connected:
+            lines.append({"name": f"tie_{m}", "bus0": "pcc", "bus1": rename("bus_0"), "r": 0.01, "x": 0.1, "s_nom": 5.0})
+
+    return {
+        "buses": buses,
+        "generators": generators,
+        "loads": loads,
+        "lines": lines,
+        "storage_units": storage_units,
+        "snapshots": hourly_snapshots(n_snapshots),
+    }
+
+
+def distribution_feeder(
+    n_buses: int,
+    span: int = 4,
+    lateral_every: int = 2,
+    lateral_length: int = 6,
+    tie_every: int = 20,
+    gen_every: int = 5,
+    storage_every: int = 25,
+    n_snapshots: int = 1,
+    seed: Optional[int] = 0,
+) -> Dict[str, Any]:
+    """A detailed distribution feeder in which most buses only pass power along.
+
+    Load points on the trunk are ``span`` pole buses apart, and every
+    ``lateral_every``-th load point feeds a lateral of ``lateral_length``
+    poles ending in a load. Every ``tie_every``-th load point is tied back
+    to the one ``tie_every`` points before it, closing a loop. The feeder
+    grows until it has about ``n_buses`` buses; generators and storage
+    sit on trunk load points.
+    """
+    rng = random.Random(seed)
+    buses: List[Dict[str, Any]] = [{"name": "source", "v_nom": 12.47, "x": 0.0, "y": 0.0}]
+    generators: List[Dict[str, Any]] = [{"name": "gen_source", "bus": "source", "p_nom": 1000.0, "marginal_cost": 40.0}]
+    loads: List[Dict[str, Any]] = []
+    lines: List[Dict[str, Any]] = []
+    storage_units: List[Dict[str, Any]] = []
+
+    def extend(start: str, x: float, y: float, dx: float, dy: float, count: int, prefix: str, s_nom: float) -> str:
+        previous = start
+        for k in range(1, count + 1):
+            bus = f"{prefix}_{k}"
+            buses.append({"name": bus, "v_nom": 12.47, "x": x + k * dx, "y": y + k * dy})
+            lines.append({
+                "name": f"line_{bus}",
+                "bus0": previous,
+                "bus1": bus,
+                "r": 0.01,
+                "x": round(rng.uniform(0.01, 0.03), 4),
+                "s_nom": s_nom,
+            })
+            previous = bus
+        return previous
+
+    point, x = "source", 0.0
+    points: List[str] = []
+    i = 0
+    while len(buses) < n_buses:
+        point = extend(point, x, 0.0, 1.0, 0.0, span + 1, f"trunk_{i}", round(rng.uniform(1.5, 4.0), 2))
+        points.append(point)
+        x += span + 1
+        if tie_every and i >= tie_every and i % tie_every == 0:
+            lines.append({
+                "name": f"tie_{i}",
+                "bus0": points[i - tie_every],
+                "bus1": point,
+                "r": 0.01,
+                "x": 0.5,
+                "s_nom": 2.0,
+            })
+        loads.append({"name": f"load_{i}", "bus": point, "p_set": round(rng.uniform(0.05, 0.3), 4)})
+        if i % gen_every == gen_every - 1:
+            generators.append({
+                "name": f"gen_{i}",
+                "bus": point,
+                "p_nom": round(rng.uniform(1.0, 3.0), 3),
+                "carrier": rng.choice(["solar", "diesel"]),
+                "marginal_cost": round(rng.uniform(0.0, 100.0), 2),
+            })
+        if storage_every and i % storage_every == storage_every - 1:
+            storage_units.append({"name": f"storage_{i}", "bus": point, "p_nom": 0.5, "max_hours": 4})
+        if lateral_every and i % lateral_every == 0:
+            end = extend(point, x, 0.0, 0.0, 1.0 if i % 2 else -1.0, lateral_length, f"lateral_{i}", 5.0)
+            loads.append({"name": f"load_lateral_{i}", "bus": end, "p_set": round(rng.uniform(0.02, 0.1), 4)})
+        i += 1
+
+    return {
+        "buses": buses,
+        "generators": generators,
+        "loads": loads,
+        "lines": lines,
+        "storage_units": storage_units,
+        "snapshots": hourly_snapshots(n_snapshots),
+    }
+
+
+def with_profiles(payload: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """Add a daily load profile to every load and a solar profile to every solar generator."""
+    rng = np.random.default_rng(seed)
+    n_snapshots = len(payload["snapshots"])
+    hours = np.arange(n_snapshots) % 24
+    daily = 0.6 + 0.4 * np.sin((hours - 6) / 24 * 2 * np.pi).clip(0)
+    solar = np.sin((hours - 6) / 12 * np.pi).clip(0)
+
+    payload["loads_t"] = {"p_set": {
+        load["name"]: (load["p_set"] * daily * rng.uniform(0.9, 1.1, n_snapshots)).round(4).tolist()
+        for load in payload["loads"]
+    }}
+    solar_generators = [gen["name"] for gen in payload["generators"] if gen.get("carrier") == "solar"]
+    if solar_generators:
+        payload["generators_t"] = {"p_max_pu": {name: solar.round(4).tolist() for name in solar_generators}}
+    return payload
+
+
+def hourly_snapshots(n_snapshots: int, start: str = "2024-01-01") -> List[str]:
+    return [str(s) for s in pd.date_range(start, periods=n_snapshots, freq="h")]
+
+
+def component_count(payload: Dict[str, Any]) -> int:
+    return sum(len(payload[k]) for k in ("buses", "generators", "loads", "lines", "storage_units"))
+
+
+def feeder_for_components(n_components: int, **kwargs: Any) -> Dict[str, Any]:
+    """A radial feeder sized to roughly ``n_components`` components in total."""
+    # Each bus brings a load and a line, plus the periodic generators and storage
+    gen_every = kwargs.get("gen_every", 10)
+    storage_every = kwargs.get("storage_every", 25)
+    per_bus = 3 + 1 / gen_every + (1 / storage_every if storage_every else 0)
+    return radial_feeder(max(1, round(n_components / per_bus)), **kwargs)
+
+
+def radial_network(n_buses: int, **kwargs: Any) -> Dict[str, Any]:
+    return radial_feeder(n_buses, **kwargs)
+
+
+def meshed_network(n_buses: int, **kwargs: Any) -> Dict[str, Any]:
+    rows = max(1, math.isqrt(n_buses))
+    return meshed_grid(rows, max(1, math.ceil(n_buses / rows)), **kwargs)
+
+
+def microgrid_network(n_buses: int, buses_per_microgrid: int = 20, **kwargs: Any) -> Dict[str, Any]:
+    size = max(1, min(buses_per_microgrid, n_buses))
+    return microgrid_cluster(max(1, math.ceil(n_buses / size)), size, **kwargs)
+
+
+# Topology name -> builder of a payload with roughly the given number of buses
+TOPOLOGIES: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "radial": radial_network,
+    "meshed": meshed_network,
+    "microgrid": microgrid_network,
+}
+
+
+def synthetic_network(topology: str, n_buses: int, profiles: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    """A payload of the named topology with about ``n_buses`` buses.
+
+    ``kwargs`` go to the topology's generator (``gen_every``,
+    ``storage_every``, ``n_snapshots``, ``seed``, ...). With ``profiles``
+    loads and solar generators get time-varying profiles.
+    """
+    payload = TOPOLOGIES[topology](n_buses, **kwargs)
+    return with_profiles(payload, kwargs.get("seed") or 0) if profiles else payload
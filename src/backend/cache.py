@@ -0,0 +1,176 @@
+"""
+Content-addressed cache of analysis results.
+
+Results are keyed by a hash of the *normalized* component frames (after
+the builder defaults are applied), so payloads that only differ in
+omitted-versus-default values, or in the order of their components and
+attributes, share an entry. Entries live in an
+in-memory LRU and, optionally, in a size-bounded directory on disk.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from results import encode_json
+
+# Bump when the result format changes so stale disk entries are ignored
+CACHE_VERSION = "1"
+
+
+def _hash_frame(digest: "hashlib._Hash", name: str, frame: pd.DataFrame) -> None:
+    digest.update(f"{name}:{len(frame)}:{','.join(frame.columns)}\n".encode())
+    if frame.empty:
+        return
+    # Neither the order of the attributes nor that of the components matters
+    canonical = frame[sorted(frame.columns)].sort_index(kind="stable")
+    for column in canonical.columns:
+        if pd.api.types.is_bool_dtype(canonical[column]):
+            continue
+        if pd.api.types.is_numeric_dtype(canonical[column]):
+            # 100 and 100.0 describe the same network
+            canonical[column] = canonical[column].astype("float64")
+    hashes = pd.util.hash_pandas_object(canonical, index=True)
+    digest.update(np.ascontiguousarray(hashes.to_numpy()).tobytes())
+
+
+def payload_key(frames: Dict[str, pd.DataFrame], options: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical hash of normalized component frames plus request options."""
+    digest = hashlib.sha256(f"resdeeds-cache-v{CACHE_VERSION}\n".encode())
+    for name in sorted(frames):
+        _hash_frame(digest, name, frames[name])
+    digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU of result dicts with an optional on-disk tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.max_entries > 0:
+                self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        if self.max_entries > 0:
+            with self._lock:
+                self._remember(key, result)
+        self._write_disk(key, result)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            # Refresh the mtime so disk eviction is least-recently-used
+            os.utime(path)
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            # Time series are NumPy arrays, which only encode_json writes
+            with open(tmp_path, "wb") as f:
+                f.write(encode_json(result))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Result cache write failed: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _disk_entries(self) -> Iterable[os.DirEntry]:
+        with os.scandir(self.disk_dir) as it:
+            return [entry for entry in it if entry.name.endswith(".json") and entry.is_file()]
+
+    def _evict_disk(self) -> None:
+        try:
+            entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._disk_entries()]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir is not None:
+            for entry in self._disk_entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
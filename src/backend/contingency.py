@@ -0,0 +1,197 @@
+"""
+N-1 contingency screening with linear sensitivity factors.
+
+The base case line flows come from a linear power flow of the given
+dispatch or from an optimization. For every connected sub-network the
+PTDF (flow on each line per unit of injection at each bus, balanced at
+the slack bus) is computed from one LU factorization of the reduced
+susceptance matrix, and the LODF from it: after losing line ``k`` the
+flow on line ``l`` is ``f_l + LODF[l, k] * f_k``. The flows after all
+outages are evaluated in blocks of snapshots x lines x outages arrays,
+so nothing is re-solved per contingency.
+
+A line whose outage splits its sub-network (``1 - PTDF_k . K_k == 0``)
+is a bridge. The side without the slack bus is islanded and its net
+demand, the flow the line carried into it, is lost; the remaining lines
+see that flow disappear at the bus that fed the island.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pypsa
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import depth_first_order
+from scipy.sparse.linalg import splu
+
+# Upper bound on the elements of one snapshots x lines x outages block
+BLOCK_ELEMENTS = 4_000_000
+
+# 1 - PTDF_k . K_k below this marks a bridge
+BRIDGE_TOLERANCE = 1e-9
+
+
+class InvalidContingencyError(ValueError):
+    """Raised when requested outages do not match the network."""
+
+
+def line_ratings(n: "pypsa.Network", snapshots: pd.Index, optimized: bool = False) -> pd.DataFrame:
+    """Usable line capacity ``s_nom * s_max_pu`` per snapshot; NaN for lines without a rating."""
+    s_nom = n.lines.s_nom
+    if optimized and "s_nom_opt" in n.lines:
+        s_nom = n.lines.s_nom_opt.where(n.lines.s_nom_extendable, s_nom)
+    ratings = n.get_switchable_as_dense("Line", "s_max_pu", snapshots).reindex(columns=n.lines.index) * s_nom
+    return ratings.where(ratings > 0)
+
+
+def outage_factors(sub_network: Any) -> Dict[str, Any]:
+    """Flow change factors of every single-line outage of a connected sub-network.
+
+    Returns ``factors`` and ``alive`` (lines x outages): after outage ``k``
+    line ``l`` carries ``alive[l, k] * (f_l + factors[l, k] * f_k)``.
+    ``islands`` maps the position of each bridge to its islanded bus
+    positions (in ``buses_o`` order) and ``into_island`` to the sign that
+    turns ``f_k`` into the flow entering the island.
+    """
+    sub_network.calculate_B_H(skip_pre=True)
+    n_buses = sub_network.B.shape[0]
+    inverse = np.zeros((n_buses, n_buses))
+    if n_buses > 1:
+        lu = splu(sub_network.B[1:, 1:].tocsc())
+        inverse[1:, 1:] = lu.solve(np.eye(n_buses - 1))
+    ptdf = np.asarray(sub_network.H @ inverse)
+    incidence = csr_matrix(sub_network.K)
+    branch_ptdf = np.asarray((incidence.T @ ptdf.T).T)
+
+    denominator = 1 - np.diag(branch_ptdf)
+    bridges = np.abs(denominator) < BRIDGE_TOLERANCE
+    factors = branch_ptdf / np.where(bridges, 1.0, denominator)
+    alive = np.ones(factors.shape, dtype=bool)
+
+    islands: Dict[int, np.ndarray] = {}
+    into_island: Dict[int, float] = {}
+    if bridges.any():
+        # Bridges are edges of every spanning tree, so the island behind one is
+        # the subtree below it in a depth-first tree rooted at the slack bus
+        bus0 = np.asarray((incidence > 0).argmax(axis=0)).ravel()
+        bus1 = np.asarray((incidence < 0).argmax(axis=0)).ravel()
+        graph = csr_matrix(
+            (np.ones(2 * len(bus0)), (np.r_[bus0, bus1], np.r_[bus1, bus0])), shape=(n_buses, n_buses)
+        )
+        order, predecessors = depth_first_order(graph, 0, directed=False)
+        position = np.empty(n_buses, dtype=int)
+        position[order] = np.arange(len(order))
+        size = np.ones(n_buses, dtype=int)
+        for bus in order[:0:-1]:
+            size[predecessors[bus]] += size[bus]
+
+        for k in np.flatnonzero(bridges):
+            child, feeder, sign = bus1[k], bus0[k], 1.0
+            if predecessors[bus0[k]] == bus1[k]:
+                child, feeder, sign = bus0[k], bus1[k], -1.0
+            island = order[position[child]:position[child] + size[child]]
+            factors[:, k] = sign * ptdf[:, feeder]
+            in_island = np.isin(bus0, island) | np.isin(bus1, island)
+            alive[in_island, k] = False
+            islands[k] = island
+            into_island[k] = sign
+
+    np.fill_diagonal(factors, -1.0)
+    np.fill_diagonal(alive, False)
+    return {"factors": factors, "alive": alive, "islands": islands, "into_island": into_island}
+
+
+def _worst_loading(flows: np.ndarray, inverse_rating: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Maximum loading over snapshots and the snapshot position where it occurs."""
+    loading = np.abs(flows) * inverse_rating
+    return loading.max(axis=0), loading.argmax(axis=0)
+
+
+def screen_contingencies(
+    n: "pypsa.Network",
+    flows: pd.DataFrame,
+    ratings: pd.DataFrame,
+    outages: Optional[List[str]] = None,
+    threshold: float = 1.0,
+) -> Dict[str, Any]:
+    """Screen single-line outages against the base case line flows.
+
+    ``flows`` and ``ratings`` are snapshots x lines. Returns the base case
+    overloads and, for each contingency that overloads a line or islands
+    load, the overloaded lines and the lost load.
+    """
+    if outages is not None:
+        unknown = [name for name in outages if name not in n.lines.index]
+        if unknown:
+            raise InvalidContingencyError(f"Unknown lines in outages: {', '.join(unknown[:10])}")
+
+    snapshots = [str(s) for s in flows.index]
+    weightings = n.snapshot_weightings.generators.reindex(flows.index).values
+    inverse_rating = np.nan_to_num(1 / ratings.reindex(columns=flows.columns).values, nan=0.0, posinf=0.0)
+
+    worst, at = _worst_loading(flows.values, inverse_rating)
+    base_overloads = [
+        {"line": flows.columns[l], "loading": float(worst[l]), "snapshot": snapshots[at[l]]}
+        for l in np.flatnonzero(worst > threshold)
+    ]
+
+    # The base case power flow or optimization has already determined the topology
+    if n.sub_networks.empty:
+        n.determine_network_topology()
+    n.calculate_dependent_values()
+    requested = set(outages) if outages is not None else None
+    screened = 0
+    results: List[Dict[str, Any]] = []
+    for sub_network in n.sub_networks.obj:
+        branches = sub_network.branches_i(active_only=True)
+        if len(branches) == 0:
+            continue
+        sub_network.find_bus_controls()
+        is_line = branches.get_level_values("type") == "Line"
+        names = branches.get_level_values("name")
+        columns = flows.columns.get_indexer(names.where(is_line, ""))
+        names = names.tolist()
+        positions = [
+            k for k in range(len(branches))
+            if is_line[k] and columns[k] >= 0 and (requested is None or names[k] in requested)
+        ]
+        if not positions:
+            continue
+
+        outage = outage_factors(sub_network)
+        buses_o = sub_network.buses_o
+        # Branch flows; branches that are not lines (none yet) carry no flow here
+        f = np.where(columns >= 0, flows.values[:, np.maximum(columns, 0)], 0.0)
+        scale = np.where(columns >= 0, inverse_rating[:, np.maximum(columns, 0)], 0.0)
+
+        block = max(1, BLOCK_ELEMENTS // max(1, f.size))
+        for start in range(0, len(positions), block):
+            chunk = np.array(positions[start:start + block])
+            post = f[:, :, None] + f[:, None, chunk] * outage["factors"][None, :, chunk]
+            post *= outage["alive"][None, :, chunk]
+            worst, at = _worst_loading(post, scale[:, :, None])
+            for j, k in enumerate(chunk):
+                screened += 1
+                contingency: Dict[str, Any] = {"line": names[k]}
+                if k in outage["islands"]:
+                    lost = np.clip(outage["into_island"][k] * f[:, k], 0.0, None)
+                    contingency["islanded_buses"] = buses_o[outage["islands"][k]].tolist()
+                    contingency["lost_load"] = float(lost.max())
+                    contingency["energy_not_served"] = float(lost @ weightings)
+                overloaded = np.flatnonzero(worst[:, j] > threshold)
+                overloaded = overloaded[np.argsort(-worst[overloaded, j])]
+                contingency["overloads"] = [
+                    {"line": names[l], "loading": float(worst[l, j]), "snapshot": snapshots[at[l, j]]}
+                    for l in overloaded
+                ]
+                if contingency["overloads"] or contingency.get("lost_load", 0.0) > 0:
+                    results.append(contingency)
+
+    return {
+        "screened": screened,
+        "failing": len(results),
+        "islanding": sum(1 for result in results if "islanded_buses" in result),
+        "base_overloads": base_overloads,
+        "contingencies": results,
+    }
@@ -0,0 +1,99 @@
+"""
+MessagePack wire format for analysis requests and results.
+
+JSON stays the default. Clients that send ``Content-Type:
+application/msgpack`` may ship component tables in columnar form, e.g.
+``{"buses": {"name": [...], "v_nom": <float64 array>}}``, and time-series
+inputs as per-component arrays. Numeric arrays travel as packed
+little-endian buffers in MessagePack extension types:
+
+    1 = float64, 2 = int64, 3 = bool (one byte per value)
+
+Results are encoded as MessagePack when the ``Accept`` header asks for it,
+with numeric series packed the same way.
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+try:
+    import msgpack  # type: ignore
+    msgpack_import_error: Optional[str] = None
+except Exception as e:  # pragma: no cover - environment not synced
+    msgpack = None  # type: ignore
+    msgpack_import_error = f"{type(e).__name__}: {e}"
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+EXT_FLOAT64 = 1
+EXT_INT64 = 2
+EXT_BOOL = 3
+
+# Lists of floats shorter than this are not worth packing
+MIN_PACKED_LENGTH = 8
+
+
+def is_msgpack(media_type: Optional[str]) -> bool:
+    if not media_type:
+        return False
+    return media_type.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def accepts_msgpack(accept: Optional[str]) -> bool:
+    """Whether an ``Accept`` header lists a MessagePack media type."""
+    if not accept:
+        return False
+    return any(is_msgpack(part) for part in accept.split(","))
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == EXT_FLOAT64:
+        return np.frombuffer(data, dtype="<f8")
+    if code == EXT_INT64:
+        return np.frombuffer(data, dtype="<i8")
+    if code == EXT_BOOL:
+        return np.frombuffer(data, dtype=np.uint8).astype(bool)
+    return msgpack.ExtType(code, data)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f":
+            return msgpack.ExtType(EXT_FLOAT64, obj.astype("<f8", copy=False).tobytes())
+        if obj.dtype.kind in "iu":
+            return msgpack.ExtType(EXT_INT64, obj.astype("<i8", copy=False).tobytes())
+        if obj.dtype.kind == "b":
+            return msgpack.ExtType(EXT_BOOL, obj.astype(np.uint8).tobytes())
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to MessagePack")
+
+
+def _pack_float_lists(obj: Any) -> Any:
+    """Replace long lists of floats with float64 arrays, recursively."""
+    if isinstance(obj, dict):
+        return {key: _pack_float_lists(value) for key, value in obj.items()}
+    if isinstance(obj, list) and obj:
+        first = obj[0]
+        if isinstance(first, float) and len(obj) >= MIN_PACKED_LENGTH:
+            try:
+                # null entries become NaN
+                return np.asarray(obj, dtype=np.float64)
+            except (TypeError, ValueError):
+                return obj
+        if isinstance(first, (dict, list)):
+            return [_pack_float_lists(item) for item in obj]
+    return obj
+
+
+def packb(obj: Any) -> bytes:
+    """Encode a result as MessagePack with numeric series packed."""
+    return msgpack.packb(_pack_float_lists(obj), default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode a MessagePack body; packed arrays become NumPy arrays."""
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
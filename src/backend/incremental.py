@@ -0,0 +1,221 @@
+"""
+Incremental JSON parsing of large analyze requests and streamed responses.
+
+``json.loads`` on a full-year request turns every time series value into
+a Python float inside nested dicts and lists, and pydantic then copies
+them again. ``parse_request`` instead walks the top-level object member
+by member with the stdlib decoder: component lists are decoded one field
+at a time, and every time series array is decoded on its own and copied
+straight into a float64 matrix that grows with the arrays seen, so at
+most one array exists as Python objects at any moment. The result is the same ``(payload,
+columns)`` pair ``parse_analyze_body`` returns for MessagePack bodies,
+with the component and time series fields in ``columns``.
+
+``stream_object`` writes a JSON object whose last members are produced by
+chunk generators, encoded like every other JSON response (``encode_json``),
+so the largest result sections never exist as one Python structure.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import json
+import re
+from json.decoder import scanstring
+
+import numpy as np
+import pandas as pd
+
+from network_builder import COMPONENT_SPECS, SERIES_SPECS, InvalidPayloadError, parse_snapshots
+from results import encode_json
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def _skip(text: str, idx: int) -> int:
+    return _whitespace.match(text, idx).end()
+
+
+def _expect(text: str, idx: int, char: str) -> int:
+    idx = _skip(text, idx)
+    if not text.startswith(char, idx):
+        raise InvalidPayloadError(f"Invalid JSON body: expected '{char}' at position {idx}")
+    return idx + 1
+
+
+def _decode(text: str, idx: int) -> Tuple[Any, int]:
+    try:
+        return _decoder.raw_decode(text, idx)
+    except json.JSONDecodeError as e:
+        raise InvalidPayloadError(f"Invalid JSON body: {e}") from e
+
+
+def _members(text: str, idx: int, on_value: Callable[[str, int], int]) -> int:
+    """Walk the JSON object starting at ``idx``.
+
+    ``on_value(key, start)`` is called with the position of each member's
+    value and returns the position after it. Returns the position after
+    the object.
+    """
+    idx = _expect(text, idx, "{")
+    idx = _skip(text, idx)
+    if text.startswith("}", idx):
+        return idx + 1
+    while True:
+        idx = _skip(text, idx)
+        if not text.startswith('"', idx):
+            raise InvalidPayloadError(f"Invalid JSON body: expected a key at position {idx}")
+        key, idx = scanstring(text, idx + 1)
+        idx = _expect(text, idx, ":")
+        idx = _skip(text, on_value(key, _skip(text, idx)))
+        if text.startswith(",", idx):
+            idx += 1
+        elif text.startswith("}", idx):
+            return idx + 1
+        else:
+            raise InvalidPayloadError(f"Invalid JSON body: expected ',' or '}}' at position {idx}")
+
+
+class _SeriesMatrix:
+    """Snapshot-by-component float matrix filled one component array at a time.
+
+    The matrix doubles as arrays arrive, up to ``capacity`` (the number of
+    components in the field, when known) before growing past it, so a
+    series covering a few components never holds room for all of them.
+    """
+
+    def __init__(self, n_snapshots: Optional[int], capacity: Optional[int]):
+        self.n_snapshots = n_snapshots
+        self.capacity = capacity
+        self.names: List[str] = []
+        self.values: Optional[np.ndarray] = None
+
+    def _grow(self) -> None:
+        used = len(self.names)
+        size = max(16, 2 * used)
+        if self.capacity is not None and used < self.capacity:
+            size = min(size, self.capacity)
+        # Columns are contiguous, so the frame built from it needs no copy
+        values = np.empty((self.n_snapshots, size), order="F")
+        if used:
+            values[:, :used] = self.values
+        self.values = values
+
+    def add(self, label: str, name: str, values: Any) -> None:
+        if not isinstance(values, list):
+            raise InvalidPayloadError(f"{label}.{name} must be an array of numbers")
+        try:
+            array = np.asarray(values, dtype=float)
+        except (TypeError, ValueError) as e:
+            raise InvalidPayloadError(f"{label}.{name} must be an array of numbers") from e
+        if self.n_snapshots is None:
+            self.n_snapshots = len(array)
+        if array.shape != (self.n_snapshots,):
+            raise InvalidPayloadError(
+                f"{label} must have one value per snapshot ({self.n_snapshots}); mismatched: {name}"
+            )
+        if self.values is None or len(self.names) == self.values.shape[1]:
+            self._grow()
+        self.values[:, len(self.names)] = array
+        self.names.append(name)
+
+    def frame(self) -> pd.DataFrame:
+        if self.values is None:
+            values = np.empty((self.n_snapshots or 0, 0))
+        else:
+            values = self.values[:, :len(self.names)]
+            if values.shape[1] < self.values.shape[1]:
+                # Release the room left over from the last doubling
+                values = values.copy(order="F")
+        self.values = None
+        return pd.DataFrame(values, index=pd.RangeIndex(values.shape[0]), columns=self.names, copy=False)
+
+
+def parse_request(text: str, model: type) -> Tuple[Any, Dict[str, Any]]:
+    """Parse a JSON analyze request incrementally.
+
+    Returns the validated request without component lists and time series
+    and the ``columns`` holding them: component row lists and, per time
+    series field, attribute -> snapshot-by-component frame.
+    """
+    options: Dict[str, Any] = {}
+    columns: Dict[str, Any] = {}
+
+    def n_snapshots() -> Optional[int]:
+        return len(parse_snapshots(options["snapshots"])) if "snapshots" in options else None
+
+    def on_series(field: str, start: int) -> int:
+        component_field = SERIES_SPECS[field][0]
+        attrs: Dict[str, pd.DataFrame] = {}
+
+        def on_attr(attr: str, attr_start: int) -> int:
+            rows = columns.get(component_field)
+            capacity = len(rows) if isinstance(rows, list) else None
+            matrix = _SeriesMatrix(n_snapshots(), capacity)
+            label = f"{field}.{attr}"
+
+            def on_component(name: str, value_start: int) -> int:
+                values, end = _decode(text, value_start)
+                matrix.add(label, name, values)
+                return end
+
+            end = _members(text, attr_start, on_component)
+            attrs[attr] = matrix.frame()
+            return end
+
+        end = _members(text, start, on_attr)
+        columns[field] = attrs
+        return end
+
+    def on_member(key: str, start: int) -> int:
+        if key in SERIES_SPECS:
+            return on_series(key, start)
+        value, end = _decode(text, start)
+        if key in COMPONENT_SPECS:
+            if not isinstance(value, (list, dict)):
+                raise InvalidPayloadError(f"{key} must be an array of objects or a columnar table")
+            if isinstance(value, list) and not all(isinstance(row, dict) for row in value):
+                raise InvalidPayloadError(f"{key} must be an array of objects")
+            columns[key] = value
+        else:
+            options[key] = value
+        return end
+
+    end = _members(text, 0, on_member)
+    if _skip(text, end) != len(text):
+        raise InvalidPayloadError(f"Invalid JSON body: extra data at position {_skip(text, end)}")
+    return model.model_validate(options), columns
+
+
+def _encode(value: Any) -> str:
+    return encode_json(value).decode()
+
+
+def stream_object(head: Dict[str, Any], sections: Dict[str, Callable[[], Iterator[str]]]) -> Iterator[bytes]:
+    """Encode ``head`` followed by members whose values are produced by chunk generators."""
+    members = [f"{_encode(key)}:{_encode(value)}" for key, value in head.items()]
+    yield ("{" + ",".join(members)).encode()
+    separator = "," if members else ""
+    for key, chunks in sections.items():
+        yield f"{separator}{_encode(key)}:".encode()
+        for chunk in chunks():
+            yield chunk.encode()
+        separator = ","
+    yield b"}"
+
+
+def columns_json(df: Optional[pd.DataFrame], block_values: int = 1_000_000) -> Iterator[str]:
+    """A snapshot-by-component frame as a JSON object of value arrays, in column blocks.
+
+    Produces the same encoding as ``columnar_series``.
+    """
+    if df is None or df.empty:
+        yield "{}"
+        return
+    block = max(1, block_values // max(1, len(df.index)))
+    names = [_encode(str(name)) for name in df.columns]
+    for start in range(0, len(names), block):
+        values = np.ascontiguousarray(df.iloc[:, start:start + block].to_numpy(dtype=float).T)
+        members = ",".join(f"{name}:{_encode(row)}" for name, row in zip(names[start:start + block], values))
+        yield ("{" if start == 0 else ",") + members
+    yield "}"
@@ -0,0 +1,327 @@
+"""
+Background job execution for long-running analyses.
+
+Jobs are queued in memory and executed by a fixed number of worker
+processes, so the number of concurrent solves is bounded and the HTTP
+server stays responsive while they run. Each worker process is driven by
+its own dispatcher thread; cancelling a running job terminates that
+worker, and the dispatcher replaces it before taking the next job.
+
+With a ``warmup`` function the pool is kept warm: ``start()`` spawns all
+workers up front, each runs ``warmup`` once before taking jobs, and
+replacement workers are spawned and warmed as soon as the old one exits.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = {JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED}
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(conn) -> None:
+    """Worker process loop: run ``(fn, args)`` tasks until told to stop."""
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        fn, args = task
+        try:
+            reply: Tuple[Any, ...] = ("ok", fn(*args))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}", traceback.format_exc(limit=3), e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(("error", f"Job result could not be returned: {e}", None, None))
+
+
+class _Worker:
+    """A worker process and the parent end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        self.conn.send((fn, args))
+        return self.conn.recv()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+    def replied(self) -> bool:
+        """Whether a reply is waiting on the pipe."""
+        try:
+            return self.conn.poll()
+        except (OSError, ValueError):
+            return False
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def close(self) -> None:
+        self.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class Job:
+    def __init__(self, fn: Callable[..., Any], args: Tuple[Any, ...]):
+        self.id = uuid.uuid4().hex
+        self.fn = fn
+        self.args = args
+        self.status = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.traceback: Optional[str] = None
+        # The exception raised by the job, if it could be sent back
+        self.exception: Optional[BaseException] = None
+        self.worker: Optional[_Worker] = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished; False if ``timeout`` expired first."""
+        return self._done.wait(timeout)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "id": self.id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            info["error"] = self.error
+            info["traceback"] = self.traceback
+        if include_result and self.status == JOB_COMPLETED:
+            info["result"] = self.result
+        return info
+
+
+class JobManager:
+    """Queue of analysis jobs executed by ``max_workers`` worker processes."""
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_finished: int = 256,
+        warmup: Optional[Callable[[], Any]] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_finished = max_finished
+        self.warmup = warmup
+        self._warm: Dict[str, bool] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: list = []
+        self._closed = False
+
+    def start(self) -> None:
+        """Spawn (and warm) all workers now instead of on the first job."""
+        with self._lock:
+            self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        # Without start(), worker processes are only spawned once the first job arrives
+        if self._threads:
+            return
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._dispatch, name=f"job-dispatch-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _spawn_worker(self) -> _Worker:
+        name = threading.current_thread().name
+        self._warm[name] = False
+        worker = _Worker(self._context)
+        if self.warmup is not None:
+            try:
+                reply = worker.run(self.warmup, ())
+            except (EOFError, OSError):
+                reply = ("error", "Worker process exited during warm-up", None)
+            if reply[0] != "ok":
+                logger.warning("Worker warm-up failed: %s", reply[1])
+            # A worker whose warm-up failed still takes jobs, but does not count as warm
+            self._warm[name] = reply[0] == "ok" and worker.process.is_alive()
+        return worker
+
+    def _dispatch(self) -> None:
+        worker: Optional[_Worker] = None
+        while True:
+            if worker is not None and not worker.process.is_alive():
+                # Killed by a cancellation or crashed; release its pipe before replacing it
+                worker.close()
+                worker = None
+            if self.warmup is not None and not self._closed and worker is None:
+                worker = self._spawn_worker()
+            job = self._queue.get()
+            if job is None:
+                break
+
+            with self._lock:
+                if job.status != JOB_QUEUED:
+                    # Cancelled while waiting in the queue
+                    continue
+                if worker is not None and not worker.process.is_alive():
+                    worker.close()
+                    worker = None
+                if worker is None:
+                    worker = _Worker(self._context)
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                job.worker = worker
+
+            try:
+                worker.conn.send((job.fn, job.args))
+                # Wait until the reply (or EOF) is there, then stop cancel() from
+                # killing the worker before taking the reply off the pipe
+                worker.conn.poll(None)
+                with self._lock:
+                    job.worker = None
+                reply = worker.conn.recv()
+            except (EOFError, OSError):
+                # The worker was terminated (cancellation) or crashed
+                reply = ("error", "Worker process exited unexpectedly", None, None)
+                worker.close()
+                worker = None
+
+            with self._lock:
+                self._warm[threading.current_thread().name] = worker is not None
+                job.worker = None
+                job.fn = None
+                job.args = ()
+                if job.status == JOB_CANCELLED:
+                    continue
+                job.finished_at = time.time()
+                if reply[0] == "ok":
+                    job.status = JOB_COMPLETED
+                    job.result = reply[1]
+                else:
+                    job.status = JOB_FAILED
+                    job.error = reply[1]
+                    job.traceback = reply[2]
+                    job.exception = reply[3]
+                job._done.set()
+                self._prune()
+
+        if worker is not None:
+            worker.stop()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Job:
+        """Queue ``fn(*args)`` for execution in a worker process.
+
+        ``fn`` and ``args`` must be picklable.
+        """
+        if self._closed:
+            raise RuntimeError("Job manager is shut down")
+        job = Job(fn, args)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._ensure_started()
+        self._queue.put(job)
+        return job
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in a worker process and wait for its result.
+
+        The job is not kept for retrieval. Exceptions raised by ``fn`` are
+        re-raised here when they could be sent back from the worker.
+        """
+        job = self.submit(fn, *args)
+        try:
+            job.wait()
+        finally:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+        if job.status == JOB_COMPLETED:
+            return job.result
+        if job.exception is not None:
+            raise job.exception
+        raise RuntimeError(job.error or f"Job {job.status}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are discarded."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in FINISHED_STATES:
+                del self._jobs[job_id]
+                return job
+            # Once the reply has arrived the job is done, and its worker is left
+            # alone to take the next one
+            if job.status == JOB_RUNNING and job.worker is not None and not job.worker.replied():
+                # Kill under the lock so the worker cannot pick up another job first
+                job.worker.kill()
+            job.status = JOB_CANCELLED
+            job.finished_at = time.time()
+            job._done.set()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, Any] = {"max_workers": self.max_workers, "queued": 0, "running": 0}
+            for job in self._jobs.values():
+                if job.status in (JOB_QUEUED, JOB_RUNNING):
+                    counts[job.status] += 1
+            if self.warmup is not None:
+                counts["warm"] = sum(self._warm.values())
+                counts["ready"] = len(self._warm) == self.max_workers and all(self._warm.values())
+            return counts
+
+    def shutdown(self) -> None:
+        """Cancel outstanding jobs and stop all worker processes."""
+        self._closed = True
+        with self._lock:
+            pending = [job.id for job in self._jobs.values() if job.status not in FINISHED_STATES]
+        for job_id in pending:
+            self.cancel(job_id)
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=10)
+        self._threads = []
@@ -0,0 +1,190 @@
+"""
+Per-stage timing of analyses and a Prometheus view of it.
+
+A ``StageTimer`` travels with one analysis and accumulates the wall time
+of each stage (parsing, building the network, model building, solving,
+result extraction, statistics). Its ``report`` goes into the response
+under ``"timings"`` together with the peak resident memory of the process
+that ran the analysis and how far the analysis raised it
+("peak_memory_growth_mb"). The peak itself is never reset, so timers that
+are nested or belong to concurrent analyses do not disturb each other;
+growth from analyses that overlap in one process counts for each of them.
+The server feeds every report into a ``MetricsRegistry``, which keeps one
+histogram per stage and network size class and renders them in the
+Prometheus text exposition format for ``/api/metrics``.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Network size labels are the smallest of these bounds not below the count
+SIZE_CLASSES = (10, 100, 1000, 10000, 100000)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None if unknown."""
+    try:
+        # Unlike getrusage, VmHWM does not carry over the parent's peak across exec
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 2**20
+    return None
+
+
+def size_class(count: int) -> str:
+    """Label of the size class ``count`` falls into."""
+    for bound in SIZE_CLASSES:
+        if count <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+class StageTimer:
+    """Wall time of the named stages of one analysis."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.network: Dict[str, int] = {}
+        self.memory_baseline = peak_memory_mb()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def report(self) -> Dict[str, Any]:
+        peak = peak_memory_mb()
+        growth = None
+        if peak is not None and self.memory_baseline is not None:
+            growth = round(max(peak - self.memory_baseline, 0.0), 3)
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "total": round(sum(self.stages.values()), 6),
+            "peak_memory_mb": peak,
+            "peak_memory_growth_mb": growth,
+            "network": dict(self.network),
+        }
+
+
+def add_stages(timings: Dict[str, Any], **stages: float) -> Dict[str, Any]:
+    """``timings`` with earlier stages measured by the caller (e.g. parsing) put in front."""
+    merged = dict(stages)
+    for name, seconds in timings.get("stages", {}).items():
+        merged[name] = merged.get(name, 0.0) + seconds
+    merged = {name: round(seconds, 6) for name, seconds in merged.items()}
+    return {**timings, "stages": merged, "total": round(sum(merged.values()), 6)}
+
+
+class MetricsRegistry:
+    """Thread-safe stage duration histograms, analysis counts and peak memory."""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (endpoint, stage, buses class, snapshots class) -> [bucket counts..., sum, count]
+        self._histograms: Dict[Tuple[str, str, str, str], List[float]] = {}
+        self._requests: Dict[Tuple[str, str], int] = {}
+        self._peak_memory_mb = 0.0
+
+    def observe(self, endpoint: str, status: str, timings: Optional[Dict[str, Any]] = None) -> None:
+        """Count one finished request and add its stage timings, if any."""
+        with self._lock:
+            self._requests[endpoint, status] = self._requests.get((endpoint, status), 0) + 1
+            if not timings:
+                return
+            network = timings.get("network", {})
+            buses = size_class(network.get("buses", 0))
+            snapshots = size_class(network.get("snapshots", 0))
+            for stage, seconds in timings.get("stages", {}).items():
+                key = (endpoint, stage, buses, snapshots)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = [0.0] * (len(self.buckets) + 2)
+                for i, bound in enumerate(self.buckets):
+                    if seconds <= bound:
+                        histogram[i] += 1
+                histogram[-2] += seconds
+                histogram[-1] += 1
+            peak = timings.get("peak_memory_mb")
+            if peak is not None:
+                self._peak_memory_mb = max(self._peak_memory_mb, peak)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP resdeeds_requests_total Analysis requests by endpoint and result status.",
+            "# TYPE resdeeds_requests_total counter",
+        ]
+        with self._lock:
+            for (endpoint, status), count in sorted(self._requests.items()):
+                lines.append(f'resdeeds_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP resdeeds_stage_duration_seconds Wall time of analysis stages by network size class.",
+                "# TYPE resdeeds_stage_duration_seconds histogram",
+            ]
+            for (endpoint, stage, buses, snapshots), histogram in sorted(self._histograms.items()):
+                labels = f'endpoint="{endpoint}",stage="{stage}",buses="{buses}",snapshots="{snapshots}"'
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f'resdeeds_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {int(count)}')
+                lines.append(f'resdeeds_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {int(histogram[-1])}')
+                lines.append(f"resdeeds_stage_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"resdeeds_stage_duration_seconds_count{{{labels}}} {int(histogram[-1])}")
+
+            peak = max(self._peak_memory_mb, peak_memory_mb() or 0.0)
+        lines += [
+            "# HELP resdeeds_peak_memory_bytes Highest peak resident memory of the server or its solve workers.",
+            "# TYPE resdeeds_peak_memory_bytes gauge",
+            f"resdeeds_peak_memory_bytes {math.floor(peak * 2**20)}",
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,388 @@
+"""
+Monte Carlo outage simulation.
+
+Each scenario takes lines and generators out of service for the whole
+horizon, each with its own failure probability. Scenarios are drawn in
+batches as one uniform matrix from a NumPy generator seeded with the
+request seed, so the outage sets depend only on the seed and the number
+of scenarios, not on the batch size, the number of workers or the order
+in which solves finish. Identical outage sets are solved only once.
+
+Unserved energy is measured with load shedding generators, one at every
+bus with load, dispatched at the value of lost load. Each distinct outage
+set is an LOPF of the base network with the failed components out of
+service, solved in a process pool that builds the base network once per
+worker. Building the optimization model costs more than solving it, so
+outage sets that fail the same lines (and extendable generators) share
+one model, and failed non-extendable generators only get their dispatch
+bounds set to zero before each re-solve. Statistics are always computed
+over per-scenario arrays in scenario order, so partial results can be
+reported while solves finish and the final ones are reproducible.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+# Payload component list -> PyPSA component that can fail
+FAILURE_COMPONENTS = {
+    "lines": "Line",
+    "generators": "Generator",
+}
+
+LOAD_SHEDDING_CARRIER = "load shedding"
+
+# Shed power below this (MW) does not count as loss of load
+LOSS_OF_LOAD_TOLERANCE = 1e-6
+
+# Most outage sets solved on one model per pool task
+MAX_GROUP_SIZE = 25
+
+UNSERVED_ENERGY_PERCENTILES = (50, 90, 95, 99)
+HISTOGRAM_BINS = 20
+
+
+class InvalidFailureError(ValueError):
+    """Raised when failure probabilities do not match the base network."""
+
+
+def failure_table(
+    probabilities: Dict[str, Any], frames: Dict[str, pd.DataFrame]
+) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    """Expand per-type or per-component probabilities into ``(component, name)`` pairs and probabilities.
+
+    Components that cannot fail (probability 0) are left out.
+    """
+    components: List[Tuple[str, str]] = []
+    values: List[float] = []
+    for field, spec in probabilities.items():
+        if field not in FAILURE_COMPONENTS:
+            raise InvalidFailureError(
+                f"Components of type '{field}' cannot fail (expected one of: {', '.join(FAILURE_COMPONENTS)})"
+            )
+        names = frames[field].index
+        if isinstance(spec, dict):
+            unknown = [name for name in spec if name not in names]
+            if unknown:
+                raise InvalidFailureError(f"Failure probabilities refer to unknown {field}: {', '.join(unknown[:10])}")
+            per_component = spec
+        else:
+            per_component = dict.fromkeys(names, spec)
+        for name, probability in per_component.items():
+            if not 0 <= probability <= 1:
+                raise InvalidFailureError(f"Failure probability of {field} '{name}' must be between 0 and 1")
+            if probability > 0:
+                components.append((FAILURE_COMPONENTS[field], name))
+                values.append(float(probability))
+    return components, np.array(values)
+
+
+def sample_outages(rng: np.random.Generator, probabilities: np.ndarray, size: int) -> np.ndarray:
+    """Boolean ``size x components`` matrix of sampled failures."""
+    return rng.random((size, len(probabilities))) < probabilities
+
+
+def add_load_shedding(n: "pypsa.Network", value_of_lost_load: float) -> pd.Index:
+    """Add a load shedding generator sized to the peak load of every bus with load."""
+    if n.loads.empty:
+        return pd.Index([])
+    demand = n.get_switchable_as_dense("Load", "p_set").T.groupby(n.loads.bus).sum().T
+    peak = demand.max().clip(lower=0)
+    peak = peak[peak > 0]
+    names = peak.index + " " + LOAD_SHEDDING_CARRIER
+    if LOAD_SHEDDING_CARRIER not in n.carriers.index:
+        n.add("Carrier", LOAD_SHEDDING_CARRIER)
+    n.add(
+        "Generator",
+        names,
+        bus=peak.index,
+        p_nom=peak.values,
+        marginal_cost=value_of_lost_load,
+        carrier=LOAD_SHEDDING_CARRIER,
+    )
+    return names
+
+
+def rebuild_mask(components: List[Tuple[str, str]], frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+    """Which components change the model structure when they fail.
+
+    A failed line changes the network topology and an extendable generator
+    its capacity variable, so both need a model rebuild; a non-extendable
+    generator only has its dispatch bounds set to zero.
+    """
+    extendable = frames["generators"]["p_nom_extendable"].astype(bool)
+    return np.array([
+        component != "Generator" or bool(extendable.get(name, False)) for component, name in components
+    ], dtype=bool)
+
+
+# Per-worker state set by the pool initializer
+_network = None
+_shedding = pd.Index([])
+_components: List[Tuple[str, str]] = []
+_solve_kwargs: Dict[str, Any] = {}
+
+
+def _init_worker(
+    frames: Dict[str, pd.DataFrame],
+    snapshots: Optional[List[Any]],
+    components: List[Tuple[str, str]],
+    solve_kwargs: Dict[str, Any],
+    value_of_lost_load: float,
+) -> None:
+    import logging
+    import warnings
+
+    from network_builder import build_network
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    global _network, _shedding, _components, _solve_kwargs
+    _network = build_network(frames, snapshots)
+    _shedding = add_load_shedding(_network, value_of_lost_load)
+    _components = components
+    _solve_kwargs = solve_kwargs
+
+
+def _scenario_result(n: "pypsa.Network", status: str, condition: str) -> Dict[str, Any]:
+    if status != "ok":
+        return {"status": "error", "error": f"Optimization did not find a solution ({condition})"}
+    weightings = n.snapshot_weightings.generators.values
+    shed = n.generators_t.p.reindex(columns=_shedding, fill_value=0.0).sum(axis=1).values
+    return {
+        "status": "ok",
+        "objective": float(n.objective),
+        "unserved_energy": float(shed @ weightings),
+        "peak_loss_of_load": float(shed.max(initial=0.0)),
+        "loss_of_load_hours": float(weightings[shed > LOSS_OF_LOAD_TOLERANCE].sum()),
+    }
+
+
+def _dispatch_bounds(m: Any) -> Tuple[List[np.ndarray], int, pd.Index]:
+    """Right-hand side arrays of the non-extendable generator dispatch bounds in ``m``.
+
+    Returns the arrays (edited in place), the axis of the generator
+    dimension and the generator names along it.
+    """
+    if "Generator-fix-p-upper" not in m.constraints:
+        return [], 0, pd.Index([])
+    arrays = [m.constraints[f"Generator-fix-p-{side}"].data["rhs"] for side in ("upper", "lower")]
+    axis = arrays[0].dims.index("Generator-fix")
+    return [rhs.values for rhs in arrays], axis, arrays[0].indexes["Generator-fix"]
+
+
+def _create_model(n: "pypsa.Network") -> None:
+    n.optimize.create_model()
+    if n.sub_networks.empty and "obj" in n.sub_networks:
+        # With every line out there are no sub-networks, and PyPSA's post-processing
+        # fails computing bus angles for them unless the "obj" column is gone
+        n.sub_networks.drop(columns="obj", inplace=True)
+
+
+def _solve_without(n: "pypsa.Network", generators: List[str]) -> Dict[str, Any]:
+    """Solve a copy of ``n`` with ``generators`` out of service, leaving its model alone."""
+    m = n.copy()
+    m.generators.loc[generators, "active"] = False
+    _create_model(m)
+    return _scenario_result(m, *m.optimize.solve_model(**_solve_kwargs))
+
+
+def _solve_group(structural: List[int], variants: List[List[int]]) -> List[Dict[str, Any]]:
+    """Solve outage sets that share their structural failures on one model.
+
+    The structural components are deactivated and the model is built once;
+    each variant then only zeroes the dispatch bounds of its failed
+    generators. Failed generators without such bounds are taken out of a
+    copy of the network instead.
+    """
+    n = _network
+    deactivated = [_components[i] for i in structural]
+    for component, name in deactivated:
+        n.static(component).at[name, "active"] = False
+    results: List[Dict[str, Any]] = []
+    try:
+        _create_model(n)
+        arrays, axis, generators = _dispatch_bounds(n.model)
+        originals = [rhs.copy() for rhs in arrays]
+        for failed in variants:
+            try:
+                names = [_components[i][1] for i in failed]
+                positions = generators.get_indexer(names)
+                if (positions < 0).any():
+                    # Not in the dispatch bounds of the model (e.g. committable), so
+                    # there is nothing to zero; solve this set on a model of its own
+                    results.append(_solve_without(n, names))
+                    continue
+                for rhs, original in zip(arrays, originals):
+                    rhs[...] = original
+                    np.moveaxis(rhs, axis, 0)[positions] = 0.0
+                results.append(_scenario_result(n, *n.optimize.solve_model(**_solve_kwargs)))
+            except Exception as e:
+                results.append({"status": "error", "error": str(e)})
+    except Exception as e:
+        results.extend({"status": "error", "error": str(e)} for _ in range(len(variants) - len(results)))
+    finally:
+        for component, name in deactivated:
+            n.static(component).at[name, "active"] = True
+    return results
+
+
+def scenario_statistics(
+    unserved_energy: np.ndarray,
+    peak_loss_of_load: np.ndarray,
+    loss_of_load_hours: np.ndarray,
+    objective: np.ndarray,
+) -> Dict[str, Any]:
+    """Aggregate per-scenario results; NaN marks scenarios without a result yet."""
+    solved = ~np.isnan(unserved_energy)
+    count = int(solved.sum())
+    if count == 0:
+        return {"scenarios": 0}
+    energy = unserved_energy[solved]
+    counts, edges = np.histogram(energy, bins=HISTOGRAM_BINS)
+    return {
+        "scenarios": count,
+        "expected_unserved_energy": float(energy.mean()),
+        "expected_unserved_energy_stderr": float(energy.std(ddof=1) / np.sqrt(count)) if count > 1 else None,
+        # Scenarios with an hour of shedding above LOSS_OF_LOAD_TOLERANCE, like the hours counted for LOLE
+        "loss_of_load_probability": float((loss_of_load_hours[solved] > 0).mean()),
+        "loss_of_load_expectation": float(loss_of_load_hours[solved].mean()),
+        "expected_cost": float(objective[solved].mean()),
+        "unserved_energy": {
+            "min": float(energy.min()),
+            "max": float(energy.max()),
+            "std": float(energy.std()),
+            "percentiles": {
+                str(q): float(v) for q, v in zip(UNSERVED_ENERGY_PERCENTILES, np.percentile(energy, UNSERVED_ENERGY_PERCENTILES))
+            },
+            "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+        },
+        "peak_loss_of_load": {
+            "mean": float(peak_loss_of_load[solved].mean()),
+            "max": float(peak_loss_of_load[solved].max()),
+        },
+    }
+
+
+def run_montecarlo(
+    frames: Dict[str, pd.DataFrame],
+    snapshots: Optional[List[Any]],
+    components: List[Tuple[str, str]],
+    probabilities: np.ndarray,
+    rebuild: np.ndarray,
+    scenarios: int,
+    seed: int,
+    batch_size: int,
+    solve_kwargs: Dict[str, Any],
+    value_of_lost_load: float,
+    max_workers: int,
+    progress_interval: float = 1.0,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Sample and solve outage scenarios, yielding ``(event, data)`` pairs.
+
+    ``rebuild`` marks the components whose failure needs a new model
+    (see ``rebuild_mask``).
+
+    Yields "sampled" once the outage sets are drawn, "progress" with the
+    statistics of the scenarios solved so far at most every
+    ``progress_interval`` seconds, and finally "done".
+    """
+    rng = np.random.default_rng(seed)
+    distinct: Dict[bytes, int] = {}
+    outage_sets: List[List[int]] = []
+    scenario_set = np.empty(scenarios, dtype=int)
+    failures = np.zeros(len(probabilities), dtype=int)
+    for start in range(0, scenarios, batch_size):
+        draws = sample_outages(rng, probabilities, min(batch_size, scenarios - start))
+        failures += draws.sum(axis=0)
+        keys, first, inverse = np.unique(
+            np.packbits(draws, axis=1), axis=0, return_index=True, return_inverse=True
+        )
+        local = np.empty(len(keys), dtype=int)
+        for j, (key, row) in enumerate(zip(keys, first)):
+            index = distinct.setdefault(key.tobytes(), len(distinct))
+            if index == len(outage_sets):
+                outage_sets.append(np.flatnonzero(draws[row]).tolist())
+            local[j] = index
+        scenario_set[start:start + len(draws)] = local[inverse.ravel()]
+
+    workers = max(1, min(max_workers, len(outage_sets)))
+    yield "sampled", {
+        "scenarios": scenarios,
+        "distinct_outage_sets": len(outage_sets),
+        "components": len(components),
+        "workers": workers,
+    }
+
+    # Per outage set results; NaN until solved
+    results = {key: np.full(len(outage_sets), np.nan) for key in (
+        "unserved_energy", "peak_loss_of_load", "loss_of_load_hours", "objective"
+    )}
+    errors: Dict[int, str] = {}
+
+    def statistics() -> Dict[str, Any]:
+        return scenario_statistics(*(results[key][scenario_set] for key in (
+            "unserved_energy", "peak_loss_of_load", "loss_of_load_hours", "objective"
+        )))
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(frames, snapshots, components, solve_kwargs, value_of_lost_load),
+    )
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for index, failed in enumerate(outage_sets):
+        groups.setdefault(tuple(i for i in failed if rebuild[i]), []).append(index)
+    try:
+        pending = {}
+        for structural, members in groups.items():
+            size = min(MAX_GROUP_SIZE, -(-len(members) // workers))
+            for start in range(0, len(members), size):
+                chunk = members[start:start + size]
+                variants = [[i for i in outage_sets[index] if not rebuild[i]] for index in chunk]
+                pending[pool.submit(_solve_group, list(structural), variants)] = chunk
+        solved = 0
+        last_progress = time.perf_counter()
+        while pending:
+            done, _ = wait(pending, timeout=progress_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    chunk_results = future.result()
+                except BrokenProcessPool as e:
+                    chunk_results = [{"status": "error", "error": f"Worker process failed: {e}"}] * len(chunk)
+                solved += len(chunk)
+                for index, result in zip(chunk, chunk_results):
+                    if result["status"] == "ok":
+                        for key in results:
+                            results[key][index] = result[key]
+                    else:
+                        errors[index] = result["error"]
+            if pending and time.perf_counter() - last_progress >= progress_interval:
+                last_progress = time.perf_counter()
+                yield "progress", {"distinct_solved": solved, **statistics()}
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    yield "done", {
+        "status": "ok" if not errors else "warning",
+        "seed": seed,
+        "distinct_outage_sets": len(outage_sets),
+        "failed_solves": len(errors),
+        "errors": [
+            {"outages": [" ".join(components[i]) for i in outage_sets[index]], "error": errors[index]}
+            for index in sorted(errors)[:10]
+        ],
+        "failure_counts": {
+            f"{component} {name}": int(count) for (component, name), count in zip(components, failures)
+        },
+        **statistics(),
+    }
@@ -0,0 +1,281 @@
+"""
+Columnar construction of PyPSA networks from analysis payloads.
+
+Each component list of an ``AnalyzeRequest`` is turned into a single
+DataFrame with the ResDEEDS defaults applied column-wise, and every
+component type is then registered with one ``n.add`` call instead of one
+call per component. Time-varying inputs (``loads_t`` etc.) become
+snapshot-by-component frames that are assigned to the network whole.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+# Payload field -> (PyPSA component, default name prefix, attribute defaults).
+# A default of ``None`` passes the attribute through untouched so PyPSA
+# applies its own default for missing values.
+COMPONENT_SPECS: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+    "buses": ("Bus", "", {
+        "v_nom": 110,
+        "carrier": "AC",
+        "x": None,
+        "y": None,
+    }),
+    "generators": ("Generator", "gen_", {
+        "bus": "",
+        "p_nom": 0,
+        "p_nom_extendable": False,
+        "carrier": "generic",
+        "marginal_cost": 1,  # 0.001 $/kWh converted to $/MWh
+        "capital_cost": 0,
+        "control": "PQ",
+        # Fixed dispatch, used by power flow
+        "p_set": None,
+        "q_set": None,
+        # Investment periods in which the generator exists, for multi-period expansion
+        "build_year": None,
+        "lifetime": None,
+    }),
+    "loads": ("Load", "load_", {
+        "bus": "",
+        "p_set": 0,
+        "q_set": 0,
+    }),
+    "lines": ("Line", "line_", {
+        "bus0": None,
+        "bus1": None,
+        "r": 0.01,
+        "x": 0.1,
+        "s_nom": 0,
+        "s_nom_extendable": False,
+        "length": None,
+        "capital_cost": None,
+        "s_max_pu": None,
+        "build_year": None,
+        "lifetime": None,
+    }),
+    "storage_units": ("StorageUnit", "storage_", {
+        "bus": "",
+        "p_nom": 0,
+        "p_nom_extendable": False,
+        "max_hours": 4,
+        "efficiency_store": 0.9,
+        "efficiency_dispatch": 0.9,
+        "capital_cost": 0,
+        "cyclic_state_of_charge": True,
+        # Used when the state of charge is not cyclic (e.g. in rolling-horizon windows)
+        "state_of_charge_initial": None,
+        "build_year": None,
+        "lifetime": None,
+    }),
+}
+
+# Attributes that fall back to another payload field before their default.
+FALLBACK_FIELDS: Dict[str, Dict[str, str]] = {
+    "storage_units": {
+        "efficiency_store": "efficiency",
+        "efficiency_dispatch": "efficiency",
+    },
+}
+
+# Payload field -> (component list, attributes accepted as time series)
+SERIES_SPECS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "loads_t": ("loads", ("p_set", "q_set")),
+    "generators_t": ("generators", ("p_max_pu", "p_min_pu", "p_set", "marginal_cost")),
+    "storage_units_t": (
+        "storage_units",
+        ("p_max_pu", "p_min_pu", "p_set", "marginal_cost", "inflow", "state_of_charge_set"),
+    ),
+}
+
+BOOLEAN_ATTRIBUTES = {
+    "p_nom_extendable",
+    "s_nom_extendable",
+    "cyclic_state_of_charge",
+}
+
+
+class InvalidPayloadError(ValueError):
+    """Raised when a payload cannot be turned into a network."""
+
+
+def _is_set(column: pd.Series) -> pd.Series:
+    """Mask of entries that count as provided (mirrors ``value or fallback``)."""
+    return column.notna() & column.astype(bool)
+
+
+def _component_names(records: pd.DataFrame, prefix: str) -> pd.Index:
+    names = pd.Series([f"{prefix}{i}" for i in range(len(records))], index=records.index, dtype=object)
+    # ``name`` takes precedence over ``id``, which takes precedence over the positional default
+    for key in ("id", "name"):
+        if key in records.columns:
+            names = records[key].where(_is_set(records[key]), names)
+    return pd.Index(names.astype(str), name=None)
+
+
+def component_frame(field: str, records: Union[List[Dict[str, Any]], Dict[str, Any]]) -> pd.DataFrame:
+    """Build the normalized attribute frame for one payload component list.
+
+    ``records`` is either a list of row dicts or a columnar table mapping
+    attribute names to equal-length arrays.
+    """
+    _, prefix, defaults = COMPONENT_SPECS[field]
+    if isinstance(records, dict):
+        try:
+            raw = pd.DataFrame(records)
+        except ValueError as e:
+            raise InvalidPayloadError(f"Invalid columnar table for {field}: {e}") from e
+    elif records:
+        raw = pd.DataFrame.from_records(records)
+    else:
+        raw = pd.DataFrame(index=pd.RangeIndex(0))
+
+    frame = pd.DataFrame(index=raw.index)
+    fallbacks = FALLBACK_FIELDS.get(field, {})
+    for attr, default in defaults.items():
+        column = raw[attr] if attr in raw.columns else pd.Series(None, index=raw.index, dtype=object)
+        fallback = fallbacks.get(attr)
+        if fallback is not None and fallback in raw.columns:
+            column = column.where(column.notna(), raw[fallback])
+        if default is not None:
+            column = column.where(column.notna(), default)
+            if attr in BOOLEAN_ATTRIBUTES:
+                column = column.astype(bool)
+            else:
+                column = column.infer_objects()
+        elif column.isna().all():
+            # Nothing provided for a pass-through attribute; leave it to PyPSA
+            continue
+        frame[attr] = column
+
+    frame.index = _component_names(raw, prefix)
+    return frame
+
+
+def series_frame(
+    field: str,
+    attr: str,
+    columns: Union[Dict[str, List[float]], pd.DataFrame],
+    names: pd.Index,
+    n_snapshots: int,
+) -> pd.DataFrame:
+    """Build a snapshot-by-component frame from per-component value arrays.
+
+    ``columns`` may also be such a frame already, which is used as is.
+    """
+    component_field, allowed = SERIES_SPECS[field]
+    if attr not in allowed:
+        raise InvalidPayloadError(
+            f"{field}.{attr} is not a supported time series (expected one of: {', '.join(allowed)})"
+        )
+    unknown = [name for name in columns if name not in names]
+    if unknown:
+        raise InvalidPayloadError(f"{field}.{attr} refers to unknown {component_field}: {', '.join(unknown[:10])}")
+    if isinstance(columns, pd.DataFrame):
+        wrong_length = list(columns.columns) if len(columns.index) != n_snapshots else []
+    else:
+        wrong_length = [name for name, values in columns.items() if len(values) != n_snapshots]
+    if wrong_length:
+        raise InvalidPayloadError(
+            f"{field}.{attr} must have one value per snapshot ({n_snapshots}); "
+            f"mismatched: {', '.join(wrong_length[:10])}"
+        )
+    if isinstance(columns, pd.DataFrame):
+        return columns
+    return pd.DataFrame(columns, index=pd.RangeIndex(n_snapshots), dtype=float)
+
+
+def component_frames(payload: Any, columns: Optional[Dict[str, Any]] = None) -> Dict[str, pd.DataFrame]:
+    """Normalize every component list of ``payload`` into attribute frames.
+
+    Time-varying inputs are included under ``"<field>.<attribute>"`` keys
+    (e.g. ``"loads_t.p_set"``) with a positional snapshot index. Fields in
+    ``columns`` (columnar tables decoded from a binary request) take the
+    place of the corresponding payload fields.
+    """
+    columns = columns or {}
+
+    def source(field: str) -> Any:
+        return columns[field] if field in columns else getattr(payload, field, None)
+
+    frames = {field: component_frame(field, source(field) or []) for field in COMPONENT_SPECS}
+
+    n_snapshots = None
+    for field, (component_field, _) in SERIES_SPECS.items():
+        for attr, series in (source(field) or {}).items():
+            if series.columns.empty if isinstance(series, pd.DataFrame) else not series:
+                continue
+            if n_snapshots is None:
+                n_snapshots = len(parse_snapshots(payload.snapshots))
+            names = frames[component_field].index
+            frames[f"{field}.{attr}"] = series_frame(field, attr, series, names, n_snapshots)
+
+    return frames
+
+
+def default_snapshots() -> pd.DatetimeIndex:
+    return pd.date_range("2024-01-01", periods=1, freq="H")
+
+
+def parse_snapshots(snapshots: Optional[List[Any]]) -> pd.DatetimeIndex:
+    """Parse payload snapshots, falling back to a single synthetic snapshot."""
+    if snapshots:
+        try:
+            # Accept both strings and timestamps
+            return pd.DatetimeIndex(pd.to_datetime(snapshots))
+        except Exception:
+            pass
+    return default_snapshots()
+
+
+def set_investment_periods(n: "pypsa.Network", periods: List[int], discount_rate: float = 0.0) -> None:
+    """Repeat the snapshots of ``n`` for every investment period and weight the periods.
+
+    Each period lasts until the next one starts (the last as long as the
+    one before it) and its costs are discounted to the first period.
+    """
+    n.set_snapshots(pd.MultiIndex.from_product([periods, n.snapshots], names=["period", "timestep"]))
+    n.set_investment_periods(periods)
+    gaps = np.diff(periods).tolist()
+    years = gaps + [gaps[-1] if gaps else 1]
+    n.investment_period_weightings["years"] = years
+    n.investment_period_weightings["objective"] = [
+        sum((1 + discount_rate) ** -(period - periods[0] + year) for year in range(length))
+        for period, length in zip(periods, years)
+    ]
+
+
+def build_network(
+    frames: Dict[str, pd.DataFrame],
+    snapshots: Optional[List[Any]] = None,
+    investment_periods: Optional[List[int]] = None,
+    discount_rate: float = 0.0,
+) -> "pypsa.Network":
+    """Create a network and register each component type with a single ``add`` call.
+
+    With ``investment_periods`` the snapshots and time series are repeated
+    for every period (see ``set_investment_periods``).
+    """
+    n = pypsa.Network()
+    n.set_snapshots(parse_snapshots(snapshots))
+
+    for field, (component, _, _) in COMPONENT_SPECS.items():
+        frame = frames.get(field)
+        if frame is None or frame.empty:
+            continue
+        n.add(component, frame.index, **{attr: frame[attr].to_numpy() for attr in frame.columns})
+
+    for key, frame in frames.items():
+        if "." not in key or frame.empty:
+            continue
+        field, attr = key.split(".", 1)
+        series = frame.set_axis(n.snapshots, axis=0)
+        getattr(n, field)[attr] = series
+
+    if investment_periods:
+        # Assigned time series are carried over to every period
+        set_investment_periods(n, investment_periods, discount_rate)
+    return n
@@ -0,0 +1,130 @@
+"""
+Rolling-horizon dispatch and multi-period expansion results.
+
+A year of hourly snapshots solved at once is one LP whose size grows with
+the horizon. ``rolling_windows`` cuts the snapshots into consecutive
+windows that share ``overlap`` snapshots, and ``optimize_rolling_horizon``
+solves them in order on the same network, so only one window's model
+exists at a time. Each window starts with the state of charge storage had
+at the snapshot before it; the overlapping snapshots at the end of a
+window only look ahead and are solved again (and overwritten) by the next
+window.
+
+Unlike ``n.optimize.optimize_with_rolling_horizon``, cyclic state of
+charge is switched off while the windows are solved (a cycle within every
+window would discard the carried state), the loop stops at the first
+window without a solution and the tail of the snapshots is not solved
+twice.
+
+Multi-period expansion itself is PyPSA's ``multi_investment_periods``
+optimization of a network built with ``set_investment_periods``;
+``investment_period_summary`` reports what is active in every period.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pypsa
+
+# Flags that make a capacity a variable, which a dispatch window cannot size
+EXTENDABLE_FLAGS = {
+    "generators": "p_nom_extendable",
+    "lines": "s_nom_extendable",
+    "storage_units": "p_nom_extendable",
+}
+
+
+def rolling_windows(count: int, horizon: int, overlap: int = 0) -> List[Tuple[int, int]]:
+    """``(start, stop)`` snapshot positions of the windows covering ``count`` snapshots."""
+    if overlap >= horizon:
+        raise ValueError("overlap must be smaller than horizon")
+    windows = []
+    start = 0
+    while start < count:
+        stop = min(count, start + horizon)
+        windows.append((start, stop))
+        if stop == count:
+            break
+        start += horizon - overlap
+    return windows
+
+
+def extendable_components(n: "pypsa.Network") -> Dict[str, List[str]]:
+    """Components whose capacity is optimized, by component list."""
+    extendable = {}
+    for field, flag in EXTENDABLE_FLAGS.items():
+        static = getattr(n, field)
+        if flag in static and static[flag].any():
+            extendable[field] = static.index[static[flag]].tolist()
+    return extendable
+
+
+def optimize_rolling_horizon(
+    n: "pypsa.Network",
+    horizon: int,
+    overlap: int,
+    optimize: Callable[[pd.Index], Tuple[str, str]],
+    on_window: Optional[Callable[[int, int, Any, Any], None]] = None,
+) -> Tuple[str, str]:
+    """Optimize ``n`` window by window.
+
+    ``optimize(snapshots)`` builds and solves the model of one window and
+    returns ``(status, condition)`` like ``n.optimize``; ``on_window`` is
+    called with the window number, the number of windows and the first
+    and last snapshot before each solve. The model of each window is
+    dropped once its solution is on the network. Returns the status of
+    the last window solved.
+    """
+    windows = rolling_windows(len(n.snapshots), horizon, overlap)
+    storage = n.storage_units
+    saved = storage[["cyclic_state_of_charge", "state_of_charge_initial"]].copy()
+    storage["cyclic_state_of_charge"] = False
+    try:
+        status, condition = "ok", "optimal"
+        for i, (start, stop) in enumerate(windows):
+            snapshots = n.snapshots[start:stop]
+            if i and not storage.empty:
+                storage["state_of_charge_initial"] = n.storage_units_t.state_of_charge.iloc[start - 1]
+            if on_window is not None:
+                on_window(i + 1, len(windows), snapshots[0], snapshots[-1])
+            status, condition = optimize(snapshots)
+            del n.model
+            if status != "ok":
+                return status, f"{condition} (window {i + 1} of {len(windows)})"
+        return status, condition
+    finally:
+        storage[saved.columns] = saved
+
+
+def operational_cost(n: "pypsa.Network") -> float:
+    """Weighted operating cost of the dispatch on ``n`` over all snapshots.
+
+    This is the objective of the monolithic dispatch; the window
+    objectives would count overlapping snapshots twice.
+    """
+    return float(n.statistics.opex().sum())
+
+
+def investment_period_summary(n: "pypsa.Network") -> List[Dict[str, Any]]:
+    """Weightings and the optimized capacity active in every investment period."""
+    summary = []
+    weightings = n.investment_period_weightings
+    for period in n.investment_periods:
+        entry: Dict[str, Any] = {
+            "period": int(period),
+            "years": float(weightings.at[period, "years"]),
+            "objective_weight": float(weightings.at[period, "objective"]),
+        }
+        for field, component, attr in (
+            ("generators", "Generator", "p_nom_opt"),
+            ("storage_units", "StorageUnit", "p_nom_opt"),
+            ("lines", "Line", "s_nom_opt"),
+        ):
+            static = getattr(n, field)
+            if static.empty or attr not in static:
+                entry[field] = 0.0
+                continue
+            active = n.get_active_assets(component, period)
+            entry[field] = float(static.loc[active, attr].sum())
+        summary.append(entry)
+    return summary
@@ -0,0 +1,173 @@
+"""
+Power flow for a fixed dispatch, without optimization.
+
+``linear`` solves the DC power flow of every sub-network for all
+snapshots at once: PyPSA provides the susceptance matrix ``B`` and the
+branch flow matrix ``H``, the reduced ``B`` is factorized once and the
+injections of all snapshots are solved as one right-hand side block. The
+result frames are assembled from NumPy arrays instead of being written
+into ``n.*_t`` column by column as ``n.lpf`` does, which dominates its
+run time on large networks. It needs no parallelism.
+``ac`` runs the full Newton-Raphson power flow (``n.pf``),
+which iterates snapshot by snapshot; with more than one worker the
+snapshots are split into contiguous chunks that are solved in separate
+processes, each building the network from the same frames.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pypsa
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import splu
+
+POWERFLOW_MODES = ("linear", "ac")
+
+# AC result key -> (time-varying attributes container, attributes)
+AC_ATTRIBUTES = {
+    "buses": ("buses_t", ["v_mag_pu", "v_ang", "p", "q"]),
+    "lines": ("lines_t", ["p0", "q0", "p1", "q1"]),
+    "generators": ("generators_t", ["p", "q"]),
+}
+
+
+def line_loading(n: "pypsa.Network", p0: pd.DataFrame, q0: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Apparent (AC) or active (linear) flow at bus0 relative to ``s_nom``; NaN without a rating."""
+    flow = p0.abs() if q0 is None else np.hypot(p0, q0)
+    s_nom = n.lines.s_nom.reindex(flow.columns)
+    return flow / s_nom.where(s_nom > 0)
+
+
+def bus_injections(n: "pypsa.Network", snapshots: pd.Index) -> Tuple[np.ndarray, Dict[str, pd.DataFrame]]:
+    """Net active injection per bus (snapshots x ``n.buses``) of all one-ports dispatching at ``p_set``.
+
+    Also returns the dispatch of each one-port component type.
+    """
+    injections = np.zeros((len(snapshots), len(n.buses)))
+    dispatch: Dict[str, pd.DataFrame] = {}
+    for component in n.one_port_components:
+        static = n.static(component)
+        if static.empty:
+            continue
+        p = n.get_switchable_as_dense(component, "p_set", snapshots).reindex(columns=static.index)
+        p = p.mul(static.active.astype(float), axis=1).fillna(0.0)
+        dispatch[component] = p
+        # One-port -> bus incidence, so the grouping is a single sparse product
+        rows = np.arange(len(static))
+        cols = n.buses.index.get_indexer(static.bus)
+        keep = cols >= 0
+        incidence = csr_matrix(
+            (static.sign.values[keep], (rows[keep], cols[keep])), shape=(len(static), len(n.buses))
+        )
+        injections += (incidence.T @ p.values.T).T
+    return injections, dispatch
+
+
+def linear_powerflow(n: "pypsa.Network", snapshots: pd.Index) -> Dict[str, pd.DataFrame]:
+    """Linear (DC) power flow of all snapshots; see the module docstring."""
+    n.determine_network_topology()
+    n.calculate_dependent_values()
+
+    injections, dispatch = bus_injections(n, snapshots)
+    v_ang = np.zeros_like(injections)
+    p0 = np.zeros((len(snapshots), len(n.lines)))
+    generators_p = dispatch.get("Generator", pd.DataFrame(0.0, index=snapshots, columns=n.generators.index))
+    generators_p = generators_p.copy()
+
+    for sub_network in n.sub_networks.obj:
+        sub_network.find_bus_controls()
+        buses = n.buses.index.get_indexer(sub_network.buses_o)
+        p = injections[:, buses]
+        angles = np.zeros_like(p)
+        branches = sub_network.branches_i(active_only=True)
+        if len(branches) > 0:
+            sub_network.calculate_B_H(skip_pre=True)
+            p = p - sub_network.p_bus_shift
+            # The slack bus (first in buses_o) is the angle reference
+            lu = splu(sub_network.B[1:, 1:].tocsc())
+            angles[:, 1:] = lu.solve(np.ascontiguousarray(p[:, 1:].T)).T
+            flows = (sub_network.H @ angles.T).T + sub_network.p_branch_shift
+            lines = branches.get_level_values("type") == "Line"
+            columns = n.lines.index.get_indexer(branches[lines].get_level_values("name"))
+            p0[:, columns] = flows[:, lines]
+        if n.sub_networks.at[sub_network.name, "carrier"] != "DC":
+            v_ang[:, buses] = angles
+
+        # The slack bus picks up the imbalance, through its slack generator if it has one
+        slack = injections[:, buses].sum(axis=1)
+        injections[:, buses[0]] -= slack
+        if sub_network.slack_generator is not None:
+            generators_p[sub_network.slack_generator] -= slack
+
+    p0 = pd.DataFrame(p0, index=snapshots, columns=n.lines.index)
+    frames = {
+        "buses.v_ang": pd.DataFrame(v_ang, index=snapshots, columns=n.buses.index),
+        "buses.p": pd.DataFrame(injections, index=snapshots, columns=n.buses.index),
+        "lines.p0": p0,
+        "lines.p1": -p0,
+        "generators.p": generators_p,
+    }
+    if not n.lines.empty:
+        frames["lines.loading"] = line_loading(n, p0)
+    return frames
+
+
+def powerflow_frames(n: "pypsa.Network", mode: str, snapshots: Optional[pd.Index] = None) -> Dict[str, pd.DataFrame]:
+    """Run the power flow and collect its result frames under ``"<key>.<attribute>"``."""
+    snapshots = n.snapshots if snapshots is None else snapshots
+    if mode == "linear":
+        return linear_powerflow(n, snapshots)
+
+    info = n.pf(snapshots=snapshots)
+    frames: Dict[str, pd.DataFrame] = {
+        "converged": info["converged"].all(axis=1).to_frame("converged"),
+        "iterations": info["n_iter"].max(axis=1).to_frame("iterations"),
+    }
+    for key, (dynamic, attrs) in AC_ATTRIBUTES.items():
+        container = getattr(n, dynamic)
+        for attr in attrs:
+            frames[f"{key}.{attr}"] = container[attr].loc[snapshots]
+    if not n.lines.empty:
+        frames["lines.loading"] = line_loading(n, n.lines_t.p0, n.lines_t.q0).loc[snapshots]
+    return frames
+
+
+# Per-worker network for parallel AC power flow
+_network = None
+
+
+def _init_worker(frames: Dict[str, pd.DataFrame], snapshots: Optional[List[Any]]) -> None:
+    import warnings
+
+    from network_builder import build_network
+
+    warnings.simplefilter("ignore")
+    global _network
+    _network = build_network(frames, snapshots)
+
+
+def _solve_chunk(mode: str, start: int, stop: int) -> Dict[str, pd.DataFrame]:
+    return powerflow_frames(_network, mode, _network.snapshots[start:stop])
+
+
+def parallel_powerflow(
+    frames: Dict[str, pd.DataFrame],
+    snapshots: Optional[List[Any]],
+    n_snapshots: int,
+    mode: str,
+    workers: int,
+) -> Dict[str, pd.DataFrame]:
+    """Run the power flow in ``workers`` processes, one contiguous snapshot chunk each."""
+    bounds = np.linspace(0, n_snapshots, min(workers, n_snapshots) + 1).astype(int)
+    with ProcessPoolExecutor(
+        max_workers=len(bounds) - 1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(frames, snapshots),
+    ) as pool:
+        chunks = list(pool.map(_solve_chunk, [mode] * (len(bounds) - 1), bounds[:-1], bounds[1:]))
+    return {key: pd.concat([chunk[key] for chunk in chunks]) for key in chunks[0]}
@@ -17,6 +17,28 @@ block_cipher = None
 
 # Hidden imports required for FastAPI, Uvicorn, and PyPSA
 hidden_imports = [
+    # ResDEEDS backend modules (some are imported lazily by app.py)
+    'network_builder',
+    'jobs',
+    'cache',
+    'encoding',
+    'solvers',
+    'batch',
+    'sessions',
+    'powerflow',
+    'contingency',
+    'montecarlo',
+    'topology',
+    'metrics',
+    'incremental',
+    'result_store',
+    'planning',
+    'temporal',
+    'spatial',
+    'results',
+    'msgpack',
+    'orjson',
+
     # FastAPI core dependencies
     'fastapi',
     'fastapi.routing',
@@ -0,0 +1,279 @@
+"""
+Solved networks kept on disk as NetCDF and read back in slices.
+
+``ResultStore.save`` exports a solved network with PyPSA's
+``export_to_netcdf`` under a new result id, next to a small JSON file
+with what the response needs to describe it. Reads never load the whole
+file: ``xarray.open_dataset`` maps the variables lazily, so selecting one
+component's attribute and a range of snapshots only reads that block
+from disk.
+
+PyPSA names the variables ``{component}_{attribute}`` with dimension
+``{component}_i`` for static attributes and ``{component}_t_{attribute}``
+with dimensions ``(snapshots, {component}_t_{attribute}_i)`` for time
+series; ``catalog`` recovers both from the dimensions.
+
+Reads can be paged over the component rows: with a ``limit`` at most
+that many names are returned together with the "total" and an opaque
+"next_cursor" that continues the same listing.
+
+The store only holds a directory and a size limit, so it can be pickled
+into solve worker processes; files are written under a temporary name
+and renamed, and the oldest results beyond ``max_results`` are removed.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import base64
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from results import plain
+
+# Component lists that can be retrieved, as named in requests and results
+COMPONENTS = ("buses", "generators", "loads", "lines", "storage_units")
+
+_RESULT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UnknownResultError(KeyError):
+    """Raised when a result id, component or attribute is not in the store."""
+
+    def __str__(self) -> str:
+        return str(self.args[0]) if self.args else ""
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not issued for the rows being read."""
+
+
+def encode_cursor(scope: str, offset: int) -> str:
+    """Cursor continuing the listing ``scope`` at row ``offset``."""
+    return base64.urlsafe_b64encode(f"{scope}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(scope: str, cursor: Optional[str]) -> int:
+    """Row offset of ``cursor``, 0 without one."""
+    if cursor is None:
+        return 0
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_scope, offset = text.rsplit(":", 1)
+        position = int(offset)
+    except ValueError:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    if cursor_scope != scope or position < 0:
+        raise InvalidCursorError(f"Cursor does not belong to {scope}")
+    return position
+
+
+def catalog(ds) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """component -> {"static": {attribute: variable}, "series": {attribute: variable}} of an exported network."""
+    components: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for name, variable in ds.data_vars.items():
+        for component in COMPONENTS:
+            if variable.dims == (f"{component}_i",) and name.startswith(f"{component}_"):
+                kind, attr = "static", name[len(component) + 1:]
+            elif variable.dims == ("snapshots", f"{name}_i") and name.startswith(f"{component}_t_"):
+                kind, attr = "series", name[len(component) + 3:]
+            else:
+                continue
+            entry = components.setdefault(component, {"static": {}, "series": {}})
+            entry[kind][attr] = name
+            break
+    return components
+
+
+class ResultStore:
+    """Directory of exported networks keyed by result id."""
+
+    def __init__(self, directory: str, max_results: int = 32):
+        self.directory = Path(directory)
+        self.max_results = max_results
+
+    def _path(self, result_id: str, suffix: str) -> Path:
+        if not _RESULT_ID.match(result_id):
+            raise UnknownResultError(f"Unknown result: {result_id}")
+        return self.directory / f"{result_id}{suffix}"
+
+    def save(self, n, info: Optional[Dict[str, Any]] = None) -> str:
+        """Export the solved network ``n`` and return its result id."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        result_id = uuid.uuid4().hex
+        path = self._path(result_id, ".nc")
+        partial = path.with_suffix(".nc.tmp")
+        n.export_to_netcdf(str(partial))
+        os.replace(partial, path)
+        # Timesteps without their investment period, as in analysis results
+        timesteps = n.snapshots.get_level_values(-1)
+        meta = {
+            "id": result_id,
+            "created": time.time(),
+            "snapshots": len(n.snapshots),
+            "first_snapshot": str(timesteps[0]) if len(timesteps) else None,
+            "last_snapshot": str(timesteps[-1]) if len(timesteps) else None,
+            "investment_periods": [int(period) for period in n.investment_periods],
+            "bytes": path.stat().st_size,
+            **(info or {}),
+        }
+        self._path(result_id, ".json").write_text(json.dumps(meta))
+        self._evict()
+        return result_id
+
+    def _evict(self) -> None:
+        metas = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for meta in metas[:max(0, len(metas) - self.max_results)]:
+            try:
+                meta.with_suffix(".nc").unlink(missing_ok=True)
+                meta.unlink(missing_ok=True)
+            except OSError:
+                # Still open by a reader (Windows); removed on a later save
+                pass
+
+    def exists(self, result_id: str) -> bool:
+        try:
+            return self._path(result_id, ".nc").exists() and self._path(result_id, ".json").exists()
+        except UnknownResultError:
+            return False
+
+    def _open(self, result_id: str):
+        import xarray as xr
+
+        path = self._path(result_id, ".nc")
+        if not path.exists():
+            raise UnknownResultError(f"Unknown result: {result_id}")
+        return xr.open_dataset(path, cache=False)
+
+    def describe(self, result_id: str) -> Dict[str, Any]:
+        """Stored metadata and the attributes available per component."""
+        try:
+            meta = json.loads(self._path(result_id, ".json").read_text())
+        except FileNotFoundError:
+            raise UnknownResultError(f"Unknown result: {result_id}")
+        with self._open(result_id) as ds:
+            components = {
+                component: {
+                    "count": int(ds.sizes.get(f"{component}_i", 0)),
+                    "static": sorted(entry["static"]),
+                    "series": sorted(entry["series"]),
+                }
+                for component, entry in catalog(ds).items()
+            }
+        return {**meta, "components": components}
+
+    def _variable(self, ds, component: str, attribute: str):
+        entry = catalog(ds).get(component)
+        if entry is None:
+            raise UnknownResultError(f"No {component} in result")
+        for kind in ("series", "static"):
+            if attribute in entry[kind]:
+                return kind, ds[entry[kind][attribute]]
+        raise UnknownResultError(f"Unknown attribute for {component}: {attribute}")
+
+    def read_static(
+        self,
+        result_id: str,
+        component: str,
+        attributes: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Static attributes of one component type as attribute -> {name: value}."""
+        with self._open(result_id) as ds:
+            entry = catalog(ds).get(component)
+            if entry is None:
+                raise UnknownResultError(f"No {component} in result")
+            unknown = sorted(set(attributes or []) - set(entry["static"]))
+            if unknown:
+                raise UnknownResultError(f"Unknown attribute for {component}: {', '.join(unknown)}")
+            values = {}
+            paging: Dict[str, Any] = {}
+            for attr in attributes or sorted(entry["static"]):
+                variable, paging = self._rows(ds[entry["static"][attr]], names, f"{result_id}/{component}", cursor, limit)
+                index = variable.indexes[variable.dims[0]]
+                values[attr] = dict(zip(map(str, index), plain(variable.values)))
+        return {"component": component, "attributes": values, **paging}
+
+    @staticmethod
+    def _existing(variable, names: List[str]) -> List[str]:
+        index = variable.indexes[variable.dims[-1]]
+        missing = [name for name in names if name not in index]
+        if missing:
+            raise UnknownResultError(f"Unknown names: {', '.join(missing[:10])}")
+        return names
+
+    @classmethod
+    def _rows(cls, variable, names: Optional[List[str]], scope: str, cursor: Optional[str], limit: Optional[int]):
+        """``variable`` cut to one page of its component rows, and the paging fields of the response."""
+        dim = variable.dims[-1]
+        if names is not None:
+            variable = variable.sel({dim: cls._existing(variable, names)})
+        count = variable.sizes[dim]
+        start = min(decode_cursor(scope, cursor), count)
+        stop = count if limit is None else min(count, start + limit)
+        paging = {"total": count, "next_cursor": encode_cursor(scope, stop) if stop < count else None}
+        return variable.isel({dim: slice(start, stop)}), paging
+
+    def read_attribute(
+        self,
+        result_id: str,
+        component: str,
+        attribute: str,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        names: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """One attribute of one component type.
+
+        Time series are cut to the snapshot positions ``start:stop`` and
+        returned as name -> values with the matching "snapshots"; static
+        attributes as name -> value.
+        """
+        with self._open(result_id) as ds:
+            kind, variable = self._variable(ds, component, attribute)
+            variable, paging = self._rows(variable, names, f"{result_id}/{component}/{attribute}", cursor, limit)
+            if kind == "static":
+                index = variable.indexes[variable.dims[0]]
+                return {
+                    "component": component,
+                    "attribute": attribute,
+                    "values": dict(zip(map(str, index), plain(variable.values))),
+                    **paging,
+                }
+            variable = variable.isel(snapshots=slice(start, stop))
+            # Only the selected block is read from disk here
+            values = variable.values.T
+            columns = variable.indexes[variable.dims[1]]
+            result = {
+                "component": component,
+                "attribute": attribute,
+                "snapshots": [str(s) for s in pd.Index(variable.indexes["snapshots"])],
+                "values": {str(name): plain(row) for name, row in zip(columns, values)},
+            }
+            window = slice(start, stop)
+            if "snapshots_snapshot" in ds:
+                # The snapshots coordinate only holds positions; the labels are stored next to it
+                labels = pd.Index(ds["snapshots_snapshot"].isel(snapshots=window).values)
+                result["snapshots"] = [str(s) for s in labels]
+            if "snapshots_timestep" in ds:
+                # Investment periods are stored as a separate level next to the timesteps
+                timesteps = pd.Index(ds["snapshots_timestep"].isel(snapshots=window).values)
+                result["snapshots"] = [str(s) for s in timesteps]
+                result["snapshot_periods"] = [int(p) for p in ds["snapshots_period"].isel(snapshots=window).values]
+            return {**result, **paging}
+
+    def delete(self, result_id: str) -> bool:
+        """Remove a stored result; False if it did not exist."""
+        existed = self.exists(result_id)
+        for suffix in (".nc", ".json"):
+            self._path(result_id, suffix).unlink(missing_ok=True)
+        return existed
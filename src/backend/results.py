@@ -0,0 +1,238 @@
+"""
+Result sections of a solved network and their JSON encoding.
+
+``extract_results`` builds the "capacities", "power", "timeseries" and
+"statistics" sections of an analysis result. Every attribute is read
+from the network once as a NumPy array, instead of going through
+``reset_index``/``to_dict`` or a JSON round trip per frame. Time series
+stay float arrays, one per component, which orjson encodes directly (NaN
+as null); only the per-component records of "capacities" and "power" and
+the statistics are converted to Python values. ``components``
+(result keys such as "generators") and ``attributes`` (such as
+"p_nom_opt", "p" or the statistics column "Optimal Capacity") restrict
+what is extracted; the component name column of a record is always kept.
+
+``encode_json`` writes results as compact JSON with orjson, falling back
+to the standard library when orjson cannot be imported.
+"""
+
+from typing import Any, Collection, Dict, Iterator, List, Optional
+
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson  # type: ignore
+    orjson_import_error: Optional[str] = None
+except Exception as e:  # pragma: no cover - environment not synced
+    orjson = None  # type: ignore
+    orjson_import_error = f"{type(e).__name__}: {e}"
+
+SECTIONS = ("capacities", "power", "timeseries", "statistics")
+
+# Result key -> (PyPSA component, static attributes) for "capacities"
+CAPACITY_ATTRIBUTES = {
+    "generators": ("Generator", ["p_nom", "p_nom_opt"]),
+    "lines": ("Line", ["s_nom", "s_nom_opt"]),
+    "storage_units": ("StorageUnit", ["p_nom", "max_hours", "p_nom_opt"]),
+}
+
+# Result key -> (PyPSA component, time-varying attribute) for "power" at the first snapshot
+POWER_ATTRIBUTES = {
+    "generators": ("Generator", "p"),
+    "loads": ("Load", "p"),
+    "lines": ("Line", "p0"),
+    "buses": ("Bus", "p"),
+}
+
+# Result key -> (component attribute, time-varying attributes) for "timeseries"
+TIMESERIES_ATTRIBUTES = {
+    "generators": ("generators_t", ["p"]),
+    "loads": ("loads_t", ["p"]),
+    "lines": ("lines_t", ["p0"]),
+    "buses": ("buses_t", ["p"]),
+    "storage_units": ("storage_units_t", ["p", "state_of_charge"]),
+}
+
+# PyPSA component of every result key, for selecting statistics rows
+COMPONENT_NAMES = {
+    "buses": "Bus",
+    "generators": "Generator",
+    "loads": "Load",
+    "lines": "Line",
+    "storage_units": "StorageUnit",
+}
+
+
+def plain(values: np.ndarray) -> List[Any]:
+    """Array values as JSON-safe Python objects, with NaN as None."""
+    if values.dtype.kind == "f":
+        if np.isnan(values).any():
+            return np.where(np.isnan(values), None, values.astype(object)).tolist()
+        return values.tolist()
+    if values.dtype.kind in "US":
+        return values.astype(str).tolist()
+    return [None if isinstance(value, float) and np.isnan(value) else value for value in values.tolist()]
+
+
+def _selected(name: str, selection: Optional[Collection[str]]) -> bool:
+    return selection is None or name in selection
+
+
+def _name_key(index: pd.Index) -> str:
+    # What reset_index() names the column, with "index" renamed to "name"
+    return "name" if index.name in (None, "index") else str(index.name)
+
+
+def records(index: pd.Index, columns: Dict[str, Optional[np.ndarray]]) -> List[Dict[str, Any]]:
+    """One dict per component: its name under the index name, then one value per column.
+
+    A column of None stands for an attribute the network does not have.
+    """
+    keys = [_name_key(index), *columns]
+    values = [index.tolist()] + [
+        plain(column) if column is not None else [None] * len(index) for column in columns.values()
+    ]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def capacities(
+    n, components: Optional[Collection[str]] = None, attributes: Optional[Collection[str]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Installed and optimized capacities, one record per component."""
+    section = {}
+    for key, (component, attrs) in CAPACITY_ATTRIBUTES.items():
+        if not _selected(key, components):
+            continue
+        static = n.static(component)
+        section[key] = records(static.index, {
+            attr: static[attr].to_numpy(dtype=float) if attr in static else None
+            for attr in attrs
+            if _selected(attr, attributes)
+        }) if not static.empty else []
+    return section
+
+
+def power(
+    n, components: Optional[Collection[str]] = None, attributes: Optional[Collection[str]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Dispatch and flows at the first snapshot, one record per component."""
+    section = {}
+    for key, (component, attr) in POWER_ATTRIBUTES.items():
+        if not _selected(key, components):
+            continue
+        frame = n.dynamic(component).get(attr)
+        if frame is None or frame.empty:
+            section[key] = []
+            continue
+        columns = {attr: frame.to_numpy(dtype=float)[0]} if _selected(attr, attributes) else {}
+        section[key] = records(frame.columns, columns)
+    return section
+
+
+def columnar_series(df) -> Dict[str, np.ndarray]:
+    """Encode a snapshot-by-component frame as one float array per component."""
+    if df is None or df.empty:
+        return {}
+    # orjson only serializes C-contiguous arrays, so every row has to be one
+    values = np.ascontiguousarray(df.to_numpy(dtype=float).T)
+    return dict(zip(map(str, df.columns), values))
+
+
+def timeseries(
+    n, components: Optional[Collection[str]] = None, attributes: Optional[Collection[str]] = None
+) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+    """Full time series for every snapshot, aligned to the top-level "snapshots"."""
+    section = {}
+    for key, (dynamic, attrs) in TIMESERIES_ATTRIBUTES.items():
+        frames = getattr(n, dynamic, None)
+        if frames is None or not _selected(key, components):
+            continue
+        section[key] = {
+            attr: columnar_series(getattr(frames, attr, None)) for attr in attrs if _selected(attr, attributes)
+        }
+    return section
+
+
+def timeseries_json(
+    n, components: Optional[Collection[str]] = None, attributes: Optional[Collection[str]] = None
+) -> Iterator[str]:
+    """The "timeseries" section as JSON text, in chunks."""
+    from incremental import columns_json
+
+    separator = "{"
+    for key, (dynamic, attrs) in TIMESERIES_ATTRIBUTES.items():
+        frames = getattr(n, dynamic, None)
+        if frames is None or not _selected(key, components):
+            continue
+        yield f'{separator}"{key}":{{'
+        selected = [attr for attr in attrs if _selected(attr, attributes)]
+        for i, attr in enumerate(selected):
+            yield f'"{attr}":' if i == 0 else f',"{attr}":'
+            yield from columns_json(getattr(frames, attr, None))
+        yield "}"
+        separator = ","
+    yield "{}" if separator == "{" else "}"
+
+
+def statistics(
+    n, components: Optional[Collection[str]] = None, attributes: Optional[Collection[str]] = None
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """PyPSA's statistics as metric -> {"(component, carrier)": value}; empty if they fail."""
+    try:
+        stats = n.statistics()
+    except Exception:
+        return {}
+    if not isinstance(stats, pd.DataFrame) or stats.empty:
+        return {}
+    if components is not None:
+        wanted = {COMPONENT_NAMES.get(key, key) for key in components}
+        stats = stats[stats.index.get_level_values(0).isin(wanted)]
+    if attributes is not None:
+        stats = stats[[column for column in stats.columns if column in attributes]]
+    # Row labels as DataFrame.to_json writes them, e.g. "('Generator', 'solar')"
+    labels = [str(label) for label in stats.index]
+    values = stats.to_numpy(dtype=float).T
+    return {str(column): dict(zip(labels, plain(row))) for column, row in zip(stats.columns, values)}
+
+
+# Section -> function building it
+EXTRACTORS = {
+    "capacities": capacities,
+    "power": power,
+    "timeseries": timeseries,
+    "statistics": statistics,
+}
+
+
+def extract_results(
+    n,
+    sections: Collection[str] = SECTIONS,
+    components: Optional[Collection[str]] = None,
+    attributes: Optional[Collection[str]] = None,
+) -> Dict[str, Any]:
+    """The requested result sections of the solved network ``n``."""
+    unknown = set(sections) - set(EXTRACTORS)
+    if unknown:
+        raise ValueError(f"Unknown result sections: {', '.join(sorted(unknown))}")
+    return {section: EXTRACTORS[section](n, components, attributes) for section in SECTIONS if section in sections}
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return plain(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(content: Any) -> bytes:
+    """``content`` as compact UTF-8 JSON; NaN is written as null by orjson."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    # The same settings as fastapi.responses.JSONResponse
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
@@ -0,0 +1,354 @@
+"""
+Session-scoped networks for incremental re-solves.
+
+A session keeps a built (and solved) ``pypsa.Network`` in the server
+process together with its linopy model. Patches add, remove or update
+components on that network instead of rebuilding it from a full payload.
+When a patch only changes parameters that enter the existing model as
+bounds, right-hand sides or cost coefficients, the model is updated in
+place and solved again; any structural change (added or removed
+components, topology, extendable capacities, ...) rebuilds the model.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pypsa
+import xarray as xr
+
+from network_builder import (
+    BOOLEAN_ATTRIBUTES,
+    COMPONENT_SPECS,
+    FALLBACK_FIELDS,
+    SERIES_SPECS,
+    InvalidPayloadError,
+    component_frame,
+    series_frame,
+)
+
+# Attributes whose changes only move bounds, right-hand sides or costs of the
+# model of non-extendable components
+MODEL_PARAMETERS: Dict[str, Set[str]] = {
+    "generators": {"p_nom", "p_max_pu", "p_min_pu", "marginal_cost"},
+    "lines": {"s_nom", "s_max_pu"},
+    "loads": {"p_set"},
+}
+
+# Attributes the optimization does not use at all
+NON_MODEL_ATTRIBUTES: Dict[str, Set[str]] = {
+    "buses": {"x", "y"},
+    "generators": {"control"},
+    "loads": {"q_set"},
+}
+
+# Flags that make a component's capacity or status a model variable
+EXTENDABLE_FLAGS = ("p_nom_extendable", "s_nom_extendable", "committable")
+
+
+class InvalidPatchError(ValueError):
+    """Raised when a patch does not match the session network."""
+
+
+class Session:
+    def __init__(self, network: "pypsa.Network", payload: Any, solve_kwargs: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.network = network
+        self.payload = payload
+        self.solve_kwargs = solve_kwargs
+        self.revision = 0
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        # Held while the network is patched or solved
+        self.lock = threading.Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        n = self.network
+        return {
+            "id": self.id,
+            "revision": self.revision,
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+            "components": {field: len(getattr(n, field)) for field in COMPONENT_SPECS},
+            "snapshots": len(n.snapshots),
+            "model": n.model is not None,
+        }
+
+
+class SessionStore:
+    """Sessions kept in memory, evicted least-recently-used or after ``ttl`` idle seconds."""
+
+    def __init__(self, max_sessions: int = 8, ttl: float = 3600.0):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_used < cutoff]:
+            del self._sessions[session_id]
+
+    def create(self, network: "pypsa.Network", payload: Any, solve_kwargs: Dict[str, Any]) -> Session:
+        session = Session(network, payload, solve_kwargs)
+        with self._lock:
+            self._expire()
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.time()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions}
+
+
+def _component_attrs(field: str) -> pd.DataFrame:
+    return pypsa.Network().component_attrs[COMPONENT_SPECS[field][0]]
+
+
+def _check_field(field: str) -> None:
+    if field not in COMPONENT_SPECS:
+        raise InvalidPatchError(f"Unknown component '{field}' (expected one of: {', '.join(COMPONENT_SPECS)})")
+
+
+def _check_names(n: "pypsa.Network", field: str, names: List[str]) -> None:
+    unknown = [name for name in names if name not in getattr(n, field).index]
+    if unknown:
+        raise InvalidPatchError(f"Patch refers to unknown {field}: {', '.join(unknown[:10])}")
+
+
+def _row_name(field: str, row: Dict[str, Any]) -> str:
+    name = row.get("name") or row.get("id")
+    if not name:
+        raise InvalidPatchError(f"Every {field} update needs a 'name'")
+    return str(name)
+
+
+def plan_patch(n: "pypsa.Network", patch: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Set[str]]], bool]:
+    """Validate a patch against ``n``.
+
+    Returns the changed attributes as ``{field: {attribute: names}}`` and
+    whether the patch changes the structure of the model.
+    """
+    changes: Dict[str, Dict[str, Set[str]]] = {}
+    structural = False
+
+    for field, names in patch.get("remove", {}).items():
+        _check_field(field)
+        _check_names(n, field, names)
+        structural = structural or bool(names)
+
+    for field, rows in patch.get("add", {}).items():
+        _check_field(field)
+        existing = [row.get("name") or row.get("id") for row in rows]
+        clashes = [name for name in existing if name and name in getattr(n, field).index]
+        if clashes:
+            raise InvalidPatchError(f"{field} already exist: {', '.join(map(str, clashes[:10]))}")
+        structural = structural or bool(rows)
+
+    for field, rows in patch.get("update", {}).items():
+        _check_field(field)
+        attrs = _component_attrs(field)
+        fallbacks = FALLBACK_FIELDS.get(field, {})
+        for row in rows:
+            name = _row_name(field, row)
+            _check_names(n, field, [name])
+            for attr in row:
+                if attr in ("name", "id"):
+                    continue
+                targets = [target for target, source in fallbacks.items() if source == attr and target not in row]
+                for target in targets or [attr]:
+                    if target not in attrs.index:
+                        raise InvalidPatchError(f"{field} has no attribute '{attr}'")
+                    changes.setdefault(field, {}).setdefault(target, set()).add(name)
+
+    for series_field, (field, _) in SERIES_SPECS.items():
+        for attr, columns in patch.get(series_field, {}).items():
+            if not columns:
+                continue
+            try:
+                series_frame(series_field, attr, columns, getattr(n, field).index, len(n.snapshots))
+            except InvalidPayloadError as e:
+                raise InvalidPatchError(str(e)) from e
+            changes.setdefault(field, {}).setdefault(attr, set()).update(columns)
+
+    for field, attrs in changes.items():
+        removed = set(patch.get("remove", {}).get(field, []))
+        for attr, names in attrs.items():
+            if names & removed:
+                raise InvalidPatchError(f"Cannot change {field} that the patch removes: {', '.join(sorted(names & removed)[:10])}")
+            if attr in NON_MODEL_ATTRIBUTES.get(field, set()):
+                continue
+            if attr not in MODEL_PARAMETERS.get(field, set()):
+                structural = True
+                continue
+            static = getattr(n, field).loc[list(names)]
+            flags = [flag for flag in EXTENDABLE_FLAGS if flag in static.columns]
+            if static[flags].any(axis=None):
+                structural = True
+
+    return changes, structural
+
+
+def apply_patch(n: "pypsa.Network", patch: Dict[str, Any]) -> None:
+    """Apply a validated patch to the network in place."""
+    for field, names in patch.get("remove", {}).items():
+        if names:
+            n.remove(COMPONENT_SPECS[field][0], names)
+
+    for field, rows in patch.get("add", {}).items():
+        if not rows:
+            continue
+        frame = component_frame(field, rows)
+        n.add(COMPONENT_SPECS[field][0], frame.index, **{attr: frame[attr].to_numpy() for attr in frame.columns})
+
+    for field, rows in patch.get("update", {}).items():
+        static = getattr(n, field)
+        dynamic = getattr(n, f"{field}_t")
+        fallbacks = FALLBACK_FIELDS.get(field, {})
+        for row in rows:
+            name = _row_name(field, row)
+            for attr, value in row.items():
+                if attr in ("name", "id"):
+                    continue
+                targets = [target for target, source in fallbacks.items() if source == attr and target not in row]
+                for target in targets or [attr]:
+                    static.loc[name, target] = bool(value) if target in BOOLEAN_ATTRIBUTES else value
+                    series = dynamic[target] if target in dynamic else None
+                    if series is not None and name in series.columns:
+                        # A time series would take precedence over the new static value
+                        dynamic[target] = series.drop(columns=[name])
+
+    for series_field, (field, _) in SERIES_SPECS.items():
+        dynamic = getattr(n, f"{field}_t")
+        for attr, columns in patch.get(series_field, {}).items():
+            if not columns:
+                continue
+            frame = series_frame(series_field, attr, columns, getattr(n, field).index, len(n.snapshots))
+            frame = frame.set_axis(n.snapshots, axis=0)
+            series = dynamic[attr].copy()
+            for name in frame.columns:
+                series[name] = frame[name]
+            dynamic[attr] = series
+
+
+def _set_rhs(m, name: str, values: pd.DataFrame) -> None:
+    """Replace the right-hand side of a (snapshot, component) constraint."""
+    constraint = m.constraints[name]
+    rhs = constraint.rhs
+    dim = next(d for d in rhs.dims if d != "snapshot")
+    data = values.loc[:, rhs.coords[dim].values].to_numpy()
+    constraint.rhs = xr.DataArray(
+        data, coords={"snapshot": rhs.coords["snapshot"], dim: rhs.coords[dim]}, dims=("snapshot", dim)
+    ).transpose(*rhs.dims)
+
+
+def _update_bounds(n: "pypsa.Network", component: str, nominal: str, per_unit: str, prefix: str) -> None:
+    m = n.model
+    fix = m.constraints[f"{prefix}-upper"].rhs.coords[f"{component}-fix"].values
+    nom = n.static(component)[nominal][fix]
+    upper = n.get_switchable_as_dense(component, f"{per_unit}_max_pu")[fix] * nom
+    if component == "Line":
+        lower = -upper
+    else:
+        lower = n.get_switchable_as_dense(component, f"{per_unit}_min_pu")[fix] * nom
+    _set_rhs(m, f"{prefix}-upper", upper)
+    _set_rhs(m, f"{prefix}-lower", lower)
+
+
+def _update_marginal_costs(n: "pypsa.Network", names: List[str]) -> bool:
+    m = n.model
+    labels = m.variables["Generator-p"].labels.sel(Generator=names).transpose("snapshot", "Generator")
+    weights = n.snapshot_weightings.objective.to_numpy()[:, None]
+    costs = n.get_switchable_as_dense("Generator", "marginal_cost")[names].to_numpy() * weights
+    lookup = pd.Series(costs.ravel(), index=labels.values.ravel())
+
+    expression = m.objective.expression
+    variables = expression.vars.values
+    terms = np.isin(variables, lookup.index)
+    if terms.sum() != len(lookup):
+        # Zero costs have no objective term to update
+        return False
+    coeffs = expression.coeffs.values.copy()
+    coeffs[terms] = lookup.loc[variables[terms]].to_numpy()
+    m.objective = expression.assign(coeffs=(expression.coeffs.dims, coeffs))
+    return True
+
+
+def update_model(
+    n: "pypsa.Network",
+    changes: Dict[str, Dict[str, Set[str]]],
+    old_loads: Optional[pd.DataFrame] = None,
+) -> bool:
+    """Carry parameter changes into ``n.model``; False if it must be rebuilt instead."""
+    generators = changes.get("generators", {})
+    if generators.keys() & {"p_nom", "p_max_pu", "p_min_pu"}:
+        _update_bounds(n, "Generator", "p_nom", "p", "Generator-fix-p")
+    if "marginal_cost" in generators and not _update_marginal_costs(n, sorted(generators["marginal_cost"])):
+        return False
+
+    if changes.get("lines", {}).keys() & {"s_nom", "s_max_pu"}:
+        _update_bounds(n, "Line", "s_nom", "s", "Line-fix-s")
+
+    if "p_set" in changes.get("loads", {}) and old_loads is not None:
+        names = sorted(changes["loads"]["p_set"])
+        delta = n.get_switchable_as_dense("Load", "p_set")[names] - old_loads[names]
+        # Loads enter the nodal balance right-hand side as -sign * p_set
+        delta = delta * -n.loads.sign[names]
+        by_bus = delta.T.groupby(n.loads.bus[names]).sum()
+        constraint = n.model.constraints["Bus-nodal_balance"]
+        rhs = constraint.rhs.transpose("Bus", "snapshot").to_pandas()
+        rhs.loc[by_bus.index] += by_bus.to_numpy()
+        constraint.rhs = xr.DataArray(rhs.to_numpy(), coords={"Bus": rhs.index, "snapshot": rhs.columns}, dims=("Bus", "snapshot")).transpose(*constraint.rhs.dims)
+
+    return True
+
+
+def patch_network(n: "pypsa.Network", patch: Dict[str, Any]) -> bool:
+    """Apply ``patch`` to ``n`` and update its model in place where possible.
+
+    Returns True if ``n.model`` was updated and can be solved again
+    directly, False if the model has to be rebuilt; it is then removed
+    from ``n``.
+    """
+    changes, structural = plan_patch(n, patch)
+    reuse = n.model is not None and not structural
+    old_loads = n.get_switchable_as_dense("Load", "p_set") if reuse and "p_set" in changes.get("loads", {}) else None
+
+    if not reuse and n.model is not None:
+        # The model describes the network before the patch and must not be solved again
+        del n.model
+    apply_patch(n, patch)
+    if not reuse:
+        return False
+    if not update_model(n, changes, old_loads):
+        del n.model
+        return False
+    return True
+
+
+def copy_network(n: "pypsa.Network") -> "pypsa.Network":
+    """Deep copy of ``n`` without its optimization model."""
+    # The linopy and solver models are not copied; a network restored from the copy rebuilds them
+    memo = {} if n.model is None else {id(n.model): None}
+    return copy.deepcopy(n, memo)
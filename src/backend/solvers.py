@@ -0,0 +1,110 @@
+"""
+Solver selection and option translation for the LOPF.
+
+Requests name a solver and give generic settings (threads, wall-clock
+limit, MIP gap, feasibility tolerance). These are checked against the
+solvers linopy can actually use and translated to each solver's own
+option names; anything in ``solver_options`` is passed through as is.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import math
+
+DEFAULT_SOLVER = "highs"
+
+# Generic setting -> solver option name(s); settings a solver lacks are absent
+SOLVER_OPTION_NAMES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "highs": {
+        "threads": ("threads",),
+        "time_limit": ("time_limit",),
+        "mip_gap": ("mip_rel_gap",),
+        "tolerance": ("primal_feasibility_tolerance", "dual_feasibility_tolerance"),
+    },
+    "gurobi": {
+        "threads": ("Threads",),
+        "time_limit": ("TimeLimit",),
+        "mip_gap": ("MIPGap",),
+        "tolerance": ("FeasibilityTol", "OptimalityTol"),
+    },
+    "cplex": {
+        "threads": ("threads",),
+        "time_limit": ("timelimit",),
+        "mip_gap": ("mip.tolerances.mipgap",),
+        "tolerance": ("simplex.tolerances.feasibility", "simplex.tolerances.optimality"),
+    },
+    "xpress": {
+        "threads": ("THREADS",),
+        "time_limit": ("MAXTIME",),
+        "mip_gap": ("MIPRELSTOP",),
+        "tolerance": ("FEASTOL", "OPTIMALITYTOL"),
+    },
+    "cbc": {
+        "threads": ("threads",),
+        "time_limit": ("sec",),
+        "mip_gap": ("ratioGap",),
+        "tolerance": ("primalTolerance", "dualTolerance"),
+    },
+    "glpk": {
+        "time_limit": ("tmlim",),
+        "mip_gap": ("mipgap",),
+    },
+}
+
+# Solvers linopy can hand a model to in memory instead of through an LP file
+DIRECT_IO_SOLVERS = {"highs", "gurobi"}
+
+# Solvers that only accept whole seconds as a time limit
+INTEGER_TIME_LIMIT = {"glpk", "xpress"}
+
+
+class SolverConfigError(ValueError):
+    """Raised for an unavailable solver or unsupported solver settings."""
+
+
+def installed_solvers() -> List[str]:
+    """Solvers linopy detected in this environment."""
+    try:
+        import linopy
+
+        return list(linopy.available_solvers)
+    except Exception:
+        return []
+
+
+def solver_kwargs(
+    name: Optional[str] = None,
+    threads: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    mip_gap: Optional[float] = None,
+    tolerance: Optional[float] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Keyword arguments for ``n.optimize`` selecting and configuring a solver."""
+    name = (name or DEFAULT_SOLVER).lower()
+    available = installed_solvers()
+    if name not in available:
+        raise SolverConfigError(
+            f"Solver '{name}' is not installed (available: {', '.join(available) or 'none'})"
+        )
+
+    option_names = SOLVER_OPTION_NAMES.get(name, {})
+    if name in INTEGER_TIME_LIMIT and time_limit is not None:
+        time_limit = int(math.ceil(time_limit))
+    settings = {"threads": threads, "time_limit": time_limit, "mip_gap": mip_gap, "tolerance": tolerance}
+
+    kwargs: Dict[str, Any] = {}
+    for setting, value in settings.items():
+        if value is None:
+            continue
+        if setting not in option_names:
+            raise SolverConfigError(f"Solver '{name}' does not support the '{setting}' setting")
+        for option in option_names[setting]:
+            kwargs[option] = value
+
+    if name == "highs" and threads is not None and threads > 1:
+        # HiGHS only uses its thread pool when parallelism is switched on
+        kwargs["parallel"] = "on"
+
+    kwargs.update(options or {})
+    return {"solver_name": name, **kwargs}
@@ -0,0 +1,430 @@
+"""
+Spatial reduction of a built network before solving.
+
+Detailed distribution models have many buses that only pass power along.
+``reduce_network`` builds a smaller equivalent copy of a network to
+optimize instead, in up to three steps:
+
+* ``collapse_dead_ends`` folds dead-end branches into the bus they hang
+  from, leaf by leaf, as long as the branch line can carry everything the
+  branch could ever export or import, so it can never be congested;
+* ``merge_series`` replaces every chain of lines through buses with
+  nothing attached (and the same nominal voltage) by one line with the
+  summed impedance and the smallest rating of the chain;
+* with a target number of ``buses`` the remaining buses are clustered,
+  either ``electrical``-ly, by joining buses across the lowest-reactance
+  lines first, or by k-means on their ``coordinates``. Lines within a
+  cluster disappear and parallel lines between two clusters become one
+  with their combined admittance and rating.
+
+Generators, loads and storage keep their names and are moved to the bus
+that stands for theirs. ``disaggregate`` writes the solution back onto
+the original network: the one-port results are copied by name, every
+bus takes the marginal price of the bus standing for it and the flows
+and voltage angles of the original lines and buses come from a linear
+power flow of the optimized dispatch. For the first two steps this
+reproduces the flows of the unreduced optimization exactly; clustering
+ignores the lines within a cluster, so ``max_line_loading`` in the
+metrics shows whether the disaggregated flows exceed any line rating.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+CLUSTER_METHODS = ("electrical", "coordinates")
+
+# Components attached to a single bus, which keep their names
+ONE_PORTS = ("Generator", "Load", "StorageUnit")
+
+# Relative slack when comparing a branch's most extreme power with a line rating
+_TOLERANCE = 1e-9
+
+
+class NetworkReduction:
+    """A reduced copy of a network and how its buses and lines relate to the original ones."""
+
+    def __init__(self, network: "pypsa.Network", busmap: pd.Series, kept_lines: List[str]):
+        self.network = network
+        # Reduced bus standing for every original bus
+        self.busmap = busmap
+        # Original lines that are in the reduced network unchanged
+        self.kept_lines = kept_lines
+        self.metrics: Dict[str, Any] = {}
+
+
+def _bus_limits(n: "pypsa.Network") -> pd.DataFrame:
+    """Most power the one-ports of every bus can export to and import from the grid."""
+    parts = []
+    if not n.generators.empty:
+        generators = n.generators
+        p_nom = generators.p_nom.where(~generators.p_nom_extendable, np.inf)
+        parts.append(pd.DataFrame({
+            "bus": generators.bus,
+            "export": (p_nom * n.get_switchable_as_dense("Generator", "p_max_pu").max()).clip(lower=0),
+            "import": (-p_nom * n.get_switchable_as_dense("Generator", "p_min_pu").min()).clip(lower=0),
+        }))
+    if not n.storage_units.empty:
+        storage = n.storage_units
+        p_nom = storage.p_nom.where(~storage.p_nom_extendable, np.inf)
+        parts.append(pd.DataFrame({
+            "bus": storage.bus,
+            "export": (p_nom * n.get_switchable_as_dense("StorageUnit", "p_max_pu").max()).clip(lower=0),
+            "import": (-p_nom * n.get_switchable_as_dense("StorageUnit", "p_min_pu").min()).clip(lower=0),
+        }))
+    if not n.loads.empty:
+        p_set = n.get_switchable_as_dense("Load", "p_set")
+        parts.append(pd.DataFrame({
+            "bus": n.loads.bus,
+            "export": (-p_set.min()).clip(lower=0),
+            "import": p_set.max().clip(lower=0),
+        }))
+    if not parts:
+        return pd.DataFrame(0.0, index=n.buses.index, columns=["export", "import"])
+    limits = pd.concat(parts).fillna(0.0).groupby("bus")[["export", "import"]].sum()
+    return limits.reindex(n.buses.index, fill_value=0.0)
+
+
+def _attached(n: "pypsa.Network") -> Dict[str, int]:
+    """Number of one-ports on every bus."""
+    buses = pd.concat([n.static(component).bus for component in ONE_PORTS])
+    return buses.value_counts().reindex(n.buses.index, fill_value=0).to_dict()
+
+
+class _Graph:
+    """Buses and lines of a network as they are reduced step by step."""
+
+    def __init__(self, n: "pypsa.Network"):
+        lines = n.lines
+        self.v_nom = n.buses.v_nom.to_dict()
+        self.lines: Dict[str, Dict[str, Any]] = {}
+        s_max_pu = n.get_switchable_as_dense("Line", "s_max_pu").min() if not lines.empty else pd.Series(dtype=float)
+        for name, line in lines.iterrows():
+            if line.bus0 == line.bus1:
+                continue
+            self.lines[name] = {
+                "bus0": line.bus0,
+                "bus1": line.bus1,
+                "x_pu": float(line.x_pu_eff),
+                "r_pu": float(line.r_pu_eff),
+                "capacity": float(line.s_nom * s_max_pu[name]),
+                "extendable": bool(line.s_nom_extendable),
+            }
+        self.adjacency: Dict[str, set] = {bus: set() for bus in n.buses.index}
+        for name, line in self.lines.items():
+            self.adjacency[line["bus0"]].add(name)
+            self.adjacency[line["bus1"]].add(name)
+        # Original lines replaced by a new equivalent line of the same name
+        self.replaced: set = set()
+
+    def other(self, line: str, bus: str) -> str:
+        ends = self.lines[line]
+        return ends["bus1"] if ends["bus0"] == bus else ends["bus0"]
+
+    def remove_line(self, line: str) -> None:
+        ends = self.lines.pop(line)
+        self.adjacency[ends["bus0"]].discard(line)
+        self.adjacency[ends["bus1"]].discard(line)
+
+
+def fold_dead_ends(graph: _Graph, limits: pd.DataFrame, attached: Dict[str, int]) -> Dict[str, str]:
+    """Fold leaf buses into their neighbour while the connecting line can never be congested.
+
+    Returns the bus each folded bus was folded into; ``limits`` and
+    ``attached`` are updated to include what the folded branches carry.
+    """
+    export = limits["export"].to_dict()
+    imports = limits["import"].to_dict()
+    folded: Dict[str, str] = {}
+    queue = [bus for bus, lines in graph.adjacency.items() if len(lines) == 1]
+    while queue:
+        bus = queue.pop()
+        if bus in folded or len(graph.adjacency[bus]) != 1:
+            continue
+        (line,) = graph.adjacency[bus]
+        definition = graph.lines[line]
+        need = max(export[bus], imports[bus])
+        if definition["extendable"] or need > definition["capacity"] * (1 + _TOLERANCE):
+            continue
+        parent = graph.other(line, bus)
+        graph.remove_line(line)
+        del graph.adjacency[bus]
+        export[parent] += export[bus]
+        imports[parent] += imports[bus]
+        attached[parent] += attached[bus]
+        folded[bus] = parent
+        if len(graph.adjacency[parent]) == 1:
+            queue.append(parent)
+    return folded
+
+
+def merge_series_chains(graph: _Graph, attached: Dict[str, int]) -> Dict[str, str]:
+    """Replace chains of lines through buses with nothing attached by one line each.
+
+    Returns the chain end standing for every removed bus: the buses up
+    to the lowest-rated line of a chain take the first end, the buses
+    after it the last one, so each shares the price of the side it is
+    connected to without congestion.
+    """
+
+    def passes_through(bus: str) -> bool:
+        lines = graph.adjacency.get(bus, ())
+        if len(lines) != 2 or attached.get(bus, 0):
+            return False
+        neighbours = {graph.other(line, bus) for line in lines}
+        return (
+            len(neighbours) == 2
+            and not any(graph.lines[line]["extendable"] for line in lines)
+            and all(graph.v_nom[other] == graph.v_nom[bus] for other in neighbours)
+        )
+
+    def walk(bus: str, line: str):
+        """Buses and lines from ``bus`` along ``line`` up to the first bus that does not pass through."""
+        buses, lines = [], [line]
+        current = graph.other(line, bus)
+        while passes_through(current) and current not in visited:
+            visited.add(current)
+            buses.append(current)
+            (line,) = graph.adjacency[current] - {line}
+            lines.append(line)
+            current = graph.other(line, current)
+        return buses, lines, current
+
+    mapping: Dict[str, str] = {}
+    visited: set = set()
+    for bus in list(graph.adjacency):
+        if bus in visited or not passes_through(bus):
+            continue
+        visited.add(bus)
+        first, second = sorted(graph.adjacency[bus])
+        left_buses, left_lines, start = walk(bus, first)
+        right_buses, right_lines, end = walk(bus, second)
+        if start == end or start in visited or end in visited:
+            # A loop back to the same bus or a ring of buses that all pass through
+            continue
+        inner = left_buses[::-1] + [bus] + right_buses
+        lines = left_lines[::-1] + right_lines
+        definitions = [graph.lines[line] for line in lines]
+        capacities = [definition["capacity"] for definition in definitions]
+        bottleneck = int(np.argmin(capacities))
+        for line in lines:
+            graph.remove_line(line)
+        for position, removed in enumerate(inner):
+            # Line i of the chain connects bus i - 1 and bus i of ``inner``
+            mapping[removed] = start if position < bottleneck else end
+            del graph.adjacency[removed]
+        name = lines[0]
+        graph.lines[name] = {
+            "bus0": start,
+            "bus1": end,
+            "x_pu": sum(definition["x_pu"] for definition in definitions),
+            "r_pu": sum(definition["r_pu"] for definition in definitions),
+            "capacity": min(capacities),
+            "extendable": False,
+        }
+        graph.adjacency[start].add(name)
+        graph.adjacency[end].add(name)
+        graph.replaced.add(name)
+    return mapping
+
+
+def cluster_buses(
+    graph: _Graph, n: "pypsa.Network", target: int, method: str = "electrical", seed: int = 0
+) -> Dict[str, str]:
+    """Group the remaining buses into at most ``target`` clusters.
+
+    Returns the representative (the first member in network order) of
+    every clustered bus that is not a representative itself; the lines
+    of ``graph`` are replaced by the lines between clusters.
+    """
+    buses = [bus for bus in n.buses.index if bus in graph.adjacency]
+    if len(buses) <= target:
+        return {}
+    if any(line["extendable"] for line in graph.lines.values()):
+        raise ValueError("Buses cannot be clustered while line capacities are extendable")
+
+    if method == "electrical":
+        parent = {bus: bus for bus in buses}
+
+        def root(bus: str) -> str:
+            while parent[bus] != bus:
+                parent[bus] = parent[parent[bus]]
+                bus = parent[bus]
+            return bus
+
+        components = len(buses)
+        for name in sorted(graph.lines, key=lambda line: graph.lines[line]["x_pu"]):
+            if components <= target:
+                break
+            a, b = root(graph.lines[name]["bus0"]), root(graph.lines[name]["bus1"])
+            if a != b:
+                parent[b] = a
+                components -= 1
+        labels = pd.Series([root(bus) for bus in buses], index=buses)
+    elif method == "coordinates":
+        from scipy.cluster.vq import kmeans2
+
+        coordinates = n.buses.loc[buses, ["x", "y"]].astype(float)
+        if coordinates.isna().any().any() or (coordinates.nunique() <= 1).all():
+            raise ValueError("Clustering by coordinates needs x/y coordinates on the buses")
+        _, labels = kmeans2(coordinates.to_numpy(), target, minit="++", seed=seed)
+        labels = pd.Series(labels, index=buses)
+    else:
+        raise ValueError(f"Unknown bus clustering method: {method}")
+
+    representative = labels.groupby(labels, sort=False).transform(lambda members: members.index[0])
+    mapping = {bus: rep for bus, rep in representative.items() if bus != rep}
+    position = {bus: i for i, bus in enumerate(buses)}
+
+    groups: Dict[tuple, List[str]] = {}
+    for name, line in graph.lines.items():
+        a, b = representative[line["bus0"]], representative[line["bus1"]]
+        if a != b:
+            groups.setdefault((a, b) if position[a] < position[b] else (b, a), []).append(name)
+    lines: Dict[str, Dict[str, Any]] = {}
+    for (a, b), names in groups.items():
+        definitions = [graph.lines[name] for name in names]
+        lines[names[0]] = {
+            "bus0": a,
+            "bus1": b,
+            "x_pu": 1 / sum(1 / d["x_pu"] for d in definitions),
+            "r_pu": 1 / sum(1 / d["r_pu"] for d in definitions) if all(d["r_pu"] > 0 for d in definitions) else 0.0,
+            "capacity": sum(d["capacity"] for d in definitions),
+            "extendable": False,
+        }
+        if len(names) > 1 or (graph.lines[names[0]]["bus0"], graph.lines[names[0]]["bus1"]) != (a, b):
+            graph.replaced.add(names[0])
+    graph.lines = lines
+    graph.replaced &= set(lines)
+    graph.adjacency = {bus: set() for bus in representative.unique()}
+    for name, line in lines.items():
+        graph.adjacency[line["bus0"]].add(name)
+        graph.adjacency[line["bus1"]].add(name)
+    return mapping
+
+
+def reduce_network(
+    n: "pypsa.Network",
+    merge_series: bool = True,
+    collapse_dead_ends: bool = True,
+    buses: Optional[int] = None,
+    cluster_by: str = "electrical",
+    seed: int = 0,
+) -> NetworkReduction:
+    """A reduced copy of ``n`` to optimize in its place.
+
+    ``n`` itself is not changed; pass the returned reduction to
+    ``disaggregate`` once its network is solved.
+    """
+    if cluster_by not in CLUSTER_METHODS:
+        raise ValueError(f"Unknown bus clustering method: {cluster_by}")
+    n.calculate_dependent_values()
+    graph = _Graph(n)
+    attached = _attached(n)
+    steps: List[Dict[str, str]] = []
+    metrics: Dict[str, Any] = {"buses": len(n.buses), "lines": len(n.lines)}
+
+    if collapse_dead_ends:
+        folded = fold_dead_ends(graph, _bus_limits(n), attached)
+        steps.append(folded)
+        metrics["dead_end_buses"] = len(folded)
+    if merge_series:
+        merged = merge_series_chains(graph, attached)
+        steps.append(merged)
+        metrics["series_buses"] = len(merged)
+    if buses is not None:
+        clustered = cluster_buses(graph, n, buses, cluster_by, seed)
+        steps.append(clustered)
+        metrics["clustered_buses"] = len(clustered)
+
+    busmap = pd.Series(n.buses.index, index=n.buses.index)
+    for step in steps:
+        # A bus folded into another one follows it through the later steps
+        busmap = busmap.map(lambda bus: _follow(step, bus))
+
+    m = n.copy()
+    for component in ONE_PORTS:
+        static = m.static(component)
+        if not static.empty:
+            static["bus"] = static.bus.map(busmap)
+    kept = [name for name in n.lines.index if name in graph.lines and name not in graph.replaced]
+    m.remove("Line", n.lines.index.difference(list(graph.lines)))
+    for name in graph.replaced:
+        line = graph.lines[name]
+        v_nom = m.buses.at[line["bus0"], "v_nom"]
+        m.lines.loc[name, ["bus0", "bus1", "x", "r", "s_nom", "s_max_pu", "type", "num_parallel"]] = [
+            line["bus0"], line["bus1"], line["x_pu"] * v_nom**2, line["r_pu"] * v_nom**2, line["capacity"], 1.0, "", 1.0
+        ]
+    m.remove("Bus", n.buses.index.difference(busmap.unique()))
+    if "s_max_pu" in m.lines_t and list(graph.replaced):
+        m.lines_t.s_max_pu = m.lines_t.s_max_pu.drop(columns=list(graph.replaced), errors="ignore")
+
+    reduction = NetworkReduction(m, busmap, kept)
+    metrics.update(
+        reduced_buses=len(m.buses),
+        reduced_lines=len(m.lines),
+        reduction_factor=len(n.buses) / max(1, len(m.buses)),
+    )
+    reduction.metrics = metrics
+    return reduction
+
+
+def _follow(mapping: Dict[str, str], bus: str) -> str:
+    while bus in mapping:
+        bus = mapping[bus]
+    return bus
+
+
+def _outputs(n: "pypsa.Network", component: str, series: bool) -> List[str]:
+    attrs = n.component_attrs[component]
+    kind = attrs.type.str.contains("series")
+    return attrs.index[attrs.status.str.startswith("Output") & (kind if series else ~kind)].tolist()
+
+
+def disaggregate(n: "pypsa.Network", reduction: NetworkReduction) -> None:
+    """Put the solution of the reduced network onto the original network ``n``.
+
+    Adds "max_line_loading" and "overloaded_lines" of the original lines
+    to the reduction metrics.
+    """
+    m = reduction.network
+    for component in ONE_PORTS:
+        for attr in _outputs(n, component, series=False):
+            if attr in m.static(component):
+                n.static(component)[attr] = m.static(component)[attr]
+
+    # The linear power flow takes the optimized dispatch as fixed injections
+    saved = {component: n.dynamic(component)["p_set"] for component in ("Generator", "StorageUnit")}
+    try:
+        for component in saved:
+            n.dynamic(component)["p_set"] = m.dynamic(component)["p"]
+        n.lpf()
+    finally:
+        for component, frame in saved.items():
+            n.dynamic(component)["p_set"] = frame
+    # ... and the slack may only have absorbed rounding
+    for component in ONE_PORTS:
+        for attr in _outputs(n, component, series=True):
+            frame = m.dynamic(component).get(attr)
+            if frame is not None and not frame.empty:
+                n.dynamic(component)[attr] = frame
+
+    prices = m.buses_t.marginal_price
+    if not prices.empty:
+        n.buses_t.marginal_price = prices[reduction.busmap.to_numpy()].set_axis(n.buses.index, axis=1)
+    n.lines["s_nom_opt"] = n.lines.s_nom
+    n.lines.loc[reduction.kept_lines, "s_nom_opt"] = m.lines.loc[reduction.kept_lines, "s_nom_opt"]
+    n.objective = m.objective
+    for component in ("Bus", "Line"):
+        # The power flow leaves the columns unnamed; results are keyed by the component name
+        for frame in n.dynamic(component).values():
+            frame.columns.name = component
+
+    if not n.lines.empty:
+        limits = n.get_switchable_as_dense("Line", "s_max_pu") * n.lines.s_nom_opt
+        flows = n.lines_t.p0.abs().reindex(columns=n.lines.index).to_numpy()
+        loading = np.divide(flows, limits.to_numpy(), out=np.zeros_like(flows), where=limits.to_numpy() > 0)
+        reduction.metrics["max_line_loading"] = float(loading.max()) if loading.size else 0.0
+        reduction.metrics["overloaded_lines"] = int((loading > 1 + 1e-6).any(axis=0).sum())
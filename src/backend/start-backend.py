@@ -3,6 +3,7 @@
 Startup script for ResDEEDS backend that ensures dependencies are available
 """
 
+import importlib.util
 import sys
 import os
 import subprocess
@@ -36,35 +37,18 @@ def ensure_dependencies():
 
 def start_backend():
     """Start the backend service"""
-    # Check for required PyPSA dependencies
-    missing_deps = []
-
-    try:
-        import pypsa
-    except ImportError:
-        missing_deps.append("pypsa")
-
-    try:
-        import geopandas
-    except ImportError:
-        missing_deps.append("geopandas")
-
-    try:
-        import pandas
-    except ImportError:
-        missing_deps.append("pandas")
+    # Check for required PyPSA dependencies without importing them; the
+    # backend imports PyPSA itself (in the background with --fast-start)
+    missing_deps = [name for name in ("pypsa", "pandas") if importlib.util.find_spec(name) is None]
 
     if missing_deps:
         print(f"ERROR: Missing required dependencies: {', '.join(missing_deps)}")
         print()
         print("To install the missing dependencies, run:")
-        print("  pip install pypsa geopandas pandas")
+        print("  pip install pypsa pandas")
         print()
         print("Or with uv:")
-        print("  uv add pypsa geopandas pandas")
-        print()
-        print("Note: geopandas requires additional system dependencies.")
-        print("See: https://geopandas.org/en/stable/getting_started/install.html")
+        print("  uv add pypsa pandas")
         return False
 
     # All dependencies available, start the full backend
@@ -0,0 +1,246 @@
+"""
+Temporal reduction of a built network before solving.
+
+``reduce_snapshots`` replaces the snapshots of a network by fewer,
+weighted ones and ``expand_snapshots`` puts the full horizon back after
+the solve, so result extraction, statistics and exports see every
+snapshot:
+
+* ``resample`` merges every ``resolution`` consecutive snapshots into
+  their first one with the mean of the inputs; the weightings of the
+  merged snapshots add up, so storage still advances by the hours it
+  stands for;
+* ``kmeans`` and ``hierarchical`` (Ward) cluster periods of ``period``
+  consecutive snapshots (e.g. days) on their normalized input profiles.
+  Each cluster is represented by its medoid, the actual period closest to
+  the cluster mean, whose objective and generator weightings are
+  multiplied by the number of periods it stands for. Snapshots after the
+  last full period are kept as they are.
+
+Outputs of a reduced snapshot are copied to every snapshot it stands for.
+Storage only carries energy between the representative periods in their
+chronological order, so its state of charge over the full horizon is an
+approximation; the ``metrics`` of a reduction quantify how well the
+reduced inputs reproduce the full ones.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+METHODS = ("resample", "kmeans", "hierarchical")
+
+# Components whose time series are reduced and expanded
+COMPONENTS = ("Bus", "Generator", "Load", "StorageUnit", "Line")
+
+
+def _series_attributes(n: "pypsa.Network", component: str, status: str) -> List[str]:
+    attrs = n.component_attrs[component]
+    return attrs.index[attrs.status.str.startswith(status) & attrs.type.str.contains("series")].tolist()
+
+
+def input_series(n: "pypsa.Network") -> Dict[Tuple[str, str], pd.DataFrame]:
+    """The time-varying inputs set on ``n``, by (component, attribute)."""
+    inputs = {}
+    for component in COMPONENTS:
+        dynamic = n.dynamic(component)
+        for attr in _series_attributes(n, component, "Input"):
+            if attr in dynamic and not dynamic[attr].empty:
+                inputs[component, attr] = dynamic[attr].copy()
+    return inputs
+
+
+def _normalized_profiles(inputs: Dict[Tuple[str, str], pd.DataFrame], count: int) -> np.ndarray:
+    """Snapshot-by-profile matrix of every varying input column scaled to [-1, 1]."""
+    columns = [np.zeros((count, 0))]
+    for frame in inputs.values():
+        values = frame.to_numpy(dtype=float)
+        values = values[:, np.nanmax(values, axis=0) > np.nanmin(values, axis=0)]
+        scale = np.abs(values).max(axis=0)
+        columns.append(values / np.where(scale > 0, scale, 1.0))
+    return np.nan_to_num(np.hstack(columns))
+
+
+def cluster_periods(features: np.ndarray, clusters: int, method: str, seed: int = 0) -> np.ndarray:
+    """Cluster label of every row of ``features``."""
+    clusters = min(clusters, len(features))
+    if clusters <= 1 or features.shape[1] == 0:
+        return np.zeros(len(features), dtype=int)
+    if method == "kmeans":
+        from scipy.cluster.vq import kmeans2
+
+        _, labels = kmeans2(features, clusters, minit="++", seed=seed)
+    elif method == "hierarchical":
+        from scipy.cluster.hierarchy import fcluster, linkage
+
+        labels = fcluster(linkage(features, method="ward"), t=clusters, criterion="maxclust") - 1
+    else:
+        raise ValueError(f"Unknown clustering method: {method}")
+    # Renumber the non-empty clusters consecutively
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def medoids(features: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Index of the row closest to its cluster mean, for every cluster."""
+    representatives = []
+    for cluster in range(labels.max() + 1):
+        members = np.flatnonzero(labels == cluster)
+        center = features[members].mean(axis=0)
+        representatives.append(members[np.argmin(((features[members] - center) ** 2).sum(axis=1))])
+    return np.array(representatives, dtype=int)
+
+
+class Reduction:
+    """What ``expand_snapshots`` needs to restore the full horizon of a reduced network."""
+
+    def __init__(
+        self,
+        method: str,
+        snapshots: pd.Index,
+        weightings: pd.DataFrame,
+        inputs: Dict[Tuple[str, str], pd.DataFrame],
+        positions: np.ndarray,
+    ):
+        self.method = method
+        self.snapshots = snapshots
+        self.weightings = weightings
+        self.inputs = inputs
+        # Position of the reduced snapshot standing for each full snapshot
+        self.positions = positions
+        self.metrics: Dict[str, Any] = {}
+
+
+def _resample(count: int, resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+    groups = np.arange(count) // resolution
+    return np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]), groups
+
+
+def _cluster(
+    features: np.ndarray, count: int, clusters: int, period: int, method: str, seed: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Kept snapshot positions, the reduced position of every snapshot and the multiplier of every kept one."""
+    periods = count // period
+    if periods == 0:
+        return np.arange(count), np.arange(count), np.ones(count)
+    period_features = features[:periods * period].reshape(periods, period * features.shape[1])
+    labels = cluster_periods(period_features, clusters, method, seed)
+    representatives = medoids(period_features, labels)
+    sizes = np.bincount(labels)
+
+    # Representative periods in chronological order, then the tail
+    order = np.argsort(representatives)
+    kept_periods = representatives[order]
+    tail = np.arange(periods * period, count)
+    kept = np.concatenate([(start * period + np.arange(period)) for start in kept_periods] + [tail])
+    multipliers = np.concatenate(
+        [np.full(period, sizes[cluster], dtype=float) for cluster in order] + [np.ones(len(tail))]
+    )
+
+    rank = np.empty(len(order), dtype=int)
+    rank[order] = np.arange(len(order))
+    offsets = np.arange(periods * period) % period
+    positions = np.concatenate([
+        rank[labels].repeat(period) * period + offsets,
+        len(kept_periods) * period + np.arange(len(tail)),
+    ])
+    return kept, positions, multipliers
+
+
+def reduce_snapshots(
+    n: "pypsa.Network",
+    method: str,
+    resolution: int = 3,
+    clusters: int = 12,
+    period: int = 24,
+    seed: int = 0,
+) -> Reduction:
+    """Replace the snapshots of ``n`` by a weighted reduced set.
+
+    Returns the ``Reduction`` to pass to ``expand_snapshots`` once ``n``
+    is solved, with error metrics of the reduced inputs.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown temporal reduction method: {method}")
+    snapshots = n.snapshots
+    weightings = n.snapshot_weightings.copy()
+    inputs = input_series(n)
+    count = len(snapshots)
+
+    if method == "resample":
+        kept, positions = _resample(count, resolution)
+        reduced_weightings = weightings.groupby(positions).sum().set_axis(snapshots[kept])
+        reduced_inputs = {key: frame.groupby(positions).mean().set_axis(snapshots[kept]) for key, frame in inputs.items()}
+    else:
+        kept, positions, multipliers = _cluster(_normalized_profiles(inputs, count), count, clusters, period, method, seed)
+        reduced_weightings = weightings.iloc[kept].copy()
+        # The state of charge still advances one snapshot at a time
+        for column in ("objective", "generators"):
+            reduced_weightings[column] *= multipliers
+        reduced_inputs = {key: frame.iloc[kept] for key, frame in inputs.items()}
+
+    n.set_snapshots(snapshots[kept])
+    n.snapshot_weightings = reduced_weightings
+    for (component, attr), frame in reduced_inputs.items():
+        n.dynamic(component)[attr] = frame
+
+    reduction = Reduction(method, snapshots, weightings, inputs, positions)
+    reduction.metrics = reduction_metrics(reduction, reduced_inputs, reduced_weightings)
+    return reduction
+
+
+def reduction_metrics(
+    reduction: Reduction, reduced_inputs: Dict[Tuple[str, str], pd.DataFrame], reduced_weightings: pd.DataFrame
+) -> Dict[str, Any]:
+    """How well the reduced inputs, mapped back to every snapshot, reproduce the full ones."""
+    errors = {}
+    for (component, attr), frame in reduction.inputs.items():
+        full = frame.to_numpy(dtype=float)
+        mapped = reduced_inputs[component, attr].to_numpy(dtype=float)[reduction.positions]
+        spread = np.nanmax(full) - np.nanmin(full) if full.size else 0.0
+        rmse = float(np.sqrt(np.nanmean((mapped - full) ** 2))) if full.size else 0.0
+        errors[f"{component}.{attr}"] = {
+            "rmse": rmse,
+            "nrmse": rmse / spread if spread > 0 else 0.0,
+            "max_abs": float(np.nanmax(np.abs(mapped - full))) if full.size else 0.0,
+        }
+
+    metrics: Dict[str, Any] = {
+        "method": reduction.method,
+        "snapshots": len(reduction.snapshots),
+        "reduced_snapshots": len(reduced_weightings),
+        "reduction_factor": len(reduction.snapshots) / max(1, len(reduced_weightings)),
+        "profile_errors": errors,
+    }
+    load = reduced_inputs.get(("Load", "p_set"))
+    if load is not None and not load.empty:
+        full_load = reduction.inputs["Load", "p_set"].sum(axis=1)
+        full_energy = float((full_load * reduction.weightings["generators"]).sum())
+        energy = float((load.sum(axis=1) * reduced_weightings["generators"]).sum())
+        metrics["load_energy_error"] = (energy - full_energy) / full_energy if full_energy else 0.0
+        full_peak = float(full_load.max())
+        metrics["peak_load_error"] = (float(load.sum(axis=1).max()) - full_peak) / full_peak if full_peak else 0.0
+    return metrics
+
+
+def expand_snapshots(n: "pypsa.Network", reduction: Reduction) -> None:
+    """Restore the full snapshots, weightings and inputs of a solved reduced network.
+
+    Every output time series takes the value of the reduced snapshot
+    standing for each full snapshot.
+    """
+    outputs = {}
+    for component in COMPONENTS:
+        dynamic = n.dynamic(component)
+        for attr in _series_attributes(n, component, "Output"):
+            if attr in dynamic and not dynamic[attr].empty:
+                outputs[component, attr] = dynamic[attr]
+
+    n.set_snapshots(reduction.snapshots)
+    n.snapshot_weightings = reduction.weightings
+    for (component, attr), frame in reduction.inputs.items():
+        n.dynamic(component)[attr] = frame
+    for (component, attr), frame in outputs.items():
+        values = frame.to_numpy()[reduction.positions]
+        n.dynamic(component)[attr] = pd.DataFrame(values, index=reduction.snapshots, columns=frame.columns)
@@ -0,0 +1,32 @@
+"""Fixtures shared by the backend tests."""
+
+import warnings
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as backend
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """A test client on a server with fresh stores and the result cache off.
+
+    Exported results go to ``tmp_path``; per-request worker pools are
+    capped at two processes.
+    """
+    warnings.simplefilter("ignore")
+    backend.load_dependencies()
+    monkeypatch.setattr(backend, "cache_size", 0)
+    monkeypatch.setattr(backend, "cache_dir", None)
+    monkeypatch.setattr(backend, "result_cache", None)
+    monkeypatch.setattr(backend, "result_dir", str(tmp_path / "results"))
+    monkeypatch.setattr(backend, "result_store", None)
+    monkeypatch.setattr(backend, "session_store", None)
+    monkeypatch.setattr(backend, "metrics_registry", None)
+    monkeypatch.setattr(backend, "job_manager", None)
+    monkeypatch.setattr(backend, "warm_workers", 0)
+    monkeypatch.setattr(backend, "max_concurrent_solves", 1)
+    monkeypatch.setattr(backend, "batch_workers", 2)
+    with TestClient(backend.app) as test_client:
+        yield test_client
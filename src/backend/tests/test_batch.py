@@ -0,0 +1,95 @@
+"""Parameter variants of one base network on /api/analyze/batch."""
+
+import pandas as pd
+import pytest
+
+import pypsa
+
+from batch import apply_overrides
+
+NETWORK = {
+    "buses": [{"name": "bus_a"}, {"name": "bus_b"}],
+    "generators": [
+        {"name": "cheap", "bus": "bus_a", "p_nom": 10, "marginal_cost": 5},
+        {"name": "diesel", "bus": "bus_b", "p_nom": 10, "marginal_cost": 50},
+    ],
+    "loads": [{"name": "load", "bus": "bus_b", "p_set": 4}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 10}],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00"],
+    "loads_t": {"p_set": {"load": [4, 8]}},
+}
+
+
+def test_variants_are_solved_with_their_overrides(client):
+    variants = [
+        {"id": "base"},
+        {"id": "growth", "overrides": [{"component": "loads", "attribute": "p_set", "scale": 1.5}]},
+        {"id": "weak_line", "overrides": [{"component": "lines", "attribute": "s_nom", "value": 2}]},
+        {"overrides": [{"component": "generators", "names": ["diesel"], "attribute": "marginal_cost", "value": 1}]},
+    ]
+
+    response = client.post("/api/analyze/batch", json={**NETWORK, "variants": variants})
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["status"] == "ok"
+    assert batch["variants"] == 4
+    assert batch["workers"] == 2
+    results = {result["id"]: result for result in batch["results"]}
+    assert list(results) == ["base", "growth", "weak_line", "3"]
+    assert all(result["status"] == "ok" for result in results.values())
+    assert results["base"]["objective"] == pytest.approx(5 * 12)
+    # Scaling the load also scales its profile to 6 and 12, 2 above the cheap generator
+    assert results["growth"]["objective"] == pytest.approx(5 * 16 + 50 * 2)
+    # 2 over the line and the rest from the diesel generator
+    assert results["weak_line"]["objective"] == pytest.approx(5 * 4 + 50 * 8)
+    assert results["3"]["objective"] == pytest.approx(1 * 12)
+
+
+@pytest.mark.parametrize(
+    "override, message",
+    [
+        ({"component": "transformers", "attribute": "s_nom", "value": 1}, "Unknown component"),
+        ({"component": "loads", "attribute": "colour", "value": 1}, "has no attribute 'colour'"),
+        ({"component": "generators", "attribute": "bus", "scale": 2}, "cannot be scaled"),
+        ({"component": "loads", "names": ["missing"], "attribute": "p_set", "value": 1}, "unknown loads: missing"),
+    ],
+)
+def test_invalid_override_is_rejected(client, override, message):
+    response = client.post("/api/analyze/batch", json={**NETWORK, "variants": [{"overrides": [override]}]})
+
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+@pytest.mark.parametrize("variants", [[], [{"overrides": [{"component": "loads", "attribute": "p_set"}]}]])
+def test_malformed_variants_are_rejected(client, variants):
+    assert client.post("/api/analyze/batch", json={**NETWORK, "variants": variants}).status_code == 422
+
+
+def test_fixed_value_replaces_the_time_series():
+    n = pypsa.Network()
+    n.set_snapshots(pd.date_range("2024-01-01", periods=2, freq="h"))
+    n.add("Bus", "bus")
+    n.add("Load", ["a", "b"], bus="bus", p_set=pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]}, index=n.snapshots))
+
+    apply_overrides(n, [{"component": "loads", "names": ["a"], "attribute": "p_set", "value": 7, "scale": None}])
+
+    assert n.loads.at["a", "p_set"] == 7
+    assert list(n.loads_t.p_set.columns) == ["b"]
+    assert n.get_switchable_as_dense("Load", "p_set")["a"].tolist() == [7.0, 7.0]
+
+
+def test_exported_variants_are_served_from_the_result_store(client):
+    variants = [{"id": "base"}, {"id": "growth", "overrides": [{"component": "loads", "attribute": "p_set", "scale": 1.5}]}]
+
+    batch = client.post("/api/analyze/batch", json={**NETWORK, "variants": variants, "export_result": True}).json()
+
+    results = {result["id"]: result for result in batch["results"]}
+    assert results["base"]["result_id"] != results["growth"]["result_id"]
+    for variant, load in (("base", [4, 8]), ("growth", [6, 12])):
+        url = f"/api/results/{results[variant]['result_id']}"
+        assert client.get(url).status_code == 200
+        response = client.get(f"{url}/loads/p", params={"names": ["load"]})
+        assert response.status_code == 200
+        assert list(response.json()["values"]["load"]) == pytest.approx(load)
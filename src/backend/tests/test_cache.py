@@ -0,0 +1,121 @@
+"""Result cache: payload keys, the in-memory LRU, the disk tier and cache hits on /api/analyze."""
+
+import json
+import os
+
+import pytest
+
+import app as backend
+from app import AnalyzeRequest, analysis_cache_key, normalized_frames
+from cache import ResultCache
+
+NETWORK = {
+    "buses": [{"name": "bus_a", "v_nom": 11}, {"name": "bus_b", "v_nom": 11}],
+    "generators": [
+        {"name": "cheap", "bus": "bus_a", "p_nom": 10, "marginal_cost": 5},
+        {"name": "peaker", "bus": "bus_b", "p_nom": 5, "marginal_cost": 50},
+    ],
+    "loads": [{"name": "load", "bus": "bus_b", "p_set": 4}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 3}],
+}
+
+# NETWORK with the components and their attributes in another order, and
+# integers written as floats
+REORDERED = {
+    "lines": [{"s_nom": 3.0, "x": 0.1, "bus1": "bus_b", "bus0": "bus_a", "name": "line"}],
+    "loads": [{"p_set": 4.0, "bus": "bus_b", "name": "load"}],
+    "generators": [
+        {"marginal_cost": 50, "p_nom": 5, "bus": "bus_b", "name": "peaker"},
+        {"marginal_cost": 5.0, "p_nom": 10.0, "bus": "bus_a", "name": "cheap"},
+    ],
+    "buses": [{"v_nom": 11.0, "name": "bus_b"}, {"v_nom": 11, "name": "bus_a"}],
+}
+
+
+def key(data) -> str:
+    payload = AnalyzeRequest(**data)
+    return analysis_cache_key(payload, normalized_frames(payload))
+
+
+def test_reordered_payload_has_same_key():
+    assert key(REORDERED) == key(NETWORK)
+
+
+def test_explicit_defaults_have_same_key():
+    explicit = {**NETWORK, "loads": [{"name": "load", "bus": "bus_b", "p_set": 4, "q_set": 0}]}
+    assert key(explicit) == key(NETWORK)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"threads": 2},
+        {"include_timeseries": False},
+        {"solver_options": {"presolve": "off"}},
+        {"snapshots": ["2024-06-01 00:00"]},
+        {"loads": [{"name": "load", "bus": "bus_b", "p_set": 4.5}]},
+        {"loads_t": {"p_set": {"load": [3.0]}}},
+    ],
+)
+def test_changed_input_has_different_key(change):
+    assert key({**NETWORK, **change}) != key(NETWORK)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    cache.put("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+    assert cache.stats()["entries"] == 2
+
+
+def test_disk_tier_round_trip(tmp_path):
+    ResultCache(max_entries=4, disk_dir=str(tmp_path)).put("k", {"status": "ok", "objective": 1.5})
+
+    fresh = ResultCache(max_entries=4, disk_dir=str(tmp_path))
+
+    assert fresh.get("k") == {"status": "ok", "objective": 1.5}
+    assert fresh.stats()["hits"] == 1
+    assert fresh.get("missing") is None
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_disk_read_refreshes_mtime_and_eviction_drops_oldest(tmp_path):
+    entry = {"status": "ok", "payload": "x" * 1000}
+    size = len(json.dumps(entry))
+    cache = ResultCache(max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=2 * size)
+    cache.put("old", entry)
+    cache.put("new", entry)
+    for name, mtime in (("old", 1_000_000), ("new", 2_000_000)):
+        os.utime(tmp_path / f"{name}.json", (mtime, mtime))
+
+    assert cache.get("old") == entry
+    assert os.path.getmtime(tmp_path / "old.json") > 2_000_000
+
+    cache.put("newest", entry)
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["newest", "old"]
+
+
+def test_analyze_returns_cached_result(client, monkeypatch):
+    monkeypatch.setattr(backend, "cache_size", 8)
+
+    first = client.post("/api/analyze", json=NETWORK).json()
+    second = client.post("/api/analyze", json=REORDERED).json()
+    changed = client.post("/api/analyze", json={**NETWORK, "include_timeseries": False}).json()
+
+    assert first["status"] == "ok" and first["cached"] is False
+    assert second["cached"] is True
+    assert second["objective"] == pytest.approx(first["objective"])
+    assert second["power"] == first["power"]
+    # The timings are those of the lookup, not of the solve
+    assert "solve" not in second["timings"]["stages"]
+    assert "cache" in second["timings"]["stages"]
+    assert changed["cached"] is False
+    assert "timeseries" not in changed
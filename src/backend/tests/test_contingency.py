@@ -0,0 +1,137 @@
+"""N-1 screening with outage factors, checked against a linear power flow with the line removed."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import ContingencyRequest, build_pypsa_network
+from contingency import outage_factors
+from powerflow import linear_powerflow
+
+# A meshed four-bus network; the bridge "de" feeds the island e-f, which has no generation
+NETWORK = {
+    "buses": [{"name": name, "v_nom": 20} for name in "abcdef"],
+    "generators": [
+        {"name": "slack", "bus": "a", "p_nom": 100, "control": "Slack"},
+        {"name": "g_c", "bus": "c", "p_nom": 20},
+    ],
+    "loads": [
+        {"name": "l_b", "bus": "b", "p_set": 8},
+        {"name": "l_d", "bus": "d", "p_set": 5},
+        {"name": "l_e", "bus": "e", "p_set": 1},
+        {"name": "l_f", "bus": "f"},
+    ],
+    "lines": [
+        {"name": "ab", "bus0": "a", "bus1": "b", "x": 0.2, "s_nom": 10},
+        {"name": "bc", "bus0": "b", "bus1": "c", "x": 0.1, "s_nom": 10},
+        {"name": "cd", "bus0": "c", "bus1": "d", "x": 0.3, "s_nom": 10},
+        {"name": "da", "bus0": "d", "bus1": "a", "x": 0.15, "s_nom": 10},
+        {"name": "bd", "bus0": "b", "bus1": "d", "x": 0.25, "s_nom": 10},
+        {"name": "de", "bus0": "d", "bus1": "e", "x": 0.1, "s_nom": 10},
+        {"name": "ef", "bus0": "e", "bus1": "f", "x": 0.1, "s_nom": 10},
+    ],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+    "loads_t": {"p_set": {"l_f": [1, 2, 4]}},
+    "generators_t": {"p_set": {"g_c": [2, 6, 12]}},
+}
+
+LINES = [line["name"] for line in NETWORK["lines"]]
+ISLAND_LINES = {"de": ["de", "ef"], "ef": ["ef"]}
+
+
+def network():
+    return build_pypsa_network(ContingencyRequest(**NETWORK))
+
+
+def flows_without(line):
+    """Line flows of a linear power flow with ``line`` taken out of service."""
+    n = network()
+    n.lines.loc[line, "active"] = False
+    n.lpf()
+    return n.lines_t.p0.reindex(columns=LINES, fill_value=0.0)
+
+
+@pytest.fixture(scope="module")
+def screened():
+    n = network()
+    flows = linear_powerflow(n, n.snapshots)["lines.p0"]
+    (sub_network,) = n.sub_networks.obj
+    sub_network.find_bus_controls()
+    names = sub_network.branches_i().get_level_values("name").tolist()
+    outage = outage_factors(sub_network)
+    f = flows[names].to_numpy()
+    post = {}
+    for k, line in enumerate(names):
+        values = (f + f[:, [k]] * outage["factors"][:, k]) * outage["alive"][:, k]
+        post[line] = pd.DataFrame(values, index=flows.index, columns=names)
+    return flows, outage, names, post, sub_network.buses_o
+
+
+@pytest.mark.parametrize("line", [line for line in LINES if line not in ISLAND_LINES])
+def test_post_outage_flows_match_lpf(screened, line):
+    _, outage, names, post, _ = screened
+    expected = flows_without(line)
+
+    assert names.index(line) not in outage["islands"]
+    pd.testing.assert_frame_equal(post[line][LINES], expected, check_names=False, check_freq=False, atol=1e-9)
+
+
+@pytest.mark.parametrize("line", list(ISLAND_LINES))
+def test_bridge_outage_drops_the_island(screened, line):
+    flows, outage, names, post, buses = screened
+    k = names.index(line)
+    island = {"de": ["e", "f"], "ef": ["f"]}[line]
+    # The rest of the network sees the island's demand disappear, like a power flow without it
+    n = network()
+    n.lines.loc[line, "active"] = False
+    n.loads.loc[n.loads.bus.isin(island), "p_set"] = 0.0
+    n.loads_t.p_set = n.loads_t.p_set.drop(columns=[c for c in n.loads_t.p_set if n.loads.at[c, "bus"] in island])
+    n.lpf()
+    expected = n.lines_t.p0.reindex(columns=LINES, fill_value=0.0)
+    expected[ISLAND_LINES[line]] = 0.0
+
+    assert sorted(buses[outage["islands"][k]]) == island
+    pd.testing.assert_frame_equal(post[line][LINES], expected, check_names=False, check_freq=False, atol=1e-9)
+    # The flow the bridge carried into the island is the demand lost
+    lost = outage["into_island"][k] * flows[line]
+    island_load = [1 + 1, 1 + 2, 1 + 4] if line == "de" else [1, 2, 4]
+    np.testing.assert_allclose(lost, island_load)
+
+
+def test_api_reports_post_outage_loadings_and_islanding(client):
+    # A tiny threshold reports every loaded line of every contingency
+    result = client.post("/api/contingency", json={**NETWORK, "threshold": 1e-6}).json()
+
+    assert result["status"] == "ok"
+    assert result["screened"] == len(LINES)
+    assert result["islanding"] == 2
+    contingencies = {c["line"]: c for c in result["contingencies"]}
+    assert contingencies["de"]["islanded_buses"] == ["e", "f"]
+    assert contingencies["de"]["lost_load"] == pytest.approx(5.0)
+    assert contingencies["ef"]["lost_load"] == pytest.approx(4.0)
+    for line in ("bc", "bd"):
+        expected = flows_without(line).abs().max() / 10
+        reported = {o["line"]: o["loading"] for o in contingencies[line]["overloads"]}
+        assert reported == pytest.approx(expected[expected > 1e-6].to_dict())
+
+
+def test_only_lines_above_the_threshold_are_reported(client):
+    threshold = 0.6
+    result = client.post("/api/contingency", json={**NETWORK, "outages": ["ab", "da"], "threshold": threshold}).json()
+
+    assert result["screened"] == 2
+    reported = {c["line"]: sorted(o["line"] for o in c["overloads"]) for c in result["contingencies"]}
+    expected = {}
+    for line in ("ab", "da"):
+        loading = flows_without(line).abs().max() / 10
+        if (loading > threshold).any():
+            expected[line] = sorted(loading[loading > threshold].index)
+    assert expected
+    assert reported == expected
+
+
+def test_unknown_outage_is_rejected(client):
+    response = client.post("/api/contingency", json={**NETWORK, "outages": ["zz"]})
+
+    assert response.status_code == 400
+    assert "Unknown lines in outages: zz" in response.json()["detail"]
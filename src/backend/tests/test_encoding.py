@@ -0,0 +1,106 @@
+"""MessagePack requests and responses on /api/analyze."""
+
+import numpy as np
+import pytest
+
+from encoding import MSGPACK_MEDIA_TYPE, packb, unpackb
+
+SNAPSHOTS = [f"2024-01-01 {hour:02d}:00" for hour in range(8)]
+PROFILE = [1.0, 2.0, 3.0, 4.0, 4.0, 3.0, 2.0, 1.0]
+
+NETWORK = {
+    "buses": [{"name": "bus_a", "v_nom": 11}, {"name": "bus_b", "v_nom": 11}],
+    "generators": [
+        {"name": "cheap", "bus": "bus_a", "p_nom": 3, "marginal_cost": 5},
+        {"name": "peaker", "bus": "bus_b", "p_nom": 5, "marginal_cost": 50},
+    ],
+    "loads": [{"name": "load", "bus": "bus_b"}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 10}],
+    "snapshots": SNAPSHOTS,
+    "loads_t": {"p_set": {"load": PROFILE}},
+}
+
+# NETWORK with columnar component tables and packed arrays
+COLUMNAR = {
+    "buses": {"name": ["bus_a", "bus_b"], "v_nom": np.array([11.0, 11.0])},
+    "generators": {
+        "name": ["cheap", "peaker"],
+        "bus": ["bus_a", "bus_b"],
+        "p_nom": np.array([3.0, 5.0]),
+        "marginal_cost": np.array([5.0, 50.0]),
+    },
+    "loads": {"name": ["load"], "bus": ["bus_b"]},
+    "lines": {
+        "name": ["line"],
+        "bus0": ["bus_a"],
+        "bus1": ["bus_b"],
+        "x": np.array([0.1]),
+        "s_nom": np.array([10.0]),
+    },
+    "snapshots": SNAPSHOTS,
+    "loads_t": {"p_set": {"load": np.array(PROFILE)}},
+}
+
+
+def post_msgpack(client, body: bytes, accept: str = MSGPACK_MEDIA_TYPE):
+    return client.post(
+        "/api/analyze", content=body, headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": accept}
+    )
+
+
+def test_packed_arrays_round_trip():
+    data = {
+        "floats": np.array([0.5, np.nan, 2.0]),
+        "ints": np.arange(3),
+        "flags": np.array([True, False, True]),
+        "series": [float(i) for i in range(10)],
+        "short": [1.0, 2.0],
+    }
+
+    decoded = unpackb(packb(data))
+
+    np.testing.assert_array_equal(decoded["floats"], data["floats"])
+    assert decoded["ints"].dtype == np.int64 and decoded["ints"].tolist() == [0, 1, 2]
+    assert decoded["flags"].tolist() == [True, False, True]
+    # Long float lists are packed, short ones stay lists
+    assert isinstance(decoded["series"], np.ndarray) and decoded["series"].tolist() == data["series"]
+    assert decoded["short"] == [1.0, 2.0]
+
+
+def test_columnar_msgpack_request_matches_json(client):
+    expected = client.post("/api/analyze", json=NETWORK).json()
+
+    response = post_msgpack(client, packb(COLUMNAR))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    result = unpackb(response.content)
+    assert result["status"] == "ok"
+    assert result["objective"] == pytest.approx(expected["objective"])
+    assert result["power"] == expected["power"]
+    # Time series come back as packed float64 arrays
+    dispatch = result["timeseries"]["generators"]["p"]["peaker"]
+    assert isinstance(dispatch, np.ndarray)
+    np.testing.assert_allclose(dispatch, expected["timeseries"]["generators"]["p"]["peaker"])
+
+
+def test_json_is_returned_unless_msgpack_is_accepted(client):
+    response = post_msgpack(client, packb(NETWORK), accept="application/json")
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["status"] == "ok"
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (b"\xc1", "Invalid MessagePack body"),
+        (packb([1, 2, 3]), "must be a map"),
+        (packb({**COLUMNAR, "loads": {"name": ["a", "b"], "p_set": np.array([1.0])}}), "columnar table for loads"),
+    ],
+)
+def test_invalid_msgpack_body_is_rejected(client, body, message):
+    response = post_msgpack(client, body, accept="application/json")
+
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
@@ -0,0 +1,47 @@
+"""Lazy imports: the server answers before PyPSA is loaded."""
+
+import json
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter, where nothing has imported PyPSA yet
+SCRIPT = """
+import json, sys, warnings
+warnings.simplefilter("ignore")
+import app
+report = {"imported": sorted(m for m in ("numpy", "pandas", "pypsa", "linopy") if m in sys.modules)}
+report["health"] = app.health()
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    network = {
+        "buses": [{"name": "bus"}],
+        "generators": [{"name": "gen", "bus": "bus", "p_nom": 10, "marginal_cost": 5}],
+        "loads": [{"name": "load", "bus": "bus", "p_set": 4}],
+    }
+    report["analyze"] = client.post("/api/analyze", json=network).json()["status"]
+    report["after"] = client.get("/api/health").json()
+print("REPORT " + json.dumps(report))
+"""
+
+
+def run_fresh_server():
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=BACKEND, capture_output=True, text=True, timeout=300
+    )
+    assert completed.returncode == 0, completed.stderr
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("REPORT "))
+    return json.loads(line[len("REPORT "):])
+
+
+def test_analysis_stack_is_loaded_on_demand():
+    report = run_fresh_server()
+
+    assert report["imported"] == []
+    assert report["health"] == {"status": "ok", "state": "warming"}
+    # Requests arriving while the imports run wait for them
+    assert report["analyze"] == "ok"
+    assert report["after"]["state"] == "ready"
+    assert report["after"]["pypsa"] is True
@@ -0,0 +1,141 @@
+"""Background analysis jobs: /api/jobs and the JobManager behind it."""
+
+import os
+import threading
+import time
+
+import pytest
+
+import app as backend
+from jobs import JOB_CANCELLED, JOB_COMPLETED, JOB_RUNNING, JobManager
+
+NETWORK = {
+    "buses": [{"name": "bus_a"}, {"name": "bus_b"}],
+    "generators": [{"name": "gen", "bus": "bus_a", "p_nom": 10, "marginal_cost": 5}],
+    "loads": [{"name": "load", "bus": "bus_b", "p_set": 4}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 10}],
+}
+
+
+def wait_for(condition, timeout: float = 120.0, interval: float = 0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = condition()
+        if value:
+            return value
+        time.sleep(interval)
+    raise AssertionError("condition not met in time")
+
+
+def poll_job(client, job_id: str, timeout: float = 120.0):
+    def finished():
+        job = client.get(f"/api/jobs/{job_id}").json()
+        return job if job["status"] not in ("queued", "running") else None
+
+    return wait_for(finished, timeout, interval=0.2)
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager.shutdown()
+
+
+def test_submit_poll_and_fetch_result(client):
+    response = client.post("/api/jobs", json=NETWORK)
+    assert response.status_code == 202
+    submitted = response.json()
+    assert submitted["status"] in ("queued", "running")
+
+    job = poll_job(client, submitted["id"])
+
+    assert job["status"] == "completed"
+    assert job["result"]["status"] == "ok"
+    assert job["result"]["objective"] == pytest.approx(20.0)
+    assert job["result"]["power"]["generators"] == [{"Generator": "gen", "p": pytest.approx(4.0)}]
+
+
+def test_invalid_job_is_rejected_before_queueing(client):
+    response = client.post("/api/jobs", json={**NETWORK, "solver": "no-such-solver"})
+    assert response.status_code == 400
+    assert backend.job_manager is None or backend.job_manager.stats()["queued"] == 0
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.delete("/api/jobs/missing").status_code == 404
+
+
+def test_cancel_running_job_through_api(client):
+    manager = backend.get_job_manager()
+    job = manager.submit(time.sleep, 60)
+    wait_for(lambda: job.status == JOB_RUNNING and job.worker is not None)
+    worker = job.worker
+
+    response = client.delete(f"/api/jobs/{job.id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.get(f"/api/jobs/{job.id}").json()["status"] == "cancelled"
+    worker.process.join(10)
+    assert not worker.process.is_alive()
+
+
+def test_cancel_finished_job_discards_it(client):
+    submitted = client.post("/api/jobs", json=NETWORK).json()
+    poll_job(client, submitted["id"])
+
+    response = client.delete(f"/api/jobs/{submitted['id']}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert "result" not in response.json()
+    assert client.get(f"/api/jobs/{submitted['id']}").status_code == 404
+
+
+def test_cancelled_worker_is_replaced_and_its_pipe_closed(manager):
+    job = manager.submit(time.sleep, 60)
+    wait_for(lambda: job.status == JOB_RUNNING and job.worker is not None)
+    killed = job.worker
+
+    manager.cancel(job.id)
+    next_job = manager.submit(os.getpid)
+
+    assert next_job.wait(60)
+    assert next_job.status == JOB_COMPLETED
+    assert next_job.result != killed.process.pid
+    assert killed.conn.closed
+
+
+def test_finished_job_keeps_its_worker(manager):
+    first = manager.submit(os.getpid)
+    assert first.wait(60)
+
+    cancelled = manager.cancel(first.id)
+    second = manager.submit(os.getpid)
+
+    assert cancelled.status == JOB_COMPLETED
+    assert manager.get(first.id) is None
+    assert second.wait(60)
+    assert second.result == first.result
+
+
+def test_cancel_after_reply_arrived_does_not_kill_worker(manager):
+    # Hold the manager lock so the dispatcher stops between the reply
+    # arriving and taking it off the pipe, which is where cancel() used
+    # to kill a worker whose job had already finished
+    manager._lock = threading.RLock()
+    job = manager.submit(time.sleep, 1)
+    wait_for(lambda: job.status == JOB_RUNNING and job.worker is not None)
+    worker = job.worker
+    with manager._lock:
+        wait_for(worker.replied)
+
+        cancelled = manager.cancel(job.id)
+
+    assert cancelled.status == JOB_CANCELLED
+    assert worker.process.is_alive()
+    next_job = manager.submit(os.getpid)
+    assert next_job.wait(60)
+    assert next_job.result == worker.process.pid
@@ -0,0 +1,142 @@
+"""Incremental parsing of large JSON requests, checked against json.loads and pydantic."""
+
+import json
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+import app as backend
+from app import AnalyzeRequest, normalized_frames
+from incremental import _SeriesMatrix, parse_request
+from network_builder import InvalidPayloadError
+
+SNAPSHOTS = ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"]
+
+# More loads than the matrices' first allocation, and series covering only some of them
+NETWORK = {
+    "snapshots": SNAPSHOTS,
+    "buses": [{"name": "a"}, {"name": "b"}],
+    "generators": [
+        {"name": "g_a", "bus": "a", "p_nom": 100, "marginal_cost": 10},
+        {"name": "g_b", "bus": "b", "p_nom": 50, "marginal_cost": 20},
+    ],
+    "loads": [{"name": f"l{i}", "bus": "ab"[i % 2], "p_set": 1} for i in range(40)],
+    "lines": [{"name": "ab", "bus0": "a", "bus1": "b", "x": 0.1, "s_nom": 20}],
+    "loads_t": {"p_set": {f"l{i}": [i % 3, 1.5, 0.05 * i] for i in range(37)}},
+    "generators_t": {"p_max_pu": {"g_b": [1, 0.5, 0]}},
+    "include_timeseries": True,
+}
+
+
+def reordered(network, first):
+    """``network`` with the keys in ``first`` moved to the front and the rest reversed."""
+    return {**{key: network[key] for key in first}, **dict(reversed(network.items()))}
+
+
+def assert_same_request(text, expected_text=None):
+    payload, columns = parse_request(text, AnalyzeRequest)
+    expected = AnalyzeRequest.model_validate(json.loads(expected_text or text))
+
+    assert payload.model_dump(exclude=set(columns)) == expected.model_dump(exclude=set(columns))
+    frames, expected_frames = normalized_frames(payload, columns), normalized_frames(expected)
+    assert set(frames) == set(expected_frames)
+    for key, frame in expected_frames.items():
+        pd.testing.assert_frame_equal(frames[key], frame, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "first",
+    [
+        [],
+        # Time series before their components and before the snapshots
+        ["loads_t", "generators_t"],
+        ["generators_t", "lines", "loads_t", "loads"],
+    ],
+)
+def test_parse_request_matches_json_loads(first):
+    assert_same_request(json.dumps(reordered(NETWORK, first)))
+
+
+def test_columnar_tables_match_the_rows():
+    # Only the incremental parser accepts columnar tables in JSON
+    loads = {"name": [f"l{i}" for i in range(40)], "bus": ["ab"[i % 2] for i in range(40)], "p_set": [1] * 40}
+
+    assert_same_request(json.dumps({**NETWORK, "loads": loads}, indent=2), json.dumps(NETWORK))
+
+
+def test_series_matrix_holds_room_for_the_series_seen():
+    matrix = _SeriesMatrix(3, 50_000)
+    for i in range(20):
+        matrix.add("loads_t.p_set", f"l{i}", [i, i, i])
+
+    assert matrix.values.shape == (3, 32)
+    frame = matrix.frame()
+    assert list(frame.columns) == [f"l{i}" for i in range(20)]
+    assert frame.to_numpy().base.shape == (3, 20)
+    assert frame["l7"].tolist() == [7, 7, 7]
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ('{"buses": [{"name": "a"}]', "expected ',' or '}'"),
+        ('{"buses": [{"name": "a"}]} {}', "extra data"),
+        ('{"buses": [{"name": "a"},]}', "Invalid JSON body"),
+        ('{"loads_t": {"p_set": {"l": [1, 2}}}', "Invalid JSON body"),
+        ('{"loads_t": {"p_set": {"l": "1"}}}', "must be an array of numbers"),
+        ('{"loads_t": {"p_set": {"l": [1, "x"]}}}', "must be an array of numbers"),
+        ('{"loads_t": {"p_set": {"l": [1, 2], "m": [1]}}}', "one value per snapshot (2); mismatched: m"),
+        ('{"loads": 3}', "array of objects or a columnar table"),
+    ],
+)
+def test_malformed_input_is_rejected_by_both(text, message):
+    with pytest.raises(InvalidPayloadError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        parse_request(text, AnalyzeRequest)
+    with pytest.raises((ValueError, TypeError, InvalidPayloadError)):
+        normalized_frames(AnalyzeRequest.model_validate(json.loads(text)))
+
+
+def test_invalid_options_fail_validation_like_pydantic():
+    text = json.dumps({**NETWORK, "threads": 0})
+
+    with pytest.raises(ValidationError) as parsed:
+        parse_request(text, AnalyzeRequest)
+    with pytest.raises(ValidationError) as validated:
+        AnalyzeRequest.model_validate(json.loads(text))
+    assert [e["loc"] for e in parsed.value.errors()] == [e["loc"] for e in validated.value.errors()]
+
+
+@pytest.fixture
+def large_client(client, monkeypatch):
+    """The test client with every JSON body taking the large payload path."""
+    monkeypatch.setattr(backend, "large_payload_mb", 1e-6)
+    return client
+
+
+def test_large_path_matches_the_regular_one(client, large_client):
+    body = json.dumps(reordered(NETWORK, ["loads_t"]))
+    headers = {"content-type": "application/json"}
+
+    large = large_client.post("/api/analyze", content=body, headers=headers).json()
+    backend.large_payload_mb = 0
+    regular = client.post("/api/analyze", content=body, headers=headers).json()
+
+    assert large["status"] == regular["status"] == "ok"
+    assert large["objective"] == pytest.approx(regular["objective"])
+    assert large["timeseries"] == regular["timeseries"]
+    assert "parse" in large["timings"]["stages"]
+
+
+@pytest.mark.parametrize(
+    "body, status",
+    [
+        (b'{"buses": [{"name": "a"}', 400),
+        ('{"buses": [{"name": "é"}]}'.encode("latin-1"), 400),
+        (json.dumps({**NETWORK, "threads": 0}).encode(), 422),
+    ],
+)
+def test_large_path_rejects_malformed_bodies(large_client, body, status):
+    response = large_client.post("/api/analyze", content=body, headers={"content-type": "application/json"})
+
+    assert response.status_code == status
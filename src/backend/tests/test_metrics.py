@@ -0,0 +1,89 @@
+"""Stage timings, peak memory growth and the Prometheus view on /api/metrics."""
+
+import re
+import sys
+
+import numpy as np
+import pytest
+
+from metrics import MetricsRegistry, StageTimer, add_stages, peak_memory_mb, size_class
+from test_jobs import NETWORK
+
+linux = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads the resident size from /proc")
+
+
+def resident_mb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) / 2**10 for line in f if line.startswith("VmRSS:"))
+
+
+def test_stages_accumulate():
+    timer = StageTimer()
+    with timer.stage("solve"):
+        pass
+    timer.add("solve", 1.0)
+    timer.add("build", 0.5)
+
+    report = timer.report()
+    assert report["stages"]["solve"] == pytest.approx(1.0, abs=0.01)
+    assert report["total"] == pytest.approx(1.5, abs=0.01)
+    merged = add_stages(report, parse=0.25, solve=1.0)
+    assert list(merged["stages"]) == ["parse", "solve", "build"]
+    assert merged["total"] == pytest.approx(2.75, abs=0.01)
+
+
+@linux
+def test_peak_memory_growth_covers_one_analysis():
+    timer = StageTimer()
+    before = timer.report()["peak_memory_mb"]
+    # Enough to lift the process peak by ~100 MB
+    size = int(before - resident_mb() + 100)
+    with timer.stage("solve"):
+        block = np.ones(size * 2**20 // 8)
+        # A nested timer does not lower the peak the outer one sees
+        nested = StageTimer()
+        del block
+    report = timer.report()
+
+    assert report["peak_memory_mb"] >= before + 90
+    assert report["peak_memory_growth_mb"] == pytest.approx(report["peak_memory_mb"] - before, abs=0.01)
+    assert 90 <= report["peak_memory_growth_mb"] <= 120
+    assert nested.report()["peak_memory_growth_mb"] < 10
+    assert peak_memory_mb() >= report["peak_memory_mb"]
+
+
+def test_size_classes():
+    assert [size_class(count) for count in (0, 10, 11, 5000, 10**6)] == ["10", "10", "100", "10000", "+Inf"]
+
+
+def test_registry_renders_histograms():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("analyze", "ok", {"stages": {"solve": 0.5}, "network": {"buses": 3, "snapshots": 24}})
+    registry.observe("analyze", "ok", {"stages": {"solve": 2.0}, "network": {"buses": 3, "snapshots": 24}})
+    registry.observe("analyze", "error")
+
+    text = registry.render()
+
+    labels = 'endpoint="analyze",stage="solve",buses="10",snapshots="100"'
+    assert 'resdeeds_requests_total{endpoint="analyze",status="ok"} 2' in text
+    assert 'resdeeds_requests_total{endpoint="analyze",status="error"} 1' in text
+    assert f'resdeeds_stage_duration_seconds_bucket{{{labels},le="0.1"}} 0' in text
+    assert f'resdeeds_stage_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'resdeeds_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"resdeeds_stage_duration_seconds_sum{{{labels}}} 2.500000" in text
+
+
+def test_api_reports_timings_and_metrics(client):
+    result = client.post("/api/analyze", json=NETWORK).json()
+
+    timings = result["timings"]
+    assert {"parse", "build", "solve"} <= set(timings["stages"])
+    assert timings["total"] == pytest.approx(sum(timings["stages"].values()), abs=1e-5)
+    assert timings["network"] == {"buses": 2, "snapshots": 1}
+    assert timings["peak_memory_mb"] > 0
+    assert 0 <= timings["peak_memory_growth_mb"] <= timings["peak_memory_mb"]
+    response = client.get("/api/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'resdeeds_requests_total{endpoint="analyze",status="ok"} 1' in response.text
+    peak = int(re.search(r"^resdeeds_peak_memory_bytes (\d+)$", response.text, re.MULTILINE).group(1))
+    assert peak >= timings["peak_memory_mb"] * 2**20 - 1
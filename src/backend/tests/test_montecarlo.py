@@ -0,0 +1,130 @@
+"""Monte Carlo outage simulation on /api/montecarlo."""
+
+import json
+
+import numpy as np
+import pytest
+
+import montecarlo
+from app import MonteCarloRequest, normalized_frames, solve_options
+from montecarlo import failure_table, rebuild_mask
+
+# g2 alone cannot cover the load: losing g1 or the line sheds 1 MW
+NETWORK = {
+    "buses": [{"name": "a"}, {"name": "b"}],
+    "generators": [
+        {"name": "g1", "bus": "a", "p_nom": 10, "marginal_cost": 10},
+        {"name": "g2", "bus": "b", "p_nom": 5, "marginal_cost": 20},
+        {"name": "g3", "bus": "b", "marginal_cost": 30, "p_nom_extendable": True, "capital_cost": 1e6},
+    ],
+    "loads": [{"name": "load", "bus": "b", "p_set": 6}],
+    "lines": [{"name": "line", "bus0": "a", "bus1": "b", "x": 0.1, "s_nom": 10}],
+    "value_of_lost_load": 1000,
+}
+
+
+def run(client, **request):
+    payload = {**NETWORK, "scenarios": 60, "seed": 7, **request}
+    with client.stream("POST", "/api/montecarlo", json=payload) as response:
+        assert response.status_code == 200
+        events = [json.loads(line) for line in response.iter_lines() if line]
+    assert events[0]["event"] == "sampled"
+    assert events[-1]["event"] == "done"
+    return events[0]["data"], events[-1]["data"]
+
+
+def test_same_seed_gives_same_statistics(client):
+    probabilities = {"generators": {"g1": 0.3}, "lines": 0.2}
+
+    sampled, first = run(client, failure_probabilities=probabilities)
+    _, rebatched = run(client, failure_probabilities=probabilities, batch_size=7)
+    _, other_seed = run(client, failure_probabilities=probabilities, seed=8)
+
+    assert sampled["distinct_outage_sets"] <= 4
+    assert first["status"] == "ok"
+    assert first["seed"] == 7
+    for key in ("failure_counts", "expected_unserved_energy", "loss_of_load_probability", "unserved_energy"):
+        assert rebatched[key] == first[key]
+    assert other_seed["failure_counts"] != first["failure_counts"]
+
+
+def test_outages_shed_the_uncovered_load(client):
+    _, done = run(client, failure_probabilities={"generators": {"g1": 0.5}, "lines": 0.25})
+
+    # Only g1 and the line can fail, and either one sheds 1 MW for the single snapshot
+    assert done["status"] == "ok" and done["failed_solves"] == 0
+    counts = done["failure_counts"]
+    assert set(counts) == {"Generator g1", "Line line"}
+    assert 0 < done["loss_of_load_probability"] < 1
+    assert done["unserved_energy"]["max"] == pytest.approx(1.0)
+    assert done["unserved_energy"]["min"] == pytest.approx(0.0)
+    assert done["expected_unserved_energy"] == pytest.approx(done["loss_of_load_probability"])
+    assert done["peak_loss_of_load"]["max"] == pytest.approx(1.0)
+
+
+def test_extendable_generator_outage_needs_a_rebuild(client):
+    _, done = run(client, failure_probabilities={"generators": 1.0})
+
+    # With every generator out, the whole load is shed in every scenario
+    assert done["status"] == "ok"
+    assert done["distinct_outage_sets"] == 1
+    assert done["expected_unserved_energy"] == pytest.approx(6.0)
+    assert done["loss_of_load_probability"] == 1.0
+
+
+def test_generators_outside_the_dispatch_bounds_are_taken_out():
+    payload = MonteCarloRequest(**NETWORK, failure_probabilities={"generators": {"g1": 1.0, "g2": 1.0}})
+    frames = normalized_frames(payload)
+    components, _ = failure_table(payload.failure_probabilities, frames)
+    assert not rebuild_mask(components, frames).any()
+    montecarlo._init_worker(frames, None, components, solve_options(payload), payload.value_of_lost_load)
+    # A committable generator has no Generator-fix bounds to zero
+    montecarlo._network.generators.loc["g1", "committable"] = True
+
+    g1_out, both_out = montecarlo._solve_group([], [[0], [0, 1]])
+
+    assert g1_out["status"] == "ok" and both_out["status"] == "ok"
+    assert g1_out["unserved_energy"] == pytest.approx(1.0)
+    assert both_out["unserved_energy"] == pytest.approx(6.0)
+    # The shared model was left alone
+    assert montecarlo._network.generators.active.all()
+
+
+@pytest.mark.parametrize(
+    "probabilities, status, message",
+    [
+        ({"loads": 0.1}, 400, "cannot fail"),
+        ({"generators": {"missing": 0.1}}, 400, "unknown generators: missing"),
+        ({"lines": 1.5}, 400, "between 0 and 1"),
+        ({"lines": 0}, 400, "No component has a failure probability"),
+    ],
+)
+def test_invalid_failure_probabilities_are_rejected(client, probabilities, status, message):
+    response = client.post("/api/montecarlo", json={**NETWORK, "failure_probabilities": probabilities})
+
+    assert response.status_code == status
+    assert message in response.json()["detail"]
+
+
+def test_statistics_skip_unsolved_scenarios():
+    nan = np.nan
+    stats = montecarlo.scenario_statistics(
+        np.array([0.0, 2.0, nan, 4.0]), np.array([0.0, 1.0, nan, 2.0]), np.array([0.0, 1.0, nan, 1.0]),
+        np.array([10.0, 20.0, nan, 30.0]),
+    )
+
+    assert stats["scenarios"] == 3
+    assert stats["expected_unserved_energy"] == pytest.approx(2.0)
+    assert stats["loss_of_load_probability"] == pytest.approx(2 / 3)
+    assert stats["expected_cost"] == pytest.approx(20.0)
+    assert montecarlo.scenario_statistics(*[np.full(2, nan)] * 4) == {"scenarios": 0}
+
+
+def test_solver_round_off_is_not_loss_of_load():
+    # Shedding below LOSS_OF_LOAD_TOLERANCE in every hour of the first two scenarios
+    stats = montecarlo.scenario_statistics(
+        np.array([1e-9, 3e-7, 2.0]), np.array([1e-9, 1e-7, 1.0]), np.array([0.0, 0.0, 2.0]), np.array([10.0, 10.0, 20.0])
+    )
+
+    assert stats["loss_of_load_probability"] == pytest.approx(1 / 3)
+    assert stats["loss_of_load_expectation"] == pytest.approx(2 / 3)
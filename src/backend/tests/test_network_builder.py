@@ -0,0 +1,85 @@
+"""Columnar network construction from analysis payloads."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import AnalyzeRequest
+from network_builder import InvalidPayloadError, build_network, component_frame, component_frames
+
+
+def test_names_prefer_name_then_id_then_position():
+    frame = component_frame("generators", [
+        {"name": "named", "id": "ignored", "bus": "b"},
+        {"id": "by_id", "bus": "b"},
+        {"bus": "b"},
+        {"name": "", "bus": "b"},
+    ])
+
+    assert list(frame.index) == ["named", "by_id", "gen_2", "gen_3"]
+
+
+def test_defaults_and_fallbacks_are_applied():
+    frame = component_frame("storage_units", [
+        {"name": "s1", "bus": "b", "efficiency": 0.8},
+        {"name": "s2", "bus": "b", "efficiency": 0.8, "efficiency_store": 0.95},
+        {"name": "s3", "bus": "b", "cyclic_state_of_charge": False},
+    ])
+
+    assert frame["efficiency_store"].tolist() == [0.8, 0.95, 0.9]
+    assert frame["efficiency_dispatch"].tolist() == [0.8, 0.8, 0.9]
+    assert frame["max_hours"].tolist() == [4, 4, 4]
+    assert frame["cyclic_state_of_charge"].tolist() == [True, True, False]
+    assert frame["p_nom_extendable"].dtype == bool
+    # Pass-through attributes nobody set are left to PyPSA
+    assert "state_of_charge_initial" not in frame.columns
+
+
+def test_columnar_table_matches_records():
+    rows = [{"name": "l1", "bus": "b", "p_set": 1.5}, {"name": "l2", "bus": "b", "p_set": 2.0}]
+    table = {"name": ["l1", "l2"], "bus": ["b", "b"], "p_set": np.array([1.5, 2.0])}
+
+    pd.testing.assert_frame_equal(component_frame("loads", table), component_frame("loads", rows))
+
+
+def test_ragged_columnar_table_is_rejected():
+    with pytest.raises(InvalidPayloadError, match="loads"):
+        component_frame("loads", {"name": ["l1", "l2"], "p_set": [1.0]})
+
+
+def test_built_network_has_one_row_per_component():
+    payload = AnalyzeRequest(
+        buses=[{"name": "b1", "v_nom": 20}, {"name": "b2"}],
+        generators=[{"name": "g", "bus": "b1", "p_nom": 5, "p_nom_extendable": True, "capital_cost": 10}],
+        loads=[{"name": "l", "bus": "b2", "p_set": 3}],
+        lines=[{"name": "ln", "bus0": "b1", "bus1": "b2", "s_nom": 4, "length": 2.5}],
+        storage_units=[{"name": "s", "bus": "b2", "p_nom": 1}],
+        snapshots=["2024-01-01 00:00", "2024-01-01 01:00"],
+    )
+
+    n = build_network(component_frames(payload), payload.snapshots)
+
+    assert list(n.buses.index) == ["b1", "b2"]
+    assert n.buses.at["b1", "v_nom"] == 20 and n.buses.at["b2", "v_nom"] == 110
+    assert bool(n.generators.at["g", "p_nom_extendable"])
+    assert n.generators.at["g", "control"] == "PQ"
+    assert n.lines.at["ln", "length"] == 2.5
+    assert n.lines.at["ln", "r"] == 0.01
+    assert n.storage_units.at["s", "max_hours"] == 4
+    assert len(n.snapshots) == 2
+
+
+def test_time_series_frames_are_assigned_to_the_snapshots():
+    payload = AnalyzeRequest(
+        buses=[{"name": "b"}],
+        loads=[{"name": "l", "bus": "b"}],
+        snapshots=["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+        loads_t={"p_set": {"l": [1.0, 2.0, 3.0]}},
+    )
+
+    frames = component_frames(payload)
+    n = build_network(frames, payload.snapshots)
+
+    assert list(frames["loads_t.p_set"].index) == [0, 1, 2]
+    assert n.loads_t.p_set["l"].tolist() == [1.0, 2.0, 3.0]
+    assert n.loads_t.p_set.index.equals(n.snapshots)
@@ -0,0 +1,137 @@
+"""Rolling-horizon dispatch and multi-period expansion on /api/analyze."""
+
+import numpy as np
+import pytest
+
+from planning import rolling_windows
+
+SNAPSHOTS = ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00", "2024-01-01 03:00", "2024-01-01 04:00"]
+
+# Without storage the snapshots are independent, so windows dispatch like a single LP
+DISPATCH = {
+    "buses": [{"name": "a"}, {"name": "b"}],
+    "generators": [
+        {"name": "g_a", "bus": "a", "p_nom": 10, "marginal_cost": 10},
+        {"name": "g_b", "bus": "b", "p_nom": 10, "marginal_cost": 30},
+    ],
+    "loads": [{"name": "load", "bus": "b"}],
+    "lines": [{"name": "ab", "bus0": "a", "bus1": "b", "x": 0.1, "s_nom": 6}],
+    "snapshots": SNAPSHOTS,
+    "loads_t": {"p_set": {"load": [3, 7, 12, 5, 9]}},
+}
+
+# Storage starts full; the first window does not see the later deficit
+STORAGE = {
+    "buses": [{"name": "bus"}],
+    "generators": [
+        {"name": "cheap", "bus": "bus", "p_nom": 10, "marginal_cost": 10},
+        {"name": "peak", "bus": "bus", "p_nom": 10, "marginal_cost": 100},
+    ],
+    "loads": [{"name": "load", "bus": "bus", "p_set": 12}],
+    "storage_units": [
+        {
+            "name": "battery", "bus": "bus", "p_nom": 5, "max_hours": 2, "efficiency": 1,
+            "cyclic_state_of_charge": False, "state_of_charge_initial": 10,
+        },
+    ],
+    "snapshots": SNAPSHOTS[:4],
+}
+
+
+def test_windows_cover_the_snapshots():
+    assert rolling_windows(5, 2) == [(0, 2), (2, 4), (4, 5)]
+    assert rolling_windows(10, 4, 1) == [(0, 4), (3, 7), (6, 10)]
+    assert rolling_windows(3, 5) == [(0, 3)]
+    with pytest.raises(ValueError):
+        rolling_windows(10, 2, 2)
+
+
+@pytest.mark.parametrize("horizon, overlap, windows", [(2, 0, 3), (3, 1, 2), (1, 0, 5)])
+def test_rolling_dispatch_matches_a_single_solve(client, horizon, overlap, windows):
+    expected = client.post("/api/analyze", json=DISPATCH).json()
+
+    result = client.post(
+        "/api/analyze", json={**DISPATCH, "rolling_horizon": horizon, "rolling_overlap": overlap}
+    ).json()
+
+    assert result["status"] == "ok"
+    assert result["rolling_horizon"] == {"horizon": horizon, "overlap": overlap, "windows": windows}
+    assert result["objective"] == pytest.approx(expected["objective"])
+    for name, values in expected["timeseries"]["generators"]["p"].items():
+        np.testing.assert_allclose(result["timeseries"]["generators"]["p"][name], values, atol=1e-6)
+
+
+def test_state_of_charge_is_carried_between_windows(client):
+    monolithic = client.post("/api/analyze", json=STORAGE).json()
+    result = client.post("/api/analyze", json={**STORAGE, "rolling_horizon": 2}).json()
+
+    assert result["status"] == "ok"
+    # Window 1 empties the battery in place of the cheap generator, so window 2 starts empty
+    # and has nothing to shift (any charge it holds in hour 3 comes from the peak generator)
+    storage = result["timeseries"]["storage_units"]
+    np.testing.assert_allclose(storage["p"]["battery"][:2], [5, 5], atol=1e-6)
+    np.testing.assert_allclose(storage["state_of_charge"]["battery"], [5, 0, -storage["p"]["battery"][2], 0], atol=1e-6)
+    assert sum(result["timeseries"]["generators"]["p"]["peak"]) == pytest.approx(4)
+    assert result["objective"] == pytest.approx(2 * 7 * 10 + 2 * (10 * 10 + 2 * 100))
+    # Seeing all four hours, the battery covers every deficit
+    assert monolithic["objective"] == pytest.approx((4 * 12 - 10) * 10)
+
+
+def test_rolling_horizon_rejects_extendable_capacity(client):
+    network = {**DISPATCH, "generators": [*DISPATCH["generators"], {"name": "new", "bus": "b", "p_nom_extendable": True}]}
+
+    response = client.post("/api/analyze", json={**network, "rolling_horizon": 2})
+
+    assert response.status_code == 400
+    assert "extendable (generators: new)" in response.json()["detail"]
+
+
+# "old" retires in 2030, when the extendable "new" can be built; "backup" is always there
+EXPANSION = {
+    "buses": [{"name": "bus"}],
+    "generators": [
+        {"name": "old", "bus": "bus", "p_nom": 10, "marginal_cost": 10, "build_year": 2020, "lifetime": 10},
+        {
+            "name": "new", "bus": "bus", "p_nom_extendable": True, "capital_cost": 100, "marginal_cost": 20,
+            "build_year": 2030, "lifetime": 30,
+        },
+        {"name": "backup", "bus": "bus", "p_nom": 10, "marginal_cost": 1000},
+    ],
+    "loads": [{"name": "load", "bus": "bus", "p_set": 5}],
+    "investment_periods": [2025, 2030],
+}
+
+
+def test_investment_periods_build_when_capacity_retires(client):
+    result = client.post("/api/analyze", json=EXPANSION).json()
+
+    assert result["status"] == "ok"
+    assert result["snapshot_periods"] == [2025, 2030]
+    periods = {entry["period"]: entry for entry in result["investment_periods"]}
+    assert periods[2025]["years"] == periods[2030]["years"] == 5
+    assert periods[2025]["generators"] == pytest.approx(20)
+    assert periods[2030]["generators"] == pytest.approx(15)
+    # 5 years of old at 10/MWh, then 5 MW of new built and run for 5 years
+    assert result["objective"] == pytest.approx(5 * 5 * 10 + 5 * (5 * 100 + 5 * 20))
+
+
+def test_later_periods_are_discounted(client):
+    result = client.post("/api/analyze", json={**EXPANSION, "discount_rate": 0.1}).json()
+
+    weights = [entry["objective_weight"] for entry in result["investment_periods"]]
+    assert weights == pytest.approx([sum(1.1 ** -year for year in range(start, start + 5)) for start in (0, 5)])
+
+
+@pytest.mark.parametrize(
+    "options, message",
+    [
+        ({"rolling_horizon": 2, "rolling_overlap": 2}, "must be smaller than 'rolling_horizon'"),
+        ({"investment_periods": [2030, 2025]}, "strictly increasing"),
+        ({"rolling_horizon": 2, "investment_periods": [2025]}, "Only one of"),
+    ],
+)
+def test_invalid_modes_are_rejected(client, options, message):
+    response = client.post("/api/analyze", json={**DISPATCH, **options})
+
+    assert response.status_code == 422
+    assert message in response.text
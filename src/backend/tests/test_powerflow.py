@@ -0,0 +1,104 @@
+"""Linear and AC power flow on /api/powerflow, checked against PyPSA's own n.lpf() and n.pf()."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import PowerFlowRequest, build_pypsa_network
+from powerflow import linear_powerflow
+
+SNAPSHOTS = ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00", "2024-01-01 03:00"]
+
+# A meshed four-bus network and a separate two-bus network
+NETWORK = {
+    "buses": [
+        {"name": "a", "v_nom": 20}, {"name": "b", "v_nom": 20}, {"name": "c", "v_nom": 20}, {"name": "d", "v_nom": 20},
+        {"name": "e", "v_nom": 20}, {"name": "f", "v_nom": 20},
+    ],
+    "generators": [
+        {"name": "slack", "bus": "a", "p_nom": 50, "control": "Slack"},
+        {"name": "g_c", "bus": "c", "p_nom": 10, "p_set": 3},
+        {"name": "g_e", "bus": "e", "p_nom": 10, "control": "Slack"},
+    ],
+    "loads": [
+        {"name": "l_b", "bus": "b", "p_set": 4, "q_set": 1},
+        {"name": "l_d", "bus": "d", "q_set": 0.5},
+        {"name": "l_f", "bus": "f", "p_set": 2},
+    ],
+    "lines": [
+        {"name": "ab", "bus0": "a", "bus1": "b", "x": 0.2, "r": 0.05, "s_nom": 10},
+        {"name": "bc", "bus0": "b", "bus1": "c", "x": 0.1, "r": 0.02, "s_nom": 10},
+        {"name": "cd", "bus0": "c", "bus1": "d", "x": 0.3, "r": 0.05, "s_nom": 10},
+        {"name": "da", "bus0": "d", "bus1": "a", "x": 0.15, "r": 0.03, "s_nom": 10},
+        {"name": "bd", "bus0": "b", "bus1": "d", "x": 0.25, "r": 0.04, "s_nom": 10},
+        {"name": "ef", "bus0": "e", "bus1": "f", "x": 0.1, "r": 0.02, "s_nom": 1},
+    ],
+    "snapshots": SNAPSHOTS,
+    "loads_t": {"p_set": {"l_d": [1, 2, 3, 4]}},
+    "generators_t": {"p_set": {"g_c": [0, 1, 2, 5]}},
+}
+
+
+def network():
+    payload = PowerFlowRequest(**NETWORK)
+    return build_pypsa_network(payload)
+
+
+def frame(section, snapshots):
+    return pd.DataFrame(section, index=pd.to_datetime(snapshots))
+
+
+def test_linear_powerflow_matches_lpf():
+    n = network()
+    expected = network()
+    expected.lpf()
+
+    frames = linear_powerflow(n, n.snapshots)
+
+    for key, reference in (
+        ("lines.p0", expected.lines_t.p0),
+        ("buses.p", expected.buses_t.p),
+        ("buses.v_ang", expected.buses_t.v_ang),
+        ("generators.p", expected.generators_t.p),
+    ):
+        pd.testing.assert_frame_equal(frames[key], reference[frames[key].columns], check_names=False, atol=1e-9)
+    np.testing.assert_allclose(frames["lines.loading"]["ef"], [2.0] * 4)
+
+
+def test_linear_api_matches_lpf(client):
+    expected = network()
+    expected.lpf()
+
+    result = client.post("/api/powerflow", json=NETWORK).json()
+
+    assert result["status"] == "ok"
+    assert result["mode"] == "linear"
+    assert len(result["snapshots"]) == 4
+    flows = frame(result["lines"]["p0"], result["snapshots"])
+    pd.testing.assert_frame_equal(flows, expected.lines_t.p0[flows.columns], check_names=False, check_freq=False, atol=1e-9)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ac_api_matches_pf(client, workers):
+    expected = network()
+    expected.pf()
+
+    result = client.post("/api/powerflow", json={**NETWORK, "mode": "ac", "workers": workers}).json()
+
+    assert result["status"] == "ok"
+    assert result["converged"] == [True] * 4
+    assert all(iterations > 0 for iterations in result["iterations"])
+    for section, attr, reference in (
+        ("buses", "v_mag_pu", expected.buses_t.v_mag_pu),
+        ("lines", "p0", expected.lines_t.p0),
+        ("lines", "q0", expected.lines_t.q0),
+        ("generators", "p", expected.generators_t.p),
+    ):
+        values = frame(result[section][attr], result["snapshots"])
+        pd.testing.assert_frame_equal(values, reference[values.columns], check_names=False, check_freq=False, atol=1e-8)
+
+
+def test_network_without_buses_is_rejected(client):
+    response = client.post("/api/powerflow", json={"snapshots": SNAPSHOTS})
+
+    assert response.status_code == 400
@@ -0,0 +1,183 @@
+"""Paged reads of exported results on /api/results and result projection on /api/analyze."""
+
+import base64
+
+import numpy as np
+import pytest
+
+import app as backend
+
+GENERATORS = [f"g{i}" for i in range(7)]
+
+# The last hour needs every generator, so each has a dispatch series in the export
+NETWORK = {
+    "buses": [{"name": "bus_a"}, {"name": "bus_b"}],
+    "generators": [
+        {"name": name, "bus": "bus_a" if i % 2 else "bus_b", "p_nom": 2, "marginal_cost": 10 + i}
+        for i, name in enumerate(GENERATORS)
+    ],
+    "loads": [{"name": "load", "bus": "bus_b"}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 20}],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+    "loads_t": {"p_set": {"load": [3, 7, 14]}},
+}
+
+
+@pytest.fixture
+def exported(client):
+    result = client.post("/api/analyze", json={**NETWORK, "export_result": True}).json()
+    assert result["status"] == "ok"
+    return result
+
+
+def walk(client, url, **params):
+    """Every page of a paged listing, following next_cursor until it is None."""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+        assert len(pages) < 20
+
+
+def test_time_series_pages_cover_every_component(client, exported):
+    url = f"/api/results/{exported['result_id']}/generators/p"
+
+    pages = walk(client, url, limit=3)
+
+    assert [list(page["values"]) for page in pages] == [GENERATORS[:3], GENERATORS[3:6], GENERATORS[6:]]
+    assert all(page["total"] == 7 for page in pages)
+    values = {name: values for page in pages for name, values in page["values"].items()}
+    assert values == exported["timeseries"]["generators"]["p"]
+    # Without a limit the single page has everything
+    (whole,) = walk(client, url)
+    assert whole["values"] == values
+
+
+def test_static_pages_cover_every_component(client, exported):
+    url = f"/api/results/{exported['result_id']}/generators"
+
+    pages = walk(client, url, limit=2, attributes=["p_nom", "marginal_cost"])
+
+    assert len(pages) == 4
+    p_nom = {name: value for page in pages for name, value in page["attributes"]["p_nom"].items()}
+    costs = {name: value for page in pages for name, value in page["attributes"]["marginal_cost"].items()}
+    assert list(p_nom) == GENERATORS
+    assert costs == {name: 10 + i for i, name in enumerate(GENERATORS)}
+
+
+def test_names_filter_is_paged(client, exported):
+    names = ["g1", "g3", "g5", "g6"]
+    url = f"/api/results/{exported['result_id']}/generators/p"
+
+    pages = walk(client, url, names=names, limit=3, start=1, stop=3)
+
+    assert [list(page["values"]) for page in pages] == [names[:3], names[3:]]
+    assert all(page["total"] == 4 for page in pages)
+    assert pages[0]["snapshots"] == ["2024-01-01 01:00:00", "2024-01-01 02:00:00"]
+    for page in pages:
+        for name, values in page["values"].items():
+            assert values == exported["timeseries"]["generators"]["p"][name][1:3]
+    response = client.get(url, params={"names": ["g1", "missing"]})
+    assert response.status_code == 404
+
+
+def test_cursor_from_another_listing_is_rejected(client, exported):
+    other = client.post("/api/analyze", json={**NETWORK, "export_result": True}).json()
+    base = f"/api/results/{exported['result_id']}"
+    cursor = client.get(f"{base}/generators/p", params={"limit": 2}).json()["next_cursor"]
+
+    assert client.get(f"{base}/generators/p", params={"limit": 2, "cursor": cursor}).status_code == 200
+    for url in (
+        f"{base}/generators/p_nom",
+        f"{base}/generators",
+        f"{base}/loads/p",
+        f"/api/results/{other['result_id']}/generators/p",
+    ):
+        response = client.get(url, params={"limit": 2, "cursor": cursor})
+        assert response.status_code == 400
+        assert "Cursor does not belong to" in response.json()["detail"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        "!!!!",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        base64.urlsafe_b64encode(b"no offset").decode(),
+    ],
+)
+def test_tampered_cursor_is_rejected(client, exported, cursor):
+    response = client.get(f"/api/results/{exported['result_id']}/generators/p", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+
+def test_cursor_with_a_forged_offset_is_rejected(client, exported):
+    scope = f"{exported['result_id']}/generators/p"
+    forged = base64.urlsafe_b64encode(f"{scope}:-2".encode()).decode()
+    beyond = base64.urlsafe_b64encode(f"{scope}:99".encode()).decode()
+    url = f"/api/results/{exported['result_id']}/generators/p"
+
+    assert client.get(url, params={"cursor": forged}).status_code == 400
+    # A cursor past the end gives an empty last page
+    page = client.get(url, params={"cursor": beyond}).json()
+    assert page["values"] == {} and page["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "projection, keys",
+    [
+        ({"sections": ["capacities"]}, {"capacities"}),
+        ({"sections": ["timeseries", "snapshots"]}, {"timeseries", "snapshots"}),
+        ({"sections": []}, set()),
+        ({}, {"capacities", "power", "timeseries", "snapshots", "statistics", "topology"}),
+    ],
+)
+def test_projection_selects_sections(client, projection, keys):
+    result = client.post("/api/analyze", json={**NETWORK, "projection": projection}).json()
+
+    sections = {"capacities", "power", "timeseries", "snapshots", "statistics", "topology"}
+    assert result["status"] == "ok"
+    assert {key for key in result if key in sections} == keys
+    assert {"objective", "solver", "timings"} <= set(result)
+
+
+def test_projection_selects_components_and_attributes(client):
+    full = client.post("/api/analyze", json=NETWORK).json()
+    projection = {"components": ["generators"], "attributes": ["p_nom_opt", "p", "Optimal Capacity"]}
+
+    result = client.post("/api/analyze", json={**NETWORK, "projection": projection}).json()
+
+    assert set(result["capacities"]) == set(result["power"]) == set(result["timeseries"]) == {"generators"}
+    assert all(set(record) == {"Generator", "p_nom_opt"} for record in result["capacities"]["generators"])
+    assert result["timeseries"]["generators"] == {"p": full["timeseries"]["generators"]["p"]}
+    assert set(result["statistics"]) == {"Optimal Capacity"}
+    assert result["statistics"]["Optimal Capacity"] == {
+        label: value for label, value in full["statistics"]["Optimal Capacity"].items() if label.startswith("('Generator'")
+    }
+
+
+def test_projection_applies_to_streamed_large_responses(client, monkeypatch):
+    monkeypatch.setattr(backend, "large_payload_mb", 1e-6)
+    projection = {"sections": ["timeseries"], "components": ["loads"]}
+
+    result = client.post("/api/analyze", json={**NETWORK, "projection": projection}).json()
+
+    assert result["status"] == "ok"
+    assert "capacities" not in result and "snapshots" not in result
+    assert set(result["timeseries"]) == {"loads"}
+    np.testing.assert_allclose(result["timeseries"]["loads"]["p"]["load"], [3, 7, 14])
+
+
+def test_unknown_projection_section_is_rejected(client):
+    response = client.post("/api/analyze", json={**NETWORK, "projection": {"sections": ["everything"]}})
+
+    assert response.status_code == 422
@@ -0,0 +1,128 @@
+"""Result extraction, checked against the pandas to_dict / to_json path it replaced."""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+import results
+from app import AnalyzeRequest, build_pypsa_network
+from results import encode_json, extract_results, timeseries_json
+
+NETWORK = {
+    "buses": [{"name": "bus_a"}, {"name": "bus_b"}],
+    "generators": [
+        {"name": "cheap", "bus": "bus_a", "p_nom": 10, "marginal_cost": 5, "carrier": "solar"},
+        {"name": "peaker", "bus": "bus_b", "p_nom": 10, "marginal_cost": 50, "carrier": "diesel"},
+        {"name": "new", "bus": "bus_b", "p_nom_extendable": True, "capital_cost": 20, "marginal_cost": 30},
+    ],
+    "loads": [{"name": "load", "bus": "bus_b"}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 3}],
+    "storage_units": [{"name": "battery", "bus": "bus_b", "p_nom": 1, "max_hours": 2}],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+    "loads_t": {"p_set": {"load": [2, 4, 6]}},
+    "generators_t": {"p_max_pu": {"cheap": [1, 0.5, 0]}},
+}
+
+
+@pytest.fixture(scope="module")
+def network():
+    n = build_pypsa_network(AnalyzeRequest(**NETWORK))
+    n.optimize()
+    return n
+
+
+def reference_records(frame):
+    return frame.reset_index().rename(columns={"index": "name"}).to_dict(orient="records")
+
+
+def test_capacities_match_to_dict(network):
+    n = network
+    section = extract_results(n, ["capacities"])["capacities"]
+
+    assert section["generators"] == reference_records(n.generators[["p_nom", "p_nom_opt"]])
+    assert section["lines"] == reference_records(n.lines[["s_nom", "s_nom_opt"]])
+    assert section["storage_units"] == reference_records(n.storage_units[["p_nom", "max_hours", "p_nom_opt"]])
+    assert {record["Generator"]: record["p_nom_opt"] for record in section["generators"]}["new"] > 0
+
+
+def test_power_matches_the_first_snapshot(network):
+    n = network
+    section = extract_results(n, ["power"])["power"]
+
+    for key, frame, attr in (
+        ("generators", n.generators_t.p, "p"),
+        ("loads", n.loads_t.p, "p"),
+        ("lines", n.lines_t.p0, "p0"),
+        ("buses", n.buses_t.p, "p"),
+    ):
+        assert section[key] == frame.iloc[0].rename(attr).reset_index().to_dict(orient="records")
+
+
+def test_statistics_match_to_json(network):
+    section = extract_results(network, ["statistics"])["statistics"]
+
+    expected = json.loads(network.statistics().to_json())
+    assert section.keys() == expected.keys()
+    for metric, values in expected.items():
+        assert section[metric] == pytest.approx(values, nan_ok=True)
+
+
+def test_timeseries_json_matches_the_section(network):
+    section = extract_results(network, ["timeseries"])["timeseries"]
+
+    assert json.loads("".join(timeseries_json(network))) == json.loads(encode_json(section))
+    np.testing.assert_allclose(section["loads"]["p"]["load"], [2, 4, 6])
+    selected = json.loads("".join(timeseries_json(network, ["storage_units"], ["state_of_charge"])))
+    expected = {"storage_units": {"state_of_charge": section["storage_units"]["state_of_charge"]}}
+    assert selected == json.loads(encode_json(expected))
+
+
+def test_timeseries_are_float_arrays_for_orjson(network):
+    section = extract_results(network, ["timeseries"])["timeseries"]
+
+    for name, values in section["generators"]["p"].items():
+        # orjson serializes only C-contiguous arrays itself
+        assert isinstance(values, np.ndarray) and values.dtype == float and values.flags.c_contiguous
+        assert values.tolist() == network.generators_t.p[name].tolist()
+    frame = network.generators_t.p.copy()
+    frame.iloc[1, 0] = np.nan
+    encoded = json.loads(encode_json(results.columnar_series(frame)))
+    assert encoded[frame.columns[0]] == [frame.iloc[0, 0], None, frame.iloc[2, 0]]
+
+
+def test_components_and_attributes_can_be_selected(network):
+    extracted = extract_results(
+        network, ["capacities", "power", "timeseries", "statistics"], ["generators"], ["p_nom_opt", "p", "Optimal Capacity"]
+    )
+
+    assert set(extracted["capacities"]) == {"generators"}
+    assert set(extracted["capacities"]["generators"][0]) == {"Generator", "p_nom_opt"}
+    assert set(extracted["power"]) == {"generators"}
+    assert set(extracted["timeseries"]) == {"generators"}
+    assert set(extracted["timeseries"]["generators"]) == {"p"}
+    assert set(extracted["statistics"]) == {"Optimal Capacity"}
+    assert all(label.startswith("('Generator'") for label in extracted["statistics"]["Optimal Capacity"])
+    # An attribute that none of the sections has leaves only the names
+    names_only = extract_results(network, ["capacities"], ["lines"], ["missing"])["capacities"]
+    assert names_only == {"lines": [{"Line": "line"}]}
+
+
+def test_unknown_section_is_rejected(network):
+    with pytest.raises(ValueError, match="Unknown result sections: topology"):
+        extract_results(network, ["topology"])
+
+
+def test_nan_is_encoded_as_null(monkeypatch):
+    values = np.array([1.0, np.nan])
+    content = {"plain": results.plain(values), "array": values, "scalar": np.float32(0.5), "count": np.int64(3)}
+
+    encoded = json.loads(encode_json(content))
+    # The standard library fallback writes the same JSON
+    monkeypatch.setattr(results, "orjson", None)
+    fallback = json.loads(encode_json(content))
+
+    assert encoded == fallback == {"plain": [1.0, None], "array": [1.0, None], "scalar": 0.5, "count": 3}
+    assert results.plain(np.array(["a", "b"])) == ["a", "b"]
+    assert results.plain(np.array([1, math.nan], dtype=object)) == [1, None]
@@ -0,0 +1,204 @@
+"""Incremental re-solves on /api/sessions: patched sessions must match a solve from scratch."""
+
+import copy
+
+import numpy as np
+import pytest
+
+SNAPSHOTS = ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"]
+
+# Meshed three-bus network with congested lines, so that bounds, loads and
+# costs all move the optimal dispatch
+NETWORK = {
+    "buses": [{"name": "a"}, {"name": "b"}, {"name": "c"}],
+    "generators": [
+        {"name": "g_a", "bus": "a", "p_nom": 10, "marginal_cost": 10},
+        {"name": "g_b", "bus": "b", "p_nom": 10, "marginal_cost": 20},
+        {"name": "g_c", "bus": "c", "p_nom": 10, "marginal_cost": 30},
+        {"name": "g_free", "bus": "c", "p_nom": 1, "marginal_cost": 0},
+    ],
+    "loads": [{"name": "l_b", "bus": "b", "p_set": 6}, {"name": "l_c", "bus": "c"}],
+    "lines": [
+        {"name": "ab", "bus0": "a", "bus1": "b", "x": 0.1, "s_nom": 5},
+        {"name": "bc", "bus0": "b", "bus1": "c", "x": 0.1, "s_nom": 5},
+        {"name": "ca", "bus0": "c", "bus1": "a", "x": 0.1, "s_nom": 5},
+    ],
+    "snapshots": SNAPSHOTS,
+    "loads_t": {"p_set": {"l_c": [4, 8, 12]}},
+}
+
+
+def updated(network, field, name, **values):
+    for row in network[field]:
+        if row["name"] == name:
+            row.update(values)
+
+
+def rhs_only(network):
+    updated(network, "loads", "l_b", p_set=7)
+    updated(network, "lines", "bc", s_nom=4)
+    updated(network, "generators", "g_c", p_nom=12)
+    network["loads_t"]["p_set"]["l_c"] = [5, 9, 11]
+    network.setdefault("generators_t", {})["p_max_pu"] = {"g_a": [1, 0.8, 0.5]}
+
+
+def cost_only(network):
+    updated(network, "generators", "g_b", marginal_cost=35)
+    network.setdefault("generators_t", {})["marginal_cost"] = {"g_a": [10, 40, 10]}
+
+
+def structural(network):
+    network["generators"].append({"name": "g_new", "bus": "c", "p_nom": 3, "marginal_cost": 5})
+    network["lines"] = [line for line in network["lines"] if line["name"] != "ca"]
+
+
+def priced(network):
+    # A zero cost has no objective term to update, so the model is rebuilt
+    updated(network, "generators", "g_free", marginal_cost=25)
+
+
+EDITS = {
+    "rhs_only": (
+        rhs_only,
+        {
+            "update": {
+                "loads": [{"name": "l_b", "p_set": 7}],
+                "lines": [{"name": "bc", "s_nom": 4}],
+                "generators": [{"name": "g_c", "p_nom": 12}],
+            },
+            "loads_t": {"p_set": {"l_c": [5, 9, 11]}},
+            "generators_t": {"p_max_pu": {"g_a": [1, 0.8, 0.5]}},
+        },
+        True,
+    ),
+    "cost_only": (
+        cost_only,
+        {
+            "update": {"generators": [{"name": "g_b", "marginal_cost": 35}]},
+            "generators_t": {"marginal_cost": {"g_a": [10, 40, 10]}},
+        },
+        True,
+    ),
+    "structural": (
+        structural,
+        {
+            "add": {"generators": [{"name": "g_new", "bus": "c", "p_nom": 3, "marginal_cost": 5}]},
+            "remove": {"lines": ["ca"]},
+        },
+        False,
+    ),
+    "priced": (priced, {"update": {"generators": [{"name": "g_free", "marginal_cost": 25}]}}, False),
+}
+
+
+def assert_same_solution(result, expected):
+    assert result["status"] == "ok"
+    assert result["objective"] == pytest.approx(expected["objective"], rel=1e-9)
+    for component, attribute in (("generators", "p"), ("lines", "p0")):
+        series = expected["timeseries"][component][attribute]
+        assert set(result["timeseries"][component][attribute]) == set(series)
+        for name, values in series.items():
+            np.testing.assert_allclose(result["timeseries"][component][attribute][name], values, atol=1e-6)
+
+
+def start_session(client, network):
+    response = client.post("/api/sessions", json=network)
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.parametrize("edit", list(EDITS))
+def test_patched_session_matches_solve_from_scratch(client, edit):
+    change, patch, reused = EDITS[edit]
+    network = copy.deepcopy(NETWORK)
+    change(network)
+    expected = client.post("/api/analyze", json=network).json()
+    session = start_session(client, NETWORK)
+
+    result = client.patch(f"/api/sessions/{session['session_id']}", json=patch).json()
+
+    assert result["model_reused"] is reused
+    assert result["revision"] == 1
+    assert_same_solution(result, expected)
+    assert result["objective"] != pytest.approx(session["objective"])
+
+
+def test_consecutive_patches_build_on_each_other(client):
+    network = copy.deepcopy(NETWORK)
+    session = start_session(client, network)
+    url = f"/api/sessions/{session['session_id']}"
+
+    for edit in ("rhs_only", "cost_only"):
+        change, patch, _ = EDITS[edit]
+        change(network)
+        result = client.patch(url, json=patch).json()
+        assert result["model_reused"] is True
+    # Loads change again relative to the already patched model
+    updated(network, "loads", "l_b", p_set=2)
+    result = client.patch(url, json={"update": {"loads": [{"name": "l_b", "p_set": 2}]}}).json()
+
+    assert result["revision"] == 3
+    assert_same_solution(result, client.post("/api/analyze", json=network).json())
+    assert client.get(url).json()["revision"] == 3
+
+
+@pytest.mark.parametrize(
+    "patch, message",
+    [
+        ({"update": {"loads": [{"name": "missing", "p_set": 1}]}}, "unknown loads: missing"),
+        ({"update": {"loads": [{"p_set": 1}]}}, "needs a 'name'"),
+        ({"update": {"loads": [{"name": "l_b", "colour": 1}]}}, "has no attribute 'colour'"),
+        ({"add": {"generators": [{"name": "g_a", "bus": "a"}]}}, "already exist: g_a"),
+        ({"remove": {"lines": ["ab"]}, "update": {"lines": [{"name": "ab", "s_nom": 1}]}}, "that the patch removes"),
+        ({"loads_t": {"p_set": {"l_c": [1, 2]}}}, "one value per snapshot"),
+    ],
+)
+def test_invalid_patch_is_rejected(client, patch, message):
+    session = start_session(client, NETWORK)
+    url = f"/api/sessions/{session['session_id']}"
+
+    response = client.patch(url, json=patch)
+
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+    assert client.get(url).json()["revision"] == 0
+
+
+@pytest.mark.parametrize(
+    "rejected, status",
+    [
+        # Leaves bus c's island of load without generation
+        ({"remove": {"generators": ["g_a", "g_b", "g_c", "g_free"]}}, 400),
+        # Updated in place, but the lines can no longer carry the load to c
+        ({"update": {"lines": [{"name": name, "s_nom": 0.1} for name in ("ab", "bc", "ca")]}}, 200),
+    ],
+)
+def test_failed_patch_leaves_the_session_unchanged(client, rejected, status):
+    session = start_session(client, NETWORK)
+    url = f"/api/sessions/{session['session_id']}"
+
+    response = client.patch(url, json=rejected)
+    assert response.status_code == status
+    if status == 200:
+        assert response.json()["status"] == "error"
+        assert response.json()["revision"] == 0
+    assert client.get(url).json()["revision"] == 0
+
+    edit, patch, _ = EDITS["rhs_only"]
+    network = copy.deepcopy(NETWORK)
+    edit(network)
+    result = client.patch(url, json=patch).json()
+
+    assert result["revision"] == 1
+    # The model of the failed patch is not solved again
+    assert result["model_reused"] is False
+    assert_same_solution(result, client.post("/api/analyze", json=network).json())
+
+
+def test_deleted_session_is_gone(client):
+    session = start_session(client, NETWORK)
+    url = f"/api/sessions/{session['session_id']}"
+
+    assert client.delete(url).status_code == 200
+    assert client.get(url).status_code == 404
+    assert client.patch(url, json={}).status_code == 404
@@ -0,0 +1,90 @@
+"""Solver selection and option passthrough."""
+
+import pytest
+
+import solvers
+from solvers import SolverConfigError, solver_kwargs
+
+NETWORK = {
+    "buses": [{"name": "bus"}],
+    "generators": [{"name": "gen", "bus": "bus", "p_nom": 10, "marginal_cost": 5}],
+    "loads": [{"name": "load", "bus": "bus", "p_set": 4}],
+}
+
+
+@pytest.fixture
+def every_solver(monkeypatch):
+    monkeypatch.setattr(solvers, "installed_solvers", lambda: list(solvers.SOLVER_OPTION_NAMES))
+
+
+def test_generic_settings_use_each_solvers_option_names(every_solver):
+    assert solver_kwargs("highs", threads=4, time_limit=2.5, mip_gap=0.01, tolerance=1e-6) == {
+        "solver_name": "highs",
+        "threads": 4,
+        "parallel": "on",
+        "time_limit": 2.5,
+        "mip_rel_gap": 0.01,
+        "primal_feasibility_tolerance": 1e-6,
+        "dual_feasibility_tolerance": 1e-6,
+    }
+    assert solver_kwargs("Gurobi", threads=1, time_limit=2.5) == {
+        "solver_name": "gurobi",
+        "Threads": 1,
+        "TimeLimit": 2.5,
+    }
+
+
+def test_whole_second_solvers_round_the_time_limit_up(every_solver):
+    assert solver_kwargs("glpk", time_limit=2.1) == {"solver_name": "glpk", "tmlim": 3}
+
+
+def test_solver_options_pass_through_and_win(every_solver):
+    kwargs = solver_kwargs("highs", threads=2, options={"threads": 1, "presolve": "off"})
+
+    assert kwargs["threads"] == 1
+    assert kwargs["presolve"] == "off"
+
+
+def test_unsupported_setting_is_rejected(every_solver):
+    with pytest.raises(SolverConfigError, match="'glpk' does not support the 'threads'"):
+        solver_kwargs("glpk", threads=2)
+
+
+def test_missing_solver_is_rejected(monkeypatch):
+    monkeypatch.setattr(solvers, "installed_solvers", lambda: ["highs"])
+
+    with pytest.raises(SolverConfigError, match=r"'gurobi' is not installed \(available: highs\)"):
+        solver_kwargs("gurobi")
+    assert solver_kwargs()["solver_name"] == "highs"
+
+
+def test_health_lists_installed_solvers(client):
+    assert "highs" in client.get("/api/health").json()["solvers"]
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"solver": "HiGHS", "threads": 2, "time_limit": 30, "tolerance": 1e-7},
+        {"solver_options": {"presolve": "off"}},
+    ],
+)
+def test_analyze_with_solver_settings(client, settings):
+    result = client.post("/api/analyze", json={**NETWORK, **settings}).json()
+
+    assert result["status"] == "ok"
+    assert result["solver"] == "highs"
+    assert result["termination_condition"] == "optimal"
+    assert result["objective"] == pytest.approx(20.0)
+
+
+@pytest.mark.parametrize(
+    "settings, status",
+    [
+        ({"solver": "no-such-solver"}, 400),
+        ({"time_limit": 0}, 422),
+        ({"threads": 0}, 422),
+    ],
+)
+def test_invalid_solver_settings_are_rejected(client, settings, status):
+    assert client.post("/api/analyze", json={**NETWORK, **settings}).status_code == status
@@ -0,0 +1,141 @@
+"""Spatial reduction before solving, checked against solving the unreduced network."""
+
+import copy
+
+import numpy as np
+import pytest
+
+from app import AnalyzeRequest, build_pypsa_network
+from spatial import reduce_network
+
+# A meshed core a-b-c, a chain c-p1-p2-d through the bus p1 with nothing attached
+# whose middle line is congested, and dead ends d and e that can never congest theirs
+NETWORK = {
+    "buses": [
+        {"name": name, "x": x, "y": y}
+        for name, x, y in (("a", 0, 0), ("b", 1, 0), ("c", 0.5, 1), ("p1", 0.5, 2), ("p2", 0.5, 3), ("d", 0.5, 4), ("e", 2, 0))
+    ],
+    "generators": [
+        {"name": "g_a", "bus": "a", "p_nom": 30, "marginal_cost": 10},
+        {"name": "g_b", "bus": "b", "p_nom": 30, "marginal_cost": 20},
+        {"name": "g_d", "bus": "d", "p_nom": 5, "marginal_cost": 50},
+    ],
+    "loads": [
+        {"name": "l_b", "bus": "b", "p_set": 10},
+        {"name": "l_d", "bus": "d"},
+        {"name": "l_e", "bus": "e", "p_set": 4},
+    ],
+    "lines": [
+        {"name": "ab", "bus0": "a", "bus1": "b", "x": 0.1, "s_nom": 12},
+        {"name": "bc", "bus0": "b", "bus1": "c", "x": 0.1, "s_nom": 20},
+        {"name": "ca", "bus0": "c", "bus1": "a", "x": 0.1, "s_nom": 20},
+        {"name": "c_p1", "bus0": "c", "bus1": "p1", "x": 0.05, "s_nom": 15},
+        {"name": "p1_p2", "bus0": "p1", "bus1": "p2", "x": 0.05, "s_nom": 6},
+        {"name": "p2_d", "bus0": "p2", "bus1": "d", "x": 0.05, "s_nom": 15},
+        {"name": "be", "bus0": "b", "bus1": "e", "x": 0.1, "s_nom": 50},
+    ],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+    "loads_t": {"p_set": {"l_d": [3, 5, 8]}},
+}
+
+
+def analyze(client, network, spatial=None):
+    result = client.post("/api/analyze", json={**network, "spatial": spatial} if spatial is not None else network).json()
+    assert result["status"] == "ok"
+    return result
+
+
+def assert_same_dispatch(result, expected):
+    assert result["objective"] == pytest.approx(expected["objective"])
+    for component, attribute in (("generators", "p"), ("loads", "p"), ("lines", "p0")):
+        series = expected["timeseries"][component][attribute]
+        assert set(result["timeseries"][component][attribute]) == set(series)
+        for name, values in series.items():
+            np.testing.assert_allclose(result["timeseries"][component][attribute][name], values, atol=1e-6)
+
+
+def test_reduction_maps_buses_to_their_stand_ins():
+    n = build_pypsa_network(AnalyzeRequest(**NETWORK))
+
+    reduction = reduce_network(n)
+
+    # d can import 8 over p2_d (15) but not over p1_p2 (6), so p2 stays;
+    # p1 lies before the chain's bottleneck and takes the price of c
+    assert reduction.busmap.to_dict() == {"a": "a", "b": "b", "c": "c", "p1": "c", "p2": "p2", "d": "p2", "e": "b"}
+    assert sorted(reduction.kept_lines) == ["ab", "bc", "ca"]
+    m = reduction.network
+    assert sorted(m.buses.index) == ["a", "b", "c", "p2"]
+    assert (m.lines.at["c_p1", "bus0"], m.lines.at["c_p1", "bus1"], m.lines.at["c_p1", "s_nom"]) == ("c", "p2", 6)
+    assert m.lines.at["c_p1", "x"] == pytest.approx(0.1)
+    assert m.generators.at["g_d", "bus"] == "p2" and m.loads.at["l_e", "bus"] == "b"
+    # The original network is left alone
+    assert len(n.buses) == 7 and n.generators.at["g_d", "bus"] == "d"
+
+
+@pytest.mark.parametrize(
+    "spatial, dead_ends, series",
+    [({}, 2, 1), ({"merge_series": False}, 2, 0), ({"collapse_dead_ends": False}, 0, 2)],
+)
+def test_exact_reduction_reproduces_the_full_solve(client, spatial, dead_ends, series):
+    expected = analyze(client, NETWORK)
+
+    result = analyze(client, NETWORK, spatial)
+
+    metrics = result["spatial_reduction"]
+    assert metrics["buses"] == 7
+    assert metrics.get("dead_end_buses", 0) == dead_ends
+    assert metrics.get("series_buses", 0) == series
+    assert metrics["reduced_buses"] == 7 - dead_ends - series
+    assert metrics["overloaded_lines"] == 0
+    # p1_p2 is congested in the last snapshot
+    assert metrics["max_line_loading"] == pytest.approx(1.0)
+    assert_same_dispatch(result, expected)
+
+
+@pytest.mark.parametrize("cluster_by", ["electrical", "coordinates"])
+def test_clustering_relaxes_the_lines_within_clusters(client, cluster_by):
+    network = copy.deepcopy(NETWORK)
+    # Congest the core so that the cheap generator is limited by ab
+    for line in network["lines"]:
+        if line["name"] == "ab":
+            line["s_nom"] = 8
+    expected = analyze(client, network)
+
+    result = analyze(client, network, {"buses": 2, "cluster_by": cluster_by})
+
+    metrics = result["spatial_reduction"]
+    assert metrics["reduced_buses"] == 2
+    assert set(result["timeseries"]["lines"]["p0"]) == {line["name"] for line in network["lines"]}
+    assert set(result["timeseries"]["generators"]["p"]) == {"g_a", "g_b", "g_d"}
+    # a, b and c end up in one cluster, so ab no longer limits the cheap generator;
+    # the disaggregated flow of 34/3 in the last snapshot overloads it
+    assert result["objective"] == pytest.approx(660) and expected["objective"] == pytest.approx(790)
+    assert metrics["overloaded_lines"] == 1
+    assert metrics["max_line_loading"] == pytest.approx(34 / 3 / 8)
+
+
+@pytest.mark.parametrize(
+    "spatial, message",
+    [
+        ({"buses": 2, "cluster_by": "coordinates"}, "needs x/y coordinates"),
+        ({"buses": 2, "extendable_line": True}, "cannot be clustered while line capacities are extendable"),
+    ],
+)
+def test_impossible_clustering_is_rejected(client, spatial, message):
+    network = copy.deepcopy(NETWORK)
+    if spatial.pop("extendable_line", False):
+        network["lines"][0]["s_nom_extendable"] = True
+    else:
+        for bus in network["buses"]:
+            bus.pop("x"), bus.pop("y")
+
+    response = client.post("/api/analyze", json={**network, "spatial": spatial})
+
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+def test_spatial_cannot_split_islands(client):
+    response = client.post("/api/analyze", json={**NETWORK, "spatial": {}, "split_islands": True})
+
+    assert response.status_code == 422
@@ -0,0 +1,85 @@
+"""NDJSON progress and result events from /api/analyze/stream."""
+
+import json
+
+import pytest
+
+from app import _read_new_log_lines
+
+NETWORK = {
+    "buses": [{"name": "bus_a"}, {"name": "bus_b"}],
+    "generators": [{"name": "gen", "bus": "bus_a", "p_nom": 10, "marginal_cost": 5}],
+    "loads": [{"name": "load", "bus": "bus_b", "p_set": 4}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 10}],
+}
+
+
+def stream(client, payload):
+    with client.stream("POST", "/api/analyze/stream", json=payload) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_stages_then_sections_then_done(client):
+    events = stream(client, NETWORK)
+    names = [event["event"] for event in events if event["event"] != "solver_progress"]
+
+    stages = ["network_built", "topology", "model_built", "solver_started", "solved"]
+    assert [name for name in names if name in stages] == stages
+    assert names.index("solved") < names.index("capacities")
+    assert {"capacities", "power", "timeseries", "statistics"} <= set(names)
+    assert names[-1] == "done"
+    elapsed = [event["elapsed"] for event in events]
+    assert elapsed == sorted(elapsed)
+
+
+def test_streamed_sections_match_analyze(client):
+    expected = client.post("/api/analyze", json=NETWORK).json()
+
+    events = {event["event"]: event["data"] for event in stream(client, NETWORK)}
+
+    assert events["done"]["status"] == "ok"
+    assert events["done"]["objective"] == pytest.approx(expected["objective"])
+    assert events["done"]["snapshots"] == expected["snapshots"]
+    assert "solve" in events["done"]["timings"]["stages"]
+    assert events["power"] == expected["power"]
+    assert events["timeseries"] == expected["timeseries"]
+
+
+def test_unsupplied_network_ends_with_error(client):
+    events = stream(client, {**NETWORK, "generators": []})
+
+    assert events[-1]["event"] == "error"
+    assert events[-1]["data"]["status_code"] == 400
+    assert "no generation" in events[-1]["data"]["error"]
+    assert "done" not in [event["event"] for event in events]
+
+
+def test_unknown_solver_ends_with_error(client):
+    events = stream(client, {**NETWORK, "solver": "no-such-solver"})
+
+    assert [event["event"] for event in events] == ["error"]
+    assert events[0]["data"]["status_code"] == 400
+    assert "no-such-solver" in events[0]["data"]["error"]
+
+
+def test_malformed_body_is_rejected_before_streaming(client):
+    response = client.post("/api/analyze/stream", json={**NETWORK, "buses": "not a list"})
+
+    assert response.status_code == 422
+
+
+def test_log_reader_returns_complete_lines_only(tmp_path):
+    log = tmp_path / "solver.log"
+    log.write_bytes(b"first\n\nsecond\npart")
+
+    lines, position = _read_new_log_lines(str(log), 0)
+    assert lines == ["first", "second"]
+
+    with open(log, "ab") as f:
+        f.write(b"ial\n")
+    lines, position = _read_new_log_lines(str(log), position)
+    assert lines == ["partial"]
+    assert _read_new_log_lines(str(log), position) == ([], position)
+    assert _read_new_log_lines(str(tmp_path / "missing.log"), 0) == ([], 0)
@@ -0,0 +1,80 @@
+"""Synthetic benchmark networks and the in-process stage benchmark of /api/analyze."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import bench_analyze
+from app import AnalyzeRequest, build_pypsa_network
+from synthetic import microgrid_cluster, synthetic_network
+from topology import analyze_topology
+
+
+@pytest.mark.parametrize("topology", ["radial", "meshed", "microgrid"])
+def test_networks_have_the_requested_size(topology):
+    # 100 buses fit all three exactly: a 10 x 10 grid and five microgrids of 20
+    payload = synthetic_network(topology, 100, gen_every=5, storage_every=10, n_snapshots=48, profiles=True)
+
+    # The microgrids also have their point of common coupling
+    assert len(payload["buses"]) == (101 if topology == "microgrid" else 100)
+    assert len(payload["loads"]) == 100
+    assert len(payload["generators"]) == 20
+    assert len(payload["storage_units"]) == 10
+    assert len(payload["snapshots"]) == 48
+    assert all(len(values) == 48 for values in payload["loads_t"]["p_set"].values())
+    # One connected network
+    n = build_pypsa_network(AnalyzeRequest(**payload))
+    assert len(analyze_topology(n)["islands"]) == 1
+
+
+def test_same_seed_gives_the_same_network():
+    assert synthetic_network("meshed", 30, seed=3) == synthetic_network("meshed", 30, seed=3)
+    assert synthetic_network("meshed", 30, seed=3) != synthetic_network("meshed", 30, seed=4)
+
+
+def test_unconnected_microgrids_are_islands():
+    payload = microgrid_cluster(4, buses_per_microgrid=5, connected=False)
+
+    n = build_pypsa_network(AnalyzeRequest(**payload))
+    islands = analyze_topology(n)["islands"]
+    assert len(islands) == 4
+    assert all(island["supplied"] for island in islands)
+
+
+@pytest.mark.parametrize("topology", ["radial", "meshed", "microgrid"])
+def test_networks_solve(client, topology):
+    payload = synthetic_network(topology, 40, gen_every=4, n_snapshots=6, profiles=True)
+
+    result = client.post("/api/analyze", json=payload).json()
+
+    assert result["status"] == "ok"
+    assert result["timings"]["network"] == {"buses": len(payload["buses"]), "snapshots": 6}
+
+
+def test_in_process_run_times_every_stage(client):
+    body = json.dumps(synthetic_network("radial", 20, n_snapshots=4)).encode()
+
+    runs = [bench_analyze.run_in_process(body) for _ in range(2)]
+
+    assert [status for _, status in runs] == ["ok", "ok"]
+    stages = bench_analyze.median_stages([stages for stages, _ in runs])
+    assert {"parse", "build", "model", "solve", "results", "encode", "wall"} <= set(stages)
+    assert stages["wall"] >= stages["solve"] > 0
+
+
+def test_compare_prints_ratios_per_stage(tmp_path, capsys):
+    row = {"mode": "in-process", "topology": "radial", "buses": 100, "snapshots": 24, "status": "ok"}
+    baseline = tmp_path / "before.json"
+    baseline.write_text(json.dumps({"results": [{**row, "stages": {"wall": 2.0, "solve": 1.0}}]}))
+    other = {**row, "buses": 1000, "stages": {"wall": 1.0}}
+
+    bench_analyze.compare([{**row, "stages": {"wall": 1.0, "solve": 1.5, "parse": 0.1}}, other], str(baseline))
+
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 2
+    assert "wall  0.50x" in lines[1] and "solve  1.50x" in lines[1]
+    assert "parse" not in lines[1]
@@ -0,0 +1,120 @@
+"""Temporal reduction before solving: resampling and clustered representative periods."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import AnalyzeRequest, build_pypsa_network
+from temporal import cluster_periods, expand_snapshots, medoids, reduce_snapshots
+
+# Four two-hour "days": a low and a high day, repeated
+DAYS = [[2, 4], [6, 8], [2, 4], [6, 8]]
+
+NETWORK = {
+    "buses": [{"name": "bus"}],
+    "generators": [
+        {"name": "cheap", "bus": "bus", "p_nom": 5, "marginal_cost": 10},
+        {"name": "peak", "bus": "bus", "p_nom": 10, "marginal_cost": 50},
+    ],
+    "loads": [{"name": "load", "bus": "bus"}],
+    "snapshots": [str(s) for s in pd.date_range("2024-01-01", periods=8, freq="h")],
+    "loads_t": {"p_set": {"load": [value for day in DAYS for value in day]}},
+}
+
+
+def with_load(values):
+    snapshots = [str(s) for s in pd.date_range("2024-01-01", periods=len(values), freq="h")]
+    return {**NETWORK, "snapshots": snapshots, "loads_t": {"p_set": {"load": values}}}
+
+
+def analyze(client, network, **temporal):
+    result = client.post("/api/analyze", json={**network, "temporal": temporal} if temporal else network).json()
+    assert result["status"] == "ok"
+    return result
+
+
+@pytest.mark.parametrize(
+    "temporal, reduced",
+    [
+        ({"method": "kmeans", "clusters": 2, "period": 2}, 4),
+        ({"method": "hierarchical", "clusters": 2, "period": 2}, 4),
+        ({"method": "resample", "resolution": 2}, 4),
+    ],
+)
+def test_exact_reduction_reproduces_the_full_solve(client, temporal, reduced):
+    network = NETWORK
+    if temporal["method"] == "resample":
+        # Pairs of equal hours, so their mean loses nothing
+        network = with_load([2, 2, 4, 4, 6, 6, 8, 8])
+    full = analyze(client, network)
+
+    result = analyze(client, network, **temporal)
+
+    metrics = result["temporal_reduction"]
+    assert metrics["snapshots"] == 8
+    assert metrics["reduced_snapshots"] == reduced
+    assert metrics["reduction_factor"] == 8 / reduced
+    assert metrics["profile_errors"]["Load.p_set"] == {"rmse": 0.0, "nrmse": 0.0, "max_abs": 0.0}
+    assert metrics["load_energy_error"] == pytest.approx(0.0)
+    assert result["objective"] == pytest.approx(full["objective"])
+    assert result["snapshots"] == full["snapshots"]
+    for name, values in full["timeseries"]["generators"]["p"].items():
+        np.testing.assert_allclose(result["timeseries"]["generators"]["p"][name], values, atol=1e-6)
+
+
+def test_resampling_keeps_the_energy_and_flattens_the_peak(client):
+    load = [2, 6, 4, 8, 3, 3, 5, 9, 1]
+    result = analyze(client, with_load(load), method="resample", resolution=3)
+
+    metrics = result["temporal_reduction"]
+    means = [4, 14 / 3, 5]
+    assert metrics["reduced_snapshots"] == 3
+    assert metrics["load_energy_error"] == pytest.approx(0.0)
+    assert metrics["peak_load_error"] == pytest.approx((5 - 9) / 9)
+    mapped = np.repeat(means, 3)
+    assert metrics["profile_errors"]["Load.p_set"]["max_abs"] == pytest.approx(np.abs(mapped - load).max())
+    assert metrics["profile_errors"]["Load.p_set"]["rmse"] == pytest.approx(np.sqrt(((mapped - load) ** 2).mean()))
+    # Each hour gets the dispatch of its group's mean load
+    np.testing.assert_allclose(result["timeseries"]["loads"]["p"]["load"], mapped, atol=1e-6)
+    cost = sum(3 * (10 * min(m, 5) + 50 * max(m - 5, 0)) for m in means)
+    assert result["objective"] == pytest.approx(cost)
+
+
+def test_clusters_are_weighted_by_the_periods_they_stand_for():
+    n = build_pypsa_network(AnalyzeRequest(**with_load([2, 4, 6, 8, 2, 4, 2, 4, 5])))
+    snapshots = n.snapshots
+
+    reduction = reduce_snapshots(n, "kmeans", clusters=2, period=2)
+
+    # Days 0, 2 and 3 are the low day, day 1 the high one; the last hour is a partial day
+    assert list(n.snapshots) == list(snapshots[[0, 1, 2, 3, 8]])
+    assert n.snapshot_weightings.objective.tolist() == [3, 3, 1, 1, 1]
+    assert n.snapshot_weightings.stores.tolist() == [1] * 5
+    assert reduction.positions.tolist() == [0, 1, 2, 3, 0, 1, 0, 1, 4]
+
+    n.optimize()
+    expand_snapshots(n, reduction)
+
+    assert n.snapshots.equals(snapshots)
+    assert n.snapshot_weightings.objective.tolist() == [1] * 9
+    np.testing.assert_allclose(n.loads_t.p_set["load"], [2, 4, 6, 8, 2, 4, 2, 4, 5])
+    np.testing.assert_allclose(n.loads_t.p["load"], [2, 4, 6, 8, 2, 4, 2, 4, 5])
+
+
+@pytest.mark.parametrize("method", ["kmeans", "hierarchical"])
+def test_cluster_periods_groups_close_rows(method):
+    features = np.array([[0.0, 1.0], [5.0, 5.0], [0.0, 1.0], [5.1, 5.0], [0.1, 1.0]])
+
+    labels = cluster_periods(features, 2, method)
+
+    assert labels[0] == labels[2] == labels[4] != labels[1] == labels[3]
+    # Ties go to the earlier row
+    assert sorted(medoids(features, labels).tolist()) == [0, 1]
+    assert cluster_periods(features, 1, method).tolist() == [0] * 5
+    assert len(set(cluster_periods(features, 10, method))) <= 5
+
+
+def test_unknown_method_is_rejected(client):
+    response = client.post("/api/analyze", json={**NETWORK, "temporal": {"method": "random"}})
+
+    assert response.status_code == 422
@@ -0,0 +1,67 @@
+"""Full per-snapshot results under "timeseries" on /api/analyze."""
+
+import numpy as np
+import pytest
+
+NETWORK = {
+    "buses": [{"name": "bus_a"}, {"name": "bus_b"}],
+    "generators": [
+        {"name": "cheap", "bus": "bus_a", "p_nom": 10, "marginal_cost": 5},
+        {"name": "peaker", "bus": "bus_b", "p_nom": 10, "marginal_cost": 50},
+    ],
+    "loads": [{"name": "load", "bus": "bus_b"}],
+    "lines": [{"name": "line", "bus0": "bus_a", "bus1": "bus_b", "x": 0.1, "s_nom": 20}],
+    "storage_units": [{"name": "battery", "bus": "bus_b", "p_nom": 1, "max_hours": 2}],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+    "loads_t": {"p_set": {"load": [2, 4, 6]}},
+    "generators_t": {"p_max_pu": {"cheap": [1, 0.5, 0]}},
+}
+
+
+@pytest.fixture
+def result(client):
+    result = client.post("/api/analyze", json=NETWORK).json()
+    assert result["status"] == "ok"
+    return result
+
+
+def test_every_series_is_aligned_to_the_snapshots(result):
+    timeseries = result["timeseries"]
+
+    assert result["snapshots"] == ["2024-01-01 00:00:00", "2024-01-01 01:00:00", "2024-01-01 02:00:00"]
+    assert set(timeseries["generators"]["p"]) == {"cheap", "peaker"}
+    assert set(timeseries["storage_units"]) == {"p", "state_of_charge"}
+    for component in timeseries.values():
+        for attribute in component.values():
+            for values in attribute.values():
+                assert len(values) == len(result["snapshots"])
+
+
+def test_series_start_with_the_first_snapshot_power(result):
+    timeseries = result["timeseries"]
+
+    for record in result["power"]["generators"]:
+        assert timeseries["generators"]["p"][record["Generator"]][0] == pytest.approx(record["p"])
+    for record in result["power"]["lines"]:
+        assert timeseries["lines"]["p0"][record["Line"]][0] == pytest.approx(record["p0"])
+
+
+def test_series_cover_every_snapshot(result):
+    timeseries = result["timeseries"]
+    generation = np.sum(list(timeseries["generators"]["p"].values()), axis=0)
+    storage = np.array(timeseries["storage_units"]["p"]["battery"])
+
+    assert timeseries["loads"]["p"]["load"] == [2.0, 4.0, 6.0]
+    np.testing.assert_allclose(generation + storage, [2.0, 4.0, 6.0], atol=1e-6)
+    # The cheap generator is unavailable at the last snapshot
+    assert timeseries["generators"]["p"]["cheap"][2] == pytest.approx(0.0)
+    assert timeseries["storage_units"]["p"]["battery"][2] == pytest.approx(1.0)
+
+
+def test_timeseries_can_be_left_out(client):
+    result = client.post("/api/analyze", json={**NETWORK, "include_timeseries": False}).json()
+
+    assert result["status"] == "ok"
+    assert "timeseries" not in result
+    assert len(result["snapshots"]) == 3
+    assert result["power"]["loads"] == [{"Load": "load", "p": pytest.approx(2.0)}]
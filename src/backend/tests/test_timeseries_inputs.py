@@ -0,0 +1,64 @@
+"""Time-varying inputs (loads_t, generators_t, storage_units_t) on /api/analyze."""
+
+import pytest
+
+NETWORK = {
+    "buses": [{"name": "bus"}],
+    "generators": [
+        {"name": "solar", "bus": "bus", "p_nom": 10, "marginal_cost": 0},
+        {"name": "diesel", "bus": "bus", "p_nom": 10, "marginal_cost": 100},
+    ],
+    "loads": [{"name": "load", "bus": "bus", "p_set": 1}],
+    "snapshots": ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"],
+}
+
+
+def dispatch(result, name):
+    return result["timeseries"]["generators"]["p"][name]
+
+
+def test_load_profile_sets_demand_per_snapshot(client):
+    result = client.post("/api/analyze", json={**NETWORK, "loads_t": {"p_set": {"load": [3, 5, 7]}}}).json()
+
+    assert result["status"] == "ok"
+    assert result["timeseries"]["loads"]["p"]["load"] == [3.0, 5.0, 7.0]
+    assert dispatch(result, "solar") == pytest.approx([3.0, 5.0, 7.0])
+
+
+def test_availability_and_cost_profiles_change_dispatch(client):
+    payload = {
+        **NETWORK,
+        "loads_t": {"p_set": {"load": [4, 4, 4]}},
+        "generators_t": {
+            "p_max_pu": {"solar": [1.0, 0.25, 0.0]},
+            "marginal_cost": {"diesel": [100, 100, 1]},
+        },
+    }
+
+    result = client.post("/api/analyze", json=payload).json()
+
+    assert result["status"] == "ok"
+    assert dispatch(result, "solar") == pytest.approx([4.0, 2.5, 0.0])
+    assert dispatch(result, "diesel") == pytest.approx([0.0, 1.5, 4.0])
+    assert result["objective"] == pytest.approx(1.5 * 100 + 4 * 1)
+
+
+def test_static_values_apply_without_a_profile(client):
+    result = client.post("/api/analyze", json=NETWORK).json()
+
+    assert result["timeseries"]["loads"]["p"]["load"] == [1.0, 1.0, 1.0]
+
+
+@pytest.mark.parametrize(
+    "series, message",
+    [
+        ({"loads_t": {"p_set": {"load": [1, 2]}}}, "one value per snapshot"),
+        ({"loads_t": {"p_set": {"missing": [1, 2, 3]}}}, "unknown loads: missing"),
+        ({"generators_t": {"efficiency": {"solar": [1, 1, 1]}}}, "not a supported time series"),
+    ],
+)
+def test_invalid_profiles_are_rejected(client, series, message):
+    response = client.post("/api/analyze", json={**NETWORK, **series})
+
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
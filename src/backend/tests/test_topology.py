@@ -0,0 +1,131 @@
+"""Island detection and per-island solves on /api/analyze."""
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import AnalyzeRequest, build_pypsa_network, normalized_frames
+from network_builder import build_network
+from topology import (
+    analyze_topology,
+    bus_islands,
+    island_frames,
+    merge_island_results,
+    solve_islands,
+    unsupplied_islands,
+)
+
+SNAPSHOTS = ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"]
+
+# Two islands, a-b-c and d-e, each with its own congested line; "z" has nothing attached
+NETWORK = {
+    "buses": [{"name": name} for name in "abcdez"],
+    "generators": [
+        {"name": "g_a", "bus": "a", "p_nom": 10, "marginal_cost": 10},
+        {"name": "g_c", "bus": "c", "p_nom": 10, "marginal_cost": 30},
+        {"name": "g_d", "bus": "d", "p_nom": 4, "marginal_cost": 15},
+        {"name": "g_e", "bus": "e", "p_nom_extendable": True, "marginal_cost": 40, "capital_cost": 5},
+    ],
+    "loads": [
+        {"name": "l_b", "bus": "b"},
+        {"name": "l_e", "bus": "e", "p_set": 6},
+    ],
+    "lines": [
+        {"name": "ab", "bus0": "a", "bus1": "b", "x": 0.1, "s_nom": 5},
+        {"name": "bc", "bus0": "b", "bus1": "c", "x": 0.1, "s_nom": 10},
+        {"name": "de", "bus0": "d", "bus1": "e", "x": 0.1, "s_nom": 3},
+    ],
+    "snapshots": SNAPSHOTS,
+    "loads_t": {"p_set": {"l_b": [4, 8, 12]}},
+}
+
+
+def network(data=NETWORK):
+    return build_pypsa_network(AnalyzeRequest(**data))
+
+
+def test_bus_islands_follow_active_lines():
+    n = network()
+    islands = bus_islands(n)
+
+    assert islands["a"] == islands["b"] == islands["c"]
+    assert islands["d"] == islands["e"]
+    assert len({islands["a"], islands["d"], islands["z"]}) == 3
+
+    n.lines.loc["bc", "active"] = False
+    assert bus_islands(n)["c"] != bus_islands(n)["a"]
+
+
+def test_topology_describes_each_supplied_island():
+    topology = analyze_topology(network())
+
+    islands = {tuple(island["buses"]): island for island in topology["islands"]}
+    assert set(islands) == {("a", "b", "c"), ("d", "e")}
+    abc, de = islands["a", "b", "c"], islands["d", "e"]
+    assert (abc["lines"], abc["generators"], abc["loads"]) == (2, 2, 1)
+    assert abc["peak_load"] == 12 and abc["generation_capacity"] == 20
+    # g_d alone cannot cover the peak; the extendable g_e makes up the rest
+    assert de["peak_load"] == 6 and de["supplied"]
+    assert topology["dangling"] == {"buses": ["z"]}
+    assert unsupplied_islands(topology) == []
+
+
+def test_split_islands_matches_a_single_solve(client):
+    together = client.post("/api/analyze", json=NETWORK).json()
+    split = client.post("/api/analyze", json={**NETWORK, "split_islands": True}).json()
+
+    assert together["status"] == split["status"] == "ok"
+    assert len(split["topology"]["islands"]) == 2
+    assert split["objective"] == pytest.approx(together["objective"], rel=1e-9)
+    for component, attribute in (("generators", "p"), ("lines", "p0"), ("loads", "p")):
+        series = together["timeseries"][component][attribute]
+        assert set(split["timeseries"][component][attribute]) == set(series)
+        for name, values in series.items():
+            np.testing.assert_allclose(split["timeseries"][component][attribute][name], values, atol=1e-6)
+
+
+def test_inactive_tie_line_belongs_to_no_island():
+    frames = normalized_frames(AnalyzeRequest(**NETWORK))
+    tie = frames["lines"].loc[["bc"]].rename(index={"bc": "cd"}).assign(bus0="c", bus1="d", active=False)
+    frames["lines"] = pd.concat([frames["lines"].assign(active=True), tie])
+    n = build_network(frames, SNAPSHOTS)
+    expected = build_network(frames, SNAPSHOTS)
+    expected.optimize(solver_name="highs")
+
+    islands = analyze_topology(n)["islands"]
+    parts = [island_frames(frames, island["buses"]) for island in islands]
+
+    assert [island["lines"] for island in islands] == [2, 1]
+    for island, part in zip(islands, parts):
+        assert "cd" not in part["lines"].index
+        assert part["lines"][["bus0", "bus1"]].isin(island["buses"]).all(axis=None)
+    results = [result for _, result in sorted(solve_islands(parts, SNAPSHOTS, {"solver_name": "highs"}, 1))]
+    assert [result["status"] for result in results] == ["ok", "ok"]
+    merge_island_results(n, results)
+    assert n.objective == pytest.approx(expected.objective, rel=1e-9)
+    np.testing.assert_allclose(n.lines_t.p0["cd"], 0.0)
+    for name in ("ab", "bc", "de"):
+        np.testing.assert_allclose(n.lines_t.p0[name], expected.lines_t.p0[name], atol=1e-6)
+
+
+def test_island_without_supply_is_rejected(client):
+    data = copy.deepcopy(NETWORK)
+    data["generators"] = [g for g in data["generators"] if g["bus"] not in "de"]
+
+    for body in (data, {**data, "split_islands": True}):
+        response = client.post("/api/analyze", json=body)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "1 island(s) have load but no generation to supply it (buses: d, e)"
+    assert [island["buses"] for island in unsupplied_islands(analyze_topology(network(data)))] == [["d", "e"]]
+
+
+def test_component_on_unknown_bus_is_rejected(client):
+    data = copy.deepcopy(NETWORK)
+    data["loads"].append({"name": "stray", "bus": "nowhere", "p_set": 1})
+
+    response = client.post("/api/analyze", json=data)
+
+    assert response.status_code == 400
+    assert "Components refer to unknown buses (loads: stray)" in response.json()["detail"]
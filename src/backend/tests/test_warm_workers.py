@@ -0,0 +1,86 @@
+"""Warm solve worker pool: JobManager warm-up and /api/analyze on warm workers."""
+
+import functools
+import logging
+import os
+import time
+
+import pytest
+
+import app as backend
+from jobs import JOB_RUNNING, JobManager
+
+from test_jobs import NETWORK, wait_for
+
+
+@pytest.fixture
+def warm_manager():
+    manager = JobManager(max_workers=1, warmup=os.getpid)
+    yield manager
+    manager.shutdown()
+
+
+def test_start_spawns_and_warms_every_worker(warm_manager):
+    assert warm_manager.stats()["ready"] is False
+
+    warm_manager.start()
+
+    stats = wait_for(lambda: warm_manager.stats() if warm_manager.stats()["ready"] else None)
+    assert stats["warm"] == 1
+    assert stats["queued"] == 0 and stats["running"] == 0
+
+
+def test_warm_worker_serves_every_job(warm_manager):
+    warm_manager.start()
+
+    pids = {warm_manager.run(os.getpid) for _ in range(3)}
+
+    assert len(pids) == 1
+    assert pids != {os.getpid()}
+
+
+def test_cancelled_worker_is_replaced_by_a_warm_one(warm_manager):
+    warm_manager.start()
+    job = warm_manager.submit(time.sleep, 60)
+    wait_for(lambda: job.status == JOB_RUNNING and job.worker is not None)
+    killed = job.worker.process.pid
+
+    warm_manager.cancel(job.id)
+
+    wait_for(lambda: warm_manager.stats()["ready"])
+    assert warm_manager.run(os.getpid) != killed
+
+
+def test_failed_warm_up_is_not_ready(client, monkeypatch, caplog):
+    manager = JobManager(max_workers=1, warmup=functools.partial(int, "not a number"))
+    caplog.set_level(logging.WARNING, logger="jobs")
+    try:
+        manager.start()
+        wait_for(lambda: "Worker warm-up failed: ValueError" in caplog.text)
+
+        assert manager.stats()["warm"] == 0
+        assert manager.stats()["ready"] is False
+        monkeypatch.setattr(backend, "job_manager", manager)
+        assert client.get("/api/health").json()["workers"]["ready"] is False
+        # The worker still runs jobs
+        assert manager.run(os.getpid) != os.getpid()
+    finally:
+        manager.shutdown()
+
+
+def test_analyze_runs_on_warm_workers(client, monkeypatch):
+    expected = client.post("/api/analyze", json=NETWORK).json()
+    monkeypatch.setattr(backend, "warm_workers", 1)
+    manager = backend.get_job_manager()
+    try:
+        manager.start()
+        wait_for(lambda: client.get("/api/health").json()["workers"]["ready"])
+
+        result = client.post("/api/analyze", json=NETWORK).json()
+
+        assert result["status"] == "ok"
+        assert result["objective"] == pytest.approx(expected["objective"])
+        assert result["power"] == expected["power"]
+        assert manager.stats() == {"max_workers": 1, "queued": 0, "running": 0, "warm": 1, "ready": True}
+    finally:
+        manager.shutdown()
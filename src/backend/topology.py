@@ -0,0 +1,225 @@
+"""
+Network topology checks and island decomposition before solving.
+
+``analyze_topology`` splits the network into islands the way PyPSA's
+``determine_network_topology`` splits it into sub-networks (connected
+components over the active lines), without the cycle search that the
+LOPF repeats anyway, and describes every island that has components
+attached: its
+buses and lines, its peak load and whether anything can supply it. An
+island with load but no generator cannot be balanced (storage starts
+empty and must end where it started) and would only make the LP
+infeasible, so analyses reject it up front.
+Components attached to unknown buses and buses with nothing attached are
+reported as dangling.
+
+Islands share no constraints, so they can also be solved as separate
+LOPFs. ``island_frames`` cuts the normalized component frames down to
+one island, ``solve_islands`` solves them in a process pool and
+``merge_island_results`` writes the solved outputs back into the full
+network so it can be summarized as if it had been solved at once.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pypsa
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from network_builder import COMPONENT_SPECS, SERIES_SPECS
+
+# One-port components counted per island
+ONE_PORT_FIELDS = ("generators", "loads", "storage_units")
+
+
+def bus_islands(n: "pypsa.Network") -> pd.Series:
+    """Island number of every bus, numbered like PyPSA sub-networks."""
+    lines = n.lines[n.lines.active] if "active" in n.lines else n.lines
+    bus0 = n.buses.index.get_indexer(lines.bus0)
+    bus1 = n.buses.index.get_indexer(lines.bus1)
+    known = (bus0 >= 0) & (bus1 >= 0)
+    size = len(n.buses)
+    graph = csr_matrix((np.ones(known.sum()), (bus0[known], bus1[known])), shape=(size, size))
+    _, labels = connected_components(graph, directed=False)
+    return pd.Series(labels, index=n.buses.index)
+
+
+def analyze_topology(n: "pypsa.Network") -> Dict[str, Any]:
+    """Islands and dangling components of a built network."""
+    island_of = bus_islands(n)
+
+    dangling: Dict[str, List[str]] = {}
+    attached = pd.Index([])
+    for field in ONE_PORT_FIELDS:
+        static = getattr(n, field)
+        unknown = ~static.bus.isin(n.buses.index)
+        if unknown.any():
+            dangling[field] = static.index[unknown].tolist()
+        attached = attached.union(pd.Index(static.bus[~unknown].unique()))
+    unknown = ~(n.lines.bus0.isin(n.buses.index) & n.lines.bus1.isin(n.buses.index))
+    if unknown.any():
+        dangling["lines"] = n.lines.index[unknown].tolist()
+    connected = attached.union(pd.Index(n.lines.bus0)).union(pd.Index(n.lines.bus1))
+    isolated = n.buses.index.difference(connected)
+    if len(isolated):
+        dangling["buses"] = isolated.tolist()
+
+    demand = n.get_switchable_as_dense("Load", "p_set")
+    peak = demand.T.groupby(n.loads.bus.map(island_of)).sum().T.max() if not n.loads.empty else pd.Series(dtype=float)
+
+    def by_island(static: pd.DataFrame, column: str, how: str) -> pd.Series:
+        return static[column].groupby(static.bus.map(island_of)).agg(how)
+
+    generation = by_island(n.generators, "p_nom", "sum")
+    extendable = by_island(n.generators, "p_nom_extendable", "any")
+    storage = by_island(n.storage_units, "p_nom", "sum")
+    line_islands = n.lines.bus0.map(island_of)
+    lines = line_islands[line_islands == n.lines.bus1.map(island_of)].value_counts()
+    one_ports = {field: getattr(n, field).bus.map(island_of).value_counts() for field in ONE_PORT_FIELDS}
+
+    islands = []
+    for island, buses in n.buses.groupby(island_of).groups.items():
+        counts = {field: int(one_ports[field].get(island, 0)) for field in ONE_PORT_FIELDS}
+        if not any(counts.values()):
+            continue
+        capacity = float(generation.get(island, 0.0))
+        islands.append({
+            "id": str(island),
+            "buses": buses.tolist(),
+            "lines": int(lines.get(island, 0)),
+            **counts,
+            "peak_load": float(peak.get(island, 0.0)),
+            "generation_capacity": capacity,
+            "storage_capacity": float(storage.get(island, 0.0)),
+            "supplied": capacity > 0 or bool(extendable.get(island, False)),
+        })
+
+    return {"islands": islands, "dangling": dangling}
+
+
+def unsupplied_islands(topology: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Islands with load that nothing can supply."""
+    return [island for island in topology["islands"] if island["peak_load"] > 0 and not island["supplied"]]
+
+
+def island_frames(frames: Dict[str, pd.DataFrame], buses: List[str]) -> Dict[str, pd.DataFrame]:
+    """Component and time-series frames restricted to one island."""
+    buses = pd.Index(buses)
+    island = {"buses": frames["buses"].loc[frames["buses"].index.intersection(buses)]}
+    for field in COMPONENT_SPECS:
+        if field == "buses":
+            continue
+        frame = frames[field]
+        if field == "lines":
+            # An inactive line may join two islands; it belongs to neither
+            keep = frame.bus0.isin(buses) & frame.bus1.isin(buses)
+        else:
+            keep = frame.bus.isin(buses)
+        island[field] = frame[keep]
+    for key, frame in frames.items():
+        if "." in key:
+            component_field = SERIES_SPECS[key.split(".", 1)[0]][0]
+            island[key] = frame.loc[:, frame.columns.intersection(island[component_field].index)]
+    return island
+
+
+def _output_attributes(n: "pypsa.Network", component: str) -> List[str]:
+    attrs = n.component_attrs[component]
+    return attrs.index[attrs.status.str.startswith("Output") & (attrs.type == "series")].tolist()
+
+
+def _solve_island(
+    frames: Dict[str, pd.DataFrame], snapshots: Optional[List[Any]], solve_kwargs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build and optimize one island and collect its solved outputs."""
+    import warnings
+
+    from network_builder import build_network
+
+    warnings.simplefilter("ignore")
+    try:
+        n = build_network(frames, snapshots)
+        status, condition = n.optimize(**solve_kwargs)
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    if status != "ok":
+        return {"status": status, "termination_condition": condition}
+
+    series: Dict[Tuple[str, str], pd.DataFrame] = {}
+    static: Dict[Tuple[str, str], pd.Series] = {}
+    for component in ("Bus", "Generator", "Load", "StorageUnit", "Line"):
+        if n.static(component).empty:
+            continue
+        dynamic = n.dynamic(component)
+        for attr in _output_attributes(n, component):
+            if attr in dynamic and not dynamic[attr].empty:
+                series[component, attr] = dynamic[attr]
+        for attr in ("p_nom_opt", "s_nom_opt"):
+            if attr in n.static(component):
+                static[component, attr] = n.static(component)[attr]
+    return {
+        "status": "ok",
+        "termination_condition": condition,
+        "objective": float(n.objective),
+        "series": series,
+        "static": static,
+    }
+
+
+def solve_islands(
+    islands: List[Dict[str, pd.DataFrame]],
+    snapshots: Optional[List[Any]],
+    solve_kwargs: Dict[str, Any],
+    max_workers: int,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Solve each island's frames, in a process pool with more than one worker.
+
+    Yields ``(island index, result)`` pairs as the solves finish.
+    """
+    workers = max(1, min(max_workers, len(islands)))
+    if workers == 1:
+        for index, frames in enumerate(islands):
+            yield index, _solve_island(frames, snapshots, solve_kwargs)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {
+            pool.submit(_solve_island, frames, snapshots, solve_kwargs): index for index, frames in enumerate(islands)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                result = {"status": "error", "error": f"Worker process failed: {e}"}
+            yield futures[future], result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def merge_island_results(n: "pypsa.Network", results: List[Dict[str, Any]]) -> None:
+    """Write the solved outputs of all islands into the full network ``n``."""
+    series: Dict[Tuple[str, str], List[pd.DataFrame]] = {}
+    for result in results:
+        for key, frame in result["series"].items():
+            series.setdefault(key, []).append(frame)
+        for (component, attr), values in result["static"].items():
+            static = n.static(component)
+            if attr not in static:
+                static[attr] = static[attr.replace("_opt", "")]
+            static.loc[values.index, attr] = values
+
+    for (component, attr), frames in series.items():
+        # Components outside every solved island (e.g. lines of islands without one-ports) stay at zero
+        merged = pd.concat(frames, axis=1).reindex(index=n.snapshots)
+        names = n.static(component).index
+        n.dynamic(component)[attr] = merged.reindex(columns=names, fill_value=0.0).fillna(0.0)
+    # Sets the derived attributes (e.g. line carriers) that optimizing ``n`` itself would have set
+    n.calculate_dependent_values()
+    n.objective = float(np.sum([result["objective"] for result in results]))
@@ -89,7 +89,7 @@ async function performStartup() {
     console.log(`Using bundled backend executable: ${backendInfo.executable}`)
     argsByVariant.push({
       cmd: backendInfo.executable,
-      args: ['--host', '127.0.0.1', '--port', String(port)],
+      args: ['--host', '127.0.0.1', '--port', String(port), '--fast-start'],
       cwd: backendInfo.dir
     })
   }
@@ -100,12 +100,12 @@ async function performStartup() {
     argsByVariant = [
       {
         cmd: process.platform === 'win32' ? 'python.exe' : 'python',
-        args: ['start-backend.py', '--host', '127.0.0.1', '--port', String(port)],
+        args: ['start-backend.py', '--host', '127.0.0.1', '--port', String(port), '--fast-start'],
         cwd: backendInfo.dir
       },
       {
         cmd: process.platform === 'win32' ? 'python.exe' : 'python',
-        args: ['-m', 'uv', 'run', 'python', 'app.py', '--host', '127.0.0.1', '--port', String(port)],
+        args: ['-m', 'uv', 'run', 'python', 'app.py', '--host', '127.0.0.1', '--port', String(port), '--fast-start'],
         cwd: backendInfo.dir
       },
       {